@@ -21,7 +21,6 @@ from functools import wraps
 from typing import (
     Any, Awaitable, Callable, Coroutine, Dict, Optional, Tuple, Type, Union)
 
-import aiohttp
 from sanic.response import ResponseStream
 
 import settings
@@ -249,29 +248,22 @@ def http_action(
             else:
                 amodel = BaseActionModel(req, resp, aprops, shared_data)
             try:
-                async with aiohttp.ClientSession() as client:
-                    logging.getLogger(__name__).debug(
-                        f'[http_action] Created HTTP client session for action {action_name}, session: {id(client)}, closed: {client.closed}')
-                    req._request.ctx.http_client = client
-                    await amodel.init_session()
-                    if _is_authorized_to_execute_action(amodel, aprops):
-                        await amodel.pre_dispatch(None)
-                        logging.getLogger(__name__).debug(
-                            f'[http_action] Before action {action_name}, session: {id(client)}, closed: {client.closed}')
-                        ans = await func(amodel, req, resp)
-                        logging.getLogger(__name__).debug(
-                            f'[http_action] After action {action_name}, session: {id(client)}, closed: {client.closed}')
-                        if resp.result and ans:
-                            raise RuntimeError(
-                                'Cannot use both KResponse result container and legacy result return')
-                        elif ans is not None:
-                            resp.set_result(ans)
-                        await amodel.post_dispatch(aprops, resp, None)
-                    else:
-                        amodel = UserActionModel(req, resp, aprops, shared_data)
-                        await amodel.pre_dispatch(None)
-                        await amodel.post_dispatch(aprops, None, None)
-                        raise ForbiddenException(req.translate('Access forbidden - please log-in.'))
+                req._request.ctx.http_client = application.ctx.http_client
+                await amodel.init_session()
+                if _is_authorized_to_execute_action(amodel, aprops):
+                    await amodel.pre_dispatch(None)
+                    ans = await func(amodel, req, resp)
+                    if resp.result and ans:
+                        raise RuntimeError(
+                            'Cannot use both KResponse result container and legacy result return')
+                    elif ans is not None:
+                        resp.set_result(ans)
+                    await amodel.post_dispatch(aprops, resp, None)
+                else:
+                    amodel = UserActionModel(req, resp, aprops, shared_data)
+                    await amodel.pre_dispatch(None)
+                    await amodel.post_dispatch(aprops, None, None)
+                    raise ForbiddenException(req.translate('Access forbidden - please log-in.'))
 
             except ImmediateRedirectException as ex:
                 return response.redirect(ex.url, status=ex.code)
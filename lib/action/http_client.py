@@ -0,0 +1,155 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+An application-wide HTTP client session used by KonText and its plug-ins
+(token_connect, kwic_connect, remote auth, query suggestion etc.) to access
+external services. Sharing the session allows reusing opened connections
+(keep-alive) and the DNS cache between requests.
+
+The session also collects latency histograms of individual backends (identified
+by their origin, i.e. scheme://host:port) so it is possible to find out which
+service slows down respective pages. The histograms are logged periodically
+(see STATS_LOG_INTERVAL) and with each soft reset.
+"""
+
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import aiohttp
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""
+upper bounds (in seconds) of latency histogram buckets; the last (implicit) bucket is unbounded
+"""
+
+SLOW_REQUEST_LOG_THRESHOLD = 2.0
+
+STATS_LOG_INTERVAL = 1000
+"""
+Latency histograms are logged each STATS_LOG_INTERVAL-th request
+"""
+
+DEFAULT_LIMIT = 100
+
+DEFAULT_KEEPALIVE_SECS = 15
+
+DNS_CACHE_TTL = 300
+
+
+@dataclass
+class LatencyHistogram:
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    errors: int = 0
+    total: float = 0
+    max: float = 0
+
+    def add(self, latency: float):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def export(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg': self.total / self.count if self.count > 0 else 0,
+            'max': self.max,
+            'buckets': {
+                **{f'le_{b}': v for b, v in zip(LATENCY_BUCKETS, self.buckets)},
+                'le_inf': self.buckets[-1]}}
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+
+_num_requests = 0
+
+
+def _get_histogram(url) -> LatencyHistogram:
+    backend = str(url.origin())
+    if backend not in _histograms:
+        _histograms[backend] = LatencyHistogram()
+    return _histograms[backend]
+
+
+def _count_request():
+    global _num_requests
+    _num_requests += 1
+    if _num_requests % STATS_LOG_INTERVAL == 0:
+        logging.getLogger(__name__).info({'type': 'http_client_latency_stats', 'backends': latency_stats()})
+
+
+async def _on_request_start(session, ctx, params: aiohttp.TraceRequestStartParams):
+    ctx.start = time.monotonic()
+
+
+async def _on_request_end(session, ctx, params: aiohttp.TraceRequestEndParams):
+    latency = time.monotonic() - ctx.start
+    _get_histogram(params.url).add(latency)
+    _count_request()
+    if latency >= SLOW_REQUEST_LOG_THRESHOLD:
+        logging.getLogger(__name__).warning(
+            f'slow HTTP request {params.method} {params.url} ({params.response.status}): {latency:.2f}s')
+
+
+async def _on_request_exception(session, ctx, params: aiohttp.TraceRequestExceptionParams):
+    hist = _get_histogram(params.url)
+    hist.add(time.monotonic() - ctx.start)
+    hist.errors += 1
+    _count_request()
+
+
+def create_client_session(
+        limit: int = DEFAULT_LIMIT, limit_per_host: int = 0,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_SECS) -> aiohttp.ClientSession:
+    """
+    Create a client session with a connection pool limited to the specified
+    number of connections (0 = unlimited) in total and per host.
+    This must be called with a running event loop.
+
+    As the session is shared by all the users, it does not store any cookies
+    (otherwise e.g. a session cookie obtained for one user would be sent along
+    with requests of all the other users). Cookies must be always passed
+    explicitly via request headers.
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    connector = aiohttp.TCPConnector(
+        limit=limit, limit_per_host=limit_per_host, keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=DNS_CACHE_TTL)
+    return aiohttp.ClientSession(
+        connector=connector, trace_configs=[trace_config], cookie_jar=aiohttp.DummyCookieJar())
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return latency histograms of all the backends accessed since the last reset
+    """
+    return {k: v.export() for k, v in _histograms.items()}
+
+
+def reset_latency_stats():
+    global _num_requests
+    _histograms.clear()
+    _num_requests = 0
@@ -28,6 +28,7 @@ from action.argmapping.subcorpus import (
     CreateSubcorpusArgs, CreateSubcorpusRawCQLArgs, CreateSubcorpusWithinArgs)
 from action.errors import FunctionNotSupported, UserReadableException
 from action.model.corpus import CorpusActionModel
+from bgcalc.freqs import schedule_freq_precalc
 from bgcalc.task import AsyncTaskStatus
 from corplib.abstract import create_new_subc_ident
 from corplib.subcorpus import KSubcorpus, create_subcorpus
@@ -134,6 +135,7 @@ class SubcorpusActionModel(CorpusActionModel):
                     size=subc.search_size,
                     public_description=specification.description,
                     data=specification)
+            await schedule_freq_precalc(subc)
         else:
             worker = bgcalc.calc_backend_client(settings)
             res = await worker.send_task(
@@ -14,7 +14,7 @@
 # GNU General Public License for more details.
 
 import logging
-from typing import Dict, Iterable, List, Tuple, TypeVar, Generic, Optional, Union
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, TypeVar, Generic, Optional, Union
 from urllib.parse import urlparse
 from sanic.helpers import STATUS_CODES
 from dataclasses import dataclass
@@ -254,4 +254,26 @@ async def bytes_stream(
         status=status,
         headers=headers,
         content_type=mime_type,
-    )
\ No newline at end of file
+    )
+
+
+async def chunks_stream(
+        chunks: AsyncIterator[bytes],
+        status: int = 200,
+        mime_type: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+) -> ResponseStream:
+    """
+    Return a streaming response object sending data chunks
+    as they are produced by the provided iterator.
+    """
+    async def _streaming_fn(response):
+        async for content in chunks:
+            await response.write(content)
+
+    return ResponseStream(
+        streaming_fn=_streaming_fn,
+        status=status,
+        headers=headers or {},
+        content_type=mime_type or "application/octet-stream",
+    )
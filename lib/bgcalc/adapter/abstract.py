@@ -44,7 +44,12 @@ class AbstractBgClient(abc.ABC):
 
     @abc.abstractmethod
     async def send_task(
-            self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None) -> AbstractResultWrapper:
+            self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None,
+            queue: Optional[str] = None) -> AbstractResultWrapper:
+        """
+        Send a task to the worker. The task is sent to the default queue
+        unless a different one is specified.
+        """
         pass
 
     @abc.abstractmethod
@@ -17,8 +17,10 @@ import importlib
 import logging
 import re
 import sys
+import time
+import weakref
 from dataclasses import dataclass
-from typing import Any, List, Type, TypeVar, Union, Optional
+from typing import Any, Callable, Dict, List, Type, TypeVar, Union, Optional
 
 import ujson as json
 from action.errors import UserReadableException
@@ -26,13 +28,29 @@ from bgcalc.adapter.abstract import AbstractBgClient, AbstractResultWrapper
 from bgcalc.errors import BgCalcError, CalcTaskNotFoundError
 from dataclasses_json import dataclass_json
 from redis import Redis
+from redis import asyncio as aioredis
 from rq import Queue
 from rq.exceptions import NoSuchJobError
 from rq.job import Job
+from rq.results import Result
 from rq_scheduler import Scheduler
 
 T = TypeVar('T')
 
+POLLING_INTERVAL = 0.5
+
+MAX_BLOCKING_WAIT = 300
+"""
+Max. time (in seconds) we wait for a job result notification
+in case no explicit timeout is specified.
+"""
+
+MAX_NOTIFICATION_CONNECTIONS = 50
+"""
+Max. number of Redis connections (per event loop) used for waiting for job result
+notifications. Once all of them are occupied, other result waits use polling.
+"""
+
 
 @dataclass_json
 @dataclass
@@ -62,6 +80,33 @@ def handle_custom_exception(func):
     return wrapper
 
 
+class AioConnections:
+    """
+    AioConnections provides async Redis clients for waiting for job results. All the waits
+    within an event loop share a single size-limited connection pool (async connections
+    cannot be shared by different event loops). A blocking read occupies a connection
+    until the result is available so in case the pool is exhausted, the client raises
+    ConnectionError (and the caller is expected to use polling instead).
+    """
+
+    def __init__(self, host: str, port: int, db: int, max_connections: int = MAX_NOTIFICATION_CONNECTIONS):
+        self._host = host
+        self._port = port
+        self._db = db
+        self._max_connections = max_connections
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis] = \
+            weakref.WeakKeyDictionary()
+
+    def __call__(self) -> aioredis.Redis:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+                host=self._host, port=self._port, db=self._db, max_connections=self._max_connections))
+            self._clients[loop] = client
+        return client
+
+
 class ResultWrapper(AbstractResultWrapper[T]):
 
     status_map = dict(
@@ -72,8 +117,15 @@ class ResultWrapper(AbstractResultWrapper[T]):
         failed='FAILURE'
     )
 
-    def __init__(self, job: Job):
+    def __init__(self, job: Job, aio_client: Optional[Callable[[], aioredis.Redis]] = None):
+        """
+        arguments:
+        job -- a wrapped job
+        aio_client -- a function providing an async Redis client (see AioConnections); if set, the get()
+                      method waits for job results via a blocking read instead of polling
+        """
         self._job = job
+        self._aio_client = aio_client
         self.result: Union[T, Exception] = None
 
     def _infer_error(self, exc_info, job_id):
@@ -104,29 +156,62 @@ class ResultWrapper(AbstractResultWrapper[T]):
             return err
         return Exception(f'Task failed: {job_id}')
 
+    async def _wait_for_result(self, aio_client: Callable[[], aioredis.Redis], timeout: Optional[float]) -> bool:
+        """
+        Block until the worker stores a result of the job. Rq writes
+        all the job results (both success and failure) to a per-job Redis
+        stream (see rq.results.Result) so we can wait for the stream entry
+        instead of polling the job status.
+
+        returns:
+        True if the result is available, False on timeout
+        """
+        block_ms = max(1, int((timeout if timeout else MAX_BLOCKING_WAIT) * 1000))
+        resp = await aio_client().xread({Result.get_key(self._job.id): '0-0'}, block=block_ms)
+        return bool(resp)
+
+    def _fetch_result(self) -> bool:
+        if self._job.is_finished:
+            # Handle both old (job.result) and new (job.return_value()) RQ API
+            return_value = getattr(self._job, 'return_value', None)
+            self.result = return_value() if callable(return_value) else self._job.result
+            return True
+        elif self._job.is_failed:
+            self._job.refresh()
+            # Handle both old (job.exc_info) and new (job.latest_result().exc_string) RQ API
+            latest_result = getattr(self._job, 'latest_result', None)
+            result = latest_result() if callable(latest_result) else None
+            exc_info = result.exc_string if result is not None else self._job.exc_info
+            self.result = self._infer_error(exc_info, self._job.id)
+            return True
+        return False
+
     async def get(self, timeout=None):
+        """
+        Wait for the job result. If possible, the result is awaited via
+        a blocking read of the job result stream. Polling of the job status is
+        used as a fallback (e.g. when the blocking read fails).
+        """
+        t0 = time.monotonic()
+        method = 'polling'
         try:
-            total_time = 0
+            if self._aio_client is not None:
+                try:
+                    if await self._wait_for_result(self._aio_client, timeout):
+                        method = 'notification'
+                except Exception as ex:
+                    logging.getLogger(__name__).warning(
+                        f'Failed to wait for job {self._job.id} result notification, using polling: {ex}')
             while True:
-                await asyncio.sleep(0.5)
-                if self._job.is_finished:
-                    # Handle both old (job.result) and new (job.return_value()) RQ API
-                    self.result = self._job.return_value() if callable(getattr(self._job, 'return_value', None)) else self._job.result
-                    break
-                elif self._job.is_failed:
-                    self._job.refresh()
-                    # Handle both old (job.exc_info) and new (job.latest_result().exc_string) RQ API
-                    latest_result = getattr(self._job, 'latest_result', None)
-                    if callable(latest_result):
-                        exc_info = self._job.latest_result().exc_string
-                    else:
-                        exc_info = self._job.exc_info
-                    self.result = self._infer_error(exc_info, self._job.id)
+                if self._fetch_result():
+                    logging.getLogger(__name__).info(
+                        f'Job {self._job.id} ({self.func_name}) result obtained via {method} '
+                        f'after {time.monotonic() - t0:.3f}s')
                     break
-                elif timeout and total_time > timeout:
+                elif timeout and time.monotonic() - t0 > timeout:
                     self.result = Exception(f'Task result timeout: {self._job}')
                     break
-                total_time += 0.5
+                await asyncio.sleep(POLLING_INTERVAL)
         except Exception as e:
             self.result = e
         return self.result
@@ -149,10 +234,10 @@ class ResultWrapper(AbstractResultWrapper[T]):
 
 
 class RqConfig:
-    HOST = None
-    PORT = None
-    DB = None
-    SCHEDULER_CONF_PATH = None
+    HOST: str
+    PORT: int
+    DB: int
+    SCHEDULER_CONF_PATH: Optional[str] = None
 
 
 class Control:
@@ -172,7 +257,9 @@ class RqClient(AbstractBgClient):
 
     def __init__(self, conf: RqConfig, prefix: str = ''):
         self.redis_conn = Redis(host=conf.HOST, port=conf.PORT, db=conf.DB)
+        self._aio_client = AioConnections(conf.HOST, conf.PORT, conf.DB)
         self.queue = Queue(connection=self.redis_conn)
+        self._queues: Dict[str, Queue] = {}
         self.prefix = prefix
         self.scheduler = Scheduler(connection=self.redis_conn, queue=self.queue)
         self.scheduler_conf_path = conf.SCHEDULER_CONF_PATH
@@ -217,24 +304,38 @@ class RqClient(AbstractBgClient):
     def control(self):
         return self._control
 
-    def send_task_sync(self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None) -> ResultWrapper[T]:
+    def _get_queue(self, name: Optional[str]) -> Queue:
+        if name is None or name == self.queue.name:
+            return self.queue
+        if name not in self._queues:
+            self._queues[name] = Queue(name, connection=self.redis_conn)
+        return self._queues[name]
+
+    def send_task_sync(
+            self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None,
+            queue: Optional[str] = None) -> ResultWrapper[T]:
         tl = self._resolve_limit(time_limit, soft_time_limit)
         try:
-            job = self.queue.enqueue(f'{self.prefix}.{name}', job_timeout=tl, args=args, job_id=task_id)
-            return ResultWrapper(job)
+            job = self._get_queue(queue).enqueue(f'{self.prefix}.{name}', job_timeout=tl, args=args, job_id=task_id)
+            return ResultWrapper(job, self._aio_client)
         except Exception as ex:
             logging.getLogger(__name__).error(ex)
 
-    async def send_task(self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None) -> ResultWrapper[T]:
+    async def send_task(
+            self, name, ans_type: Type[T], args=None, time_limit=None, soft_time_limit=None, task_id=None,
+            queue: Optional[str] = None) -> ResultWrapper[T]:
         """
         Send a task to the worker.
 
         Please note that Rq does not know hard vs. soft time limit. In case both
         values are filled in (time_limit, soft_time_limit), the smaller one is
         selected. Otherwise, the non-None is applied.
+
+        Tasks sent to a non-default queue are processed only by workers listening
+        to the queue (see worker/rqworker.py).
         """
         return await asyncio.get_event_loop().run_in_executor(
-            None, self.send_task_sync, name, ans_type, args, time_limit, soft_time_limit, task_id)
+            None, self.send_task_sync, name, ans_type, args, time_limit, soft_time_limit, task_id, queue)
 
     def get_task_error(self, task_id):
         try:
@@ -247,7 +348,7 @@ class RqClient(AbstractBgClient):
 
     def AsyncResult(self, ident):
         try:
-            return ResultWrapper(Job.fetch(ident, connection=self.redis_conn))
+            return ResultWrapper(Job.fetch(ident, connection=self.redis_conn), self._aio_client)
         except NoSuchJobError:
             logging.getLogger(__name__).warning(f'Job {ident} not found')
             return None
@@ -17,6 +17,7 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
 # 02110-1301, USA.
 
+import asyncio
 import logging
 import os
 import time
@@ -95,6 +96,8 @@ async def wait_for_conc(
     """
     Find a conc. calculation record in cache (matching provided corp_cache_key and query)
     and wait until a result is available. The behavior is modified by 'minsize' (see below).
+    The function does not block the event loop - it awaits status change notifications
+    provided by the cache (see AbstractConcCache.status_listener) with a timeout.
 
     arguments:
     minsize -- min. size of concordance we accept:
@@ -102,15 +105,22 @@ async def wait_for_conc(
                 2) == -1 => we want the whole concordance to be ready => longer time limit
                 3) == 0 => we only care whether the file exists => short time limit
     """
-    time_limit = 7 if minsize >= 0 else 20   # 7 => ~2s, 20 => ~19s
-    t0 = t1 = time.time()
+    time_limit = 7 if minsize >= 0 else 20
+    t0 = time.time()
     i = 1
-    has_min_result, finished = await check_result(cache_map, corp_cache_key, q, cutoff, minsize)
-    while not (finished or has_min_result) and t1 - t0 < time_limit:
-        time.sleep(i * 0.1)
-        i += 1
-        t1 = time.time()
-        has_min_result, finished = await check_result(cache_map, corp_cache_key, q, cutoff, minsize)
+    async with cache_map.status_listener(corp_cache_key, q, cutoff) as status_changed:
+        while True:
+            status_changed.clear()
+            has_min_result, finished = await check_result(cache_map, corp_cache_key, q, cutoff, minsize)
+            remaining = time_limit - (time.time() - t0)
+            if finished or has_min_result or remaining <= 0:
+                break
+            # the timeout is just a fallback in case the cache plug-in (or its DB backend)
+            # is not able to notify us about status changes
+            try:
+                await asyncio.wait_for(status_changed.wait(), timeout=min(i * 0.1, remaining))
+            except asyncio.TimeoutError:
+                i += 1
     if not has_min_result:
         if finished:  # cache vs. filesystem mismatch
             await cache_map.del_entry(corp_cache_key, q, cutoff)
@@ -176,7 +186,9 @@ async def require_existing_conc(
             if qq.startswith('x-'):
                 mcorp = await corpus_factory.get_corpus(qq[2:])
                 break
-        return PyConc(mcorp, 'l', status.cachefile, orig_corp=corp)
+        conc = PyConc(mcorp, 'l', status.cachefile, orig_corp=corp)
+        await cache_map.record_access(corp.cache_key, tuple(q), cutoff)
+        return conc
     logging.getLogger(__name__).error('Unreadable concordance, status: {}'.format(status.to_dict()))
     raise UnreadableConcordanceException(
         'Unreadable concordance. File: {}, error: {}'.format(status.cachefile, status.error))
@@ -245,6 +257,7 @@ async def find_cached_conc_base(
                             mcorp = await corpus_factory.get_corpus(qq[2:])
                             break
                     conc = PyConc(mcorp, 'l', cache_path, orig_corp=corp)
+                    await cache_map.record_access(corp.cache_key, q[:i], cutoff)
             except (ConcCalculationStatusException, manatee.FileAccessError) as ex:
                 logging.getLogger(__name__).error(
                     f'Failed to use cached concordance for {q[:i]}: {ex}')
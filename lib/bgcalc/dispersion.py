@@ -0,0 +1,221 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Calculation and caching of concordance position dispersion (i.e. a histogram
+of concordance lines along corpus positions).
+
+Histograms are stored in a binary file next to the respective concordance cache file
+(see plugin_types.conc_cache.dispersion_cache_path). The file contains histograms
+of all the requested resolutions and its header identifies the concordance file
+version (modification time, size) the data were calculated from. Once the concordance
+file is removed or recalculated, the cached histograms become invalid (and the concordance
+cache clean-up removes them along with the concordance file).
+
+Dispersion of large concordances is calculated by a background worker.
+"""
+
+import logging
+import os
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import bgcalc
+import corplib
+import settings
+from bgcalc.conc import require_existing_conc
+from bgcalc.errors import BgCalcError
+from conclib.executor import run_manatee
+from conclib.pyconc import PyConc
+from corplib.abstract import SubcorpusIdent
+from corplib.corpus import AbstractKCorpus
+from dataclasses_json import dataclass_json
+from plugin_types.conc_cache import dispersion_cache_path
+
+TASK_TIME_LIMIT = settings.get_int('calc_backend', 'task_time_limit', 300)
+
+BG_CALC_MIN_CONC_SIZE = 1000000
+"""
+dispersion of concordances of this size and larger is calculated by a background worker
+"""
+
+FORMAT_VERSION = 1
+
+HEADER_SIZE = 3
+"""
+format version, modification time (ns) and size of the concordance file
+"""
+
+
+@dataclass_json
+@dataclass
+class FreqDispersionBin:
+    start: float
+    position: float
+    end: float
+    freq: int
+
+
+@dataclass
+class DispersionCalcArgs:
+    corpname: str
+    subcname: Optional[str]
+    subcpath: Optional[str]
+    q: Tuple[str, ...]
+    resolution: int
+    cutoff: int = field(default=0)
+
+
+def calc_abs_freqs(conc: PyConc, resolution: int) -> List[int]:
+    """
+    Calculate numbers of concordance lines within 'resolution' equally sized
+    parts of the corpus.
+    """
+    conc_begs, values = conc.xdistribution([0] * resolution, 101)
+
+    abs_freq = []
+    last_valid_item = None
+    for beg in reversed(conc_begs):
+        # if beg is 0, it means there are no concordances in the bin
+        if beg > 0:
+            if last_valid_item is None:
+                abs_freq.append(int(conc.size()) - beg)
+            else:
+                # `last_valid_item - beg` is number of concordances
+                # between beginnig of last non empty bin and the beginning of current bin
+                # (for cycle is going backwards)
+                abs_freq.append(last_valid_item - beg)
+            last_valid_item = beg
+        else:
+            abs_freq.append(0)
+    return list(reversed(abs_freq))
+
+
+def export_bins(abs_freqs: List[int]) -> List[FreqDispersionBin]:
+    return [
+        FreqDispersionBin(
+            100 * i / len(abs_freqs),
+            100 * (i + 0.5) / len(abs_freqs),
+            100 * (i + 1) / len(abs_freqs),
+            freq,
+        ) for i, freq in enumerate(abs_freqs)
+    ]
+
+
+def _load_histograms(conc_path: str) -> Dict[int, List[int]]:
+    """
+    Load all the valid cached histograms of a concordance.
+
+    returns:
+    a dict resolution => list of abs. frequencies (empty if nothing valid is cached)
+    """
+    try:
+        conc_stat = os.stat(conc_path)
+        with open(dispersion_cache_path(conc_path), 'rb') as fr:
+            data = array('q')
+            data.frombytes(fr.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as ex:
+        logging.getLogger(__name__).warning(f'Failed to read dispersion cache of {conc_path}: {ex}')
+        return {}
+    if data[:HEADER_SIZE].tolist() != [FORMAT_VERSION, conc_stat.st_mtime_ns, conc_stat.st_size]:
+        return {}
+    ans = {}
+    i = HEADER_SIZE
+    while i < len(data):
+        resolution = data[i]
+        if resolution < 1 or i + 1 + resolution > len(data):
+            logging.getLogger(__name__).warning(f'Corrupted dispersion cache of {conc_path}')
+            return {}
+        ans[resolution] = data[i + 1:i + 1 + resolution].tolist()
+        i += 1 + resolution
+    return ans
+
+
+def find_cached_dispersion(conc_path: str, resolution: int) -> Optional[List[int]]:
+    return _load_histograms(conc_path).get(resolution)
+
+
+def store_dispersion(conc_path: str, resolution: int, abs_freqs: List[int]):
+    """
+    Add a histogram to the dispersion cache of a concordance. Histograms
+    of other resolutions are preserved (as long as they are valid).
+    The file is replaced atomically so readers never see partial data.
+    """
+    try:
+        conc_stat = os.stat(conc_path)
+        histograms = _load_histograms(conc_path)
+        histograms[resolution] = abs_freqs
+        data = array('q', [FORMAT_VERSION, conc_stat.st_mtime_ns, conc_stat.st_size])
+        for res, freqs in sorted(histograms.items()):
+            data.append(res)
+            data.extend(freqs)
+        disp_path = dispersion_cache_path(conc_path)
+        tmp_path = f'{disp_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fw:
+            data.tofile(fw)
+        os.replace(tmp_path, disp_path)
+    except OSError as ex:
+        logging.getLogger(__name__).warning(f'Failed to store dispersion cache of {conc_path}: {ex}')
+
+
+async def calculate_dispersion_bg(args: DispersionCalcArgs) -> List[int]:
+    """
+    Calculate (and cache) dispersion of an existing concordance. This is expected
+    to run on a worker server.
+    """
+    cm = corplib.CorpusFactory(subc_root=args.subcpath)
+    corp = await cm.get_corpus(
+        SubcorpusIdent(id=args.subcname, corpus_name=args.corpname) if args.subcname else args.corpname)
+    conc = await require_existing_conc(corp=corp, q=args.q, cutoff=args.cutoff)
+    abs_freqs = calc_abs_freqs(conc, args.resolution)
+    store_dispersion(conc.get_conc_file(), args.resolution, abs_freqs)
+    return abs_freqs
+
+
+async def get_freq_dispersion(
+        corp: AbstractKCorpus,
+        subcpath: Optional[str],
+        conc: PyConc,
+        q: Tuple[str, ...],
+        cutoff: int,
+        resolution: int) -> List[FreqDispersionBin]:
+    """
+    Get dispersion of a concordance. Cached data are used if available.
+    Otherwise, dispersion of a small concordance is calculated directly
+    and a large one is passed to a background worker.
+    """
+    abs_freqs = find_cached_dispersion(conc.get_conc_file(), resolution)
+    if abs_freqs is None:
+        if conc.size() < BG_CALC_MIN_CONC_SIZE:
+            abs_freqs = await run_manatee(calc_abs_freqs, conc, resolution)
+            store_dispersion(conc.get_conc_file(), resolution, abs_freqs)
+        else:
+            args = DispersionCalcArgs(
+                corpname=corp.corpname, subcname=corp.subcorpus_id, subcpath=subcpath, q=tuple(q),
+                resolution=resolution, cutoff=cutoff)
+            worker = bgcalc.calc_backend_client(settings)
+            res = await worker.send_task(
+                'calculate_dispersion', object.__class__, args=(args,), time_limit=TASK_TIME_LIMIT)
+            abs_freqs = await res.get()
+            if isinstance(abs_freqs, Exception):
+                raise abs_freqs
+            elif abs_freqs is None:
+                raise BgCalcError('Failed to get dispersion result')
+    return export_bins(abs_freqs)
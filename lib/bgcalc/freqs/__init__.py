@@ -31,7 +31,7 @@ import manatee
 import settings
 from action.errors import UserReadableException
 from bgcalc.errors import BgCalcError, UnfinishedConcordanceError
-from bgcalc.freqs.storage import find_cached_result, stored_to_fs
+from bgcalc.freqs.storage import afind_cached_result, stored_to_fs
 from bgcalc.freqs.types import Freq2DCalcArgs, FreqCalcArgs, FreqCalcResult
 from bgcalc.task import AsyncTaskStatus
 from bgcalc.conc import require_existing_conc
@@ -44,6 +44,20 @@ from ..errors import CalcArgsAssertionError
 
 MAX_LOG_FILE_AGE = 1800  # in seconds
 
+MAX_QUEUED_MARKER_AGE = 24 * 3600
+"""
+a queued (low-priority) freq. index calculation which has not started within
+this time (in seconds) is considered lost
+"""
+
+PRECALC_STATUS_READY = 'ready'
+
+PRECALC_STATUS_RUNNING = 'running'
+
+PRECALC_STATUS_QUEUED = 'queued'
+
+PRECALC_STATUS_MISSING = 'missing'
+
 TASK_TIME_LIMIT = settings.get_int('calc_backend', 'task_time_limit', 300)
 
 
@@ -88,6 +102,10 @@ def create_log_path(base_path):
     return f'{base_path}.build'
 
 
+def create_queued_marker_path(base_path):
+    return f'{base_path}.queued'
+
+
 async def get_log_last_line(path):
     async with aiofiles.open(path, 'r') as f:
         s = await f.read()
@@ -172,6 +190,106 @@ async def build_arf_db_status(corp, attrname):
     return await _get_total_calc_status(corp_freqs_cache_paths(corp, attrname).values())
 
 
+def subc_precalc_attrs(corpname: str) -> List[str]:
+    """
+    Return attributes whose freq. indices should be calculated for each new
+    subcorpus of a corpus (see corpora/subc_freqs_precalc_attrs). Items bound
+    to the corpus (via the "corpus" XML attribute) override the general ones.
+    """
+    conf = settings.get_full('corpora', 'subc_freqs_precalc_attrs')
+    if type(conf) is not list:
+        return []
+    corp_items = [attr for attr, meta in conf if meta.get('corpus') == corpname]
+    return corp_items if len(corp_items) > 0 else [attr for attr, meta in conf if not meta.get('corpus')]
+
+
+async def schedule_freq_precalc(corp: AbstractKCorpus) -> List[AsyncTaskStatus]:
+    """
+    Queue calculation of freq. indices (frq, arf, docf) of the attributes configured
+    for a corpus (see subc_precalc_attrs()) as low-priority background tasks
+    (calc_backend/rq_low_priority_queue). For configured structural attributes, sizes
+    of their values are calculated (see corplib.sattr_sizes). This is intended to be called
+    once a subcorpus is created so the data are ready before a user needs them. Failures
+    are only logged as the data can be always built on demand (see build_arf_db()).
+
+    returns:
+    statuses of the freq. indices calculation tasks
+    """
+    precalc_attrs = subc_precalc_attrs(corp.corpname)
+    attrs = [attr for attr in precalc_attrs if attr in corp.get_posattrs()]
+    sattrs = [attr for attr in precalc_attrs if attr in corp.get_structattrs()]
+    if len(attrs) == 0 and len(sattrs) == 0:
+        return []
+    worker = bgcalc.calc_backend_client(settings)
+    queue = settings.get('calc_backend', 'rq_low_priority_queue', None)
+    for sattr in sattrs:
+        try:
+            await worker.send_task(
+                'compile_sattr_sizes', object.__class__, (corp.portable_ident, sattr),
+                time_limit=TASK_TIME_LIMIT, queue=queue)
+        except Exception as ex:
+            logging.getLogger(__name__).error(
+                f'Failed to queue sizes calculation of {corp.corpname}/{sattr}: {ex}')
+    tasks = []
+    for attrname in attrs:
+        for ftype, freq_path in corp_freqs_cache_paths(corp, attrname).items():
+            marker_path = create_queued_marker_path(freq_path)
+            try:
+                # the marker must exist before the task can start (see mark_precalc_started())
+                async with aiofiles.open(marker_path, 'w') as f:
+                    await f.write(f'{time.time()}\n')
+                res = await worker.send_task(
+                    f'compile_{ftype}', object.__class__,
+                    (corp.portable_ident, attrname, create_log_path(freq_path)),
+                    time_limit=TASK_TIME_LIMIT, queue=queue)
+                tasks.append(AsyncTaskStatus(
+                    status=res.status, ident=res.id, category=AsyncTaskStatus.CATEGORY_FREQ_PRECALC,
+                    label=f'{corp.corpname}/{attrname}', args=dict(attrname=attrname, ftype=ftype)))
+            except Exception as ex:
+                logging.getLogger(__name__).error(
+                    f'Failed to queue {ftype} calculation of {corp.corpname}/{attrname}: {ex}')
+                if await aiofiles.os.path.isfile(marker_path):
+                    await aiofiles.os.remove(marker_path)
+    return tasks
+
+
+async def mark_precalc_started(corp: AbstractKCorpus, attrname: str, ftype: str, logfile: str):
+    """
+    Turn a queued freq. index calculation (see schedule_freq_precalc()) into
+    a running one, i.e. remove its queued marker and create its log file
+    (unless some other calculation of the same data is already running).
+    """
+    freq_path = corp.freq_precalc_file(attrname, ftype)
+    try:
+        await aiofiles.os.remove(create_queued_marker_path(freq_path))
+    except FileNotFoundError:
+        return
+    if not await calc_is_running([freq_path]):
+        await write_log_header(corp, logfile)
+
+
+async def freq_precalc_status(corp: AbstractKCorpus, attrname: str) -> str:
+    """
+    Get status of freq. indices of an attribute. This allows telling apart indices
+    being prepared (PRECALC_STATUS_RUNNING, PRECALC_STATUS_QUEUED) from missing ones
+    (PRECALC_STATUS_MISSING) which have to be built on demand.
+    """
+    base_paths = corp_freqs_cache_paths(corp, attrname)
+    if all(is_compiled(corp, attrname, ftype) for ftype in base_paths.keys()):
+        return PRECALC_STATUS_READY
+    if await calc_is_running(base_paths.values()):
+        return PRECALC_STATUS_RUNNING
+    curr_time = time.time()
+    for freq_path in base_paths.values():
+        try:
+            if curr_time - await aiofiles.os.path.getmtime(
+                    create_queued_marker_path(freq_path)) <= MAX_QUEUED_MARKER_AGE:
+                return PRECALC_STATUS_QUEUED
+        except FileNotFoundError:
+            pass  # not queued or already started
+    return PRECALC_STATUS_MISSING
+
+
 def calculate_freqs_bg_sync(args: FreqCalcArgs, corp: AbstractKCorpus, conc: PyConc) -> FreqCalcResult:
     """
     This is a blocking variant of calculate_freqs_bg which requires a concordance
@@ -227,12 +345,14 @@ async def calculate_freqs(args: FreqCalcArgs):
     The class is able to cache the data in a background process/task. This prevents KonText to calculate
     (via Manatee) full frequency list again and again (e.g. if user moves from page to page). The caching
     is in fact crucial as Manatee itself does not support offset in freq. results.
+    Cached results are shared by all the users and sorting is applied to them
+    without recalculation (see bgcalc.freqs.storage).
     """
     if args.fcrit and len(args.fcrit) > 1 and args.fpage > 1:
         raise CalcArgsAssertionError(
             'multi-block frequency calculation does not support pagination')
 
-    calc_result, p = find_cached_result(args)
+    calc_result, p = await afind_cached_result(args, track_stats=True)
     if calc_result is None:
         worker = bgcalc.calc_backend_client(settings)
         res = await worker.send_task(
@@ -248,7 +368,7 @@ async def calculate_freqs(args: FreqCalcArgs):
         elif isinstance(tmp_result, FreqCalcResult):
             calc_result = tmp_result
             if calc_result.fs_stored_data:
-                calc_result, _ = find_cached_result(args)
+                calc_result, _ = await afind_cached_result(args)
                 if calc_result is None:
                     raise BgCalcError('Failed to get expected freqs result')
 
@@ -12,22 +12,42 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
+import glob
 import hashlib
+import mmap
 import os
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, replace
 from functools import wraps
-from typing import Callable, Coroutine, List, Optional, Tuple, TypedDict, Union
+from typing import Callable, Coroutine, List, Optional, Tuple, TypedDict, Union, cast
 import logging
 
 import settings
 import ujson as json
 from bgcalc.errors import BgCalcError
 from bgcalc.freqs.types import FreqCalcArgs, FreqCalcResult
-from conclib.freq import FreqData, FreqItem
+from conclib.freq import FreqData, FreqItem, sort_freq_items
 from dataclasses_json import dataclass_json
+from util import as_async
 
 MAX_DATA_LEN_DIRECT_PROVIDING = 10
 
+INDEX_STRIDE = 64
+"""
+Each INDEX_STRIDE-th row of a block has its byte offset stored in the page index
+"""
+
+STORED_SORT = 'freq'
+"""
+Cached results are always stored sorted by this key, other sortings
+are provided via sort indices (see _write_sort_index())
+"""
+
+STATS_LOG_INTERVAL = 100
+"""
+Cache lookup statistics are logged each STATS_LOG_INTERVAL-th lookup
+"""
+
 
 def _cache_dir_path(args: FreqCalcArgs) -> str:
     return os.path.join(settings.get('corpora', 'freqs_cache_dir'), args.corpname)
@@ -48,21 +68,58 @@ def norm_list(v: Union[Tuple, List]) -> List:
 
 
 def _cache_file_path(args: FreqCalcArgs):
+    """
+    Generate a path of a cached result. Only the arguments affecting the data
+    are used - i.e. users share the results and sorting is applied on the cached data
+    (see find_cached_result()).
+    """
     v = ''.join([
         str(args.corpname),
         str(args.subcname),
-        str(args.user_id),
         ''.join(norm_list(args.q)),
         str(norm_list(args.fcrit)),
         str(args.flimit),
-        str(args.freq_sort),
         str(args.rel_mode),
-        str(args.collator_locale),
     ])
     filename = '{}.jsonl'.format(hashlib.sha1(v.encode('utf-8')).hexdigest())
     return os.path.join(_cache_dir_path(args), filename)
 
 
+def _index_file_path(cache_path: str) -> str:
+    return os.path.splitext(cache_path)[0] + '.idx'
+
+
+def _sort_index_file_path(cache_path: str, freq_sort: str, collator_locale: str) -> Optional[str]:
+    """
+    Return a path of a sort index file or None in case the freq_sort
+    matches the order of the stored data.
+    """
+    if freq_sort == 'rel':
+        return os.path.splitext(cache_path)[0] + '.rel.sidx'
+    try:
+        return os.path.splitext(cache_path)[0] + f'.{int(freq_sort)}.{collator_locale}.sidx'
+    except (ValueError, TypeError):
+        return None
+
+
+def _sort_index_file_paths(cache_path: str) -> List[str]:
+    return glob.glob(glob.escape(os.path.splitext(cache_path)[0]) + '.*.sidx')
+
+
+def _tmp_file_path(path: str) -> str:
+    return f'{path}.{os.getpid()}.tmp'
+
+
+def _data_version(fr) -> List[int]:
+    """
+    Return a version (modification time, size) of an opened cached result file.
+    Indices store the version of the data they were created for so that
+    a stale index is never used with recalculated data.
+    """
+    st = os.fstat(fr.fileno())
+    return [st.st_mtime_ns, st.st_size]
+
+
 class _Head(TypedDict):
     n: str
     s: str
@@ -83,32 +140,277 @@ class BlockMetadata:
 class CommonMetadata:
     num_blocks: int
     conc_size: int
+    # the following attributes describe the request the result was calculated for
+    user_id: Optional[int] = None
+    freq_sort: Optional[str] = None
+
+
+class _LookupStats:
+    """
+    Cache lookup statistics. Besides the overall hit ratio, it also watches
+    how many hits come from results calculated for a different user or
+    with a different sorting (i.e. hits which would be misses in case the user
+    and the sorting were part of the cache key).
+    """
+
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.other_user_hits = 0
+        self.other_sort_hits = 0
+
+    def add(self, args: FreqCalcArgs, common_md: Optional[CommonMetadata]):
+        self.lookups += 1
+        if common_md is not None:
+            self.hits += 1
+            if common_md.user_id != args.user_id:
+                self.other_user_hits += 1
+            if common_md.freq_sort != args.freq_sort:
+                self.other_sort_hits += 1
+        if self.lookups % STATS_LOG_INTERVAL == 0:
+            logging.getLogger(__name__).info({
+                'type': 'freq_cache_stats',
+                'lookups': self.lookups,
+                'hit_ratio': self.hits / self.lookups,
+                'other_user_hit_ratio': self.other_user_hits / self.lookups,
+                'other_sort_hit_ratio': self.other_sort_hits / self.lookups,
+            })
+
 
+_lookup_stats = _LookupStats()
 
-def find_cached_result(args: FreqCalcArgs) -> Tuple[Optional[FreqCalcResult], str]:
+
+def _load_common_md(raw_line) -> CommonMetadata:
+    return CommonMetadata.from_dict(json.loads(raw_line))  # type: ignore[attr-defined]
+
+
+def _load_block_md(raw_line) -> BlockMetadata:
+    return BlockMetadata.from_dict(json.loads(raw_line))  # type: ignore[attr-defined]
+
+
+def _load_freq_item(raw_line) -> FreqItem:
+    return FreqItem.from_dict(json.loads(raw_line))  # type: ignore[attr-defined]
+
+
+def _read_block_items(fr, block_md: BlockMetadata, first_line: int, last_line: int) -> List[FreqItem]:
+    """
+    Read block items within the [first_line, last_line] range. The file
+    must be positioned at the first row of the block. After the function
+    returns, the file is positioned at the next block metadata line.
+    """
+    ans = []
+    for i in range(block_md.size):
+        raw_line = fr.readline()
+        if first_line <= i <= last_line:
+            ans.append(_load_freq_item(raw_line))
+    return ans
+
+
+def _read_indexed_block_items(
+        fr, index: memoryview, index_pos: int, block_md: BlockMetadata,
+        first_line: int, last_line: int) -> List[FreqItem]:
+    """
+    Read block items within the [first_line, last_line] range using
+    a page index (see _write_index()) to seek to the nearest indexed row.
+    """
+    ans: List[FreqItem] = []
+    if first_line >= block_md.size:
+        return ans
+    fr.seek(index[index_pos + first_line // INDEX_STRIDE])
+    for i in range((first_line // INDEX_STRIDE) * INDEX_STRIDE, min(block_md.size, last_line + 1)):
+        raw_line = fr.readline()
+        if i >= first_line:
+            ans.append(_load_freq_item(raw_line))
+    return ans
+
+
+def _write_index(
+        index_path: str, data_version: List[int], block_offsets: List[int], row_offsets: List[array]):
+    """
+    Write a page index of a cached freq. result. The index is a flat array of 64-bit
+    integers with the following layout:
+    [INDEX_STRIDE, data_mtime_ns, data_size, num_blocks, block_1_md_offset, ..., block_N_md_offset,
+     block_1_row_0_offset, block_1_row_{INDEX_STRIDE}_offset, ..., block_N_row_0_offset, ...]
+    """
+    index = array('q', [INDEX_STRIDE, *data_version, len(block_offsets)])
+    index.extend(block_offsets)
+    for offsets in row_offsets:
+        index.extend(offsets)
+    tmp_path = _tmp_file_path(index_path)
+    with open(tmp_path, 'wb') as fw:
+        index.tofile(fw)
+    os.replace(tmp_path, index_path)
+
+
+def _load_with_index(
+        fr, index: memoryview, common_md: CommonMetadata, first_line: int, last_line: int) -> FreqCalcResult:
+    freqs: List[FreqData] = []
+    num_blocks = index[3]
+    index_pos = 4 + num_blocks
+    for b in range(num_blocks):
+        fr.seek(index[4 + b])
+        block_md = _load_block_md(fr.readline())
+        items = _read_indexed_block_items(fr, index, index_pos, block_md, first_line, last_line)
+        freqs.append(FreqData(
+            Head=[dict(h) for h in block_md.head], Items=items, SkippedEmpty=block_md.skipped_empty,
+            NoRelSorting=block_md.no_rel_sorting, Size=block_md.size))
+        index_pos += (block_md.size + INDEX_STRIDE - 1) // INDEX_STRIDE
+    return FreqCalcResult(freqs=freqs, conc_size=common_md.conc_size)
+
+
+def _write_sort_index(cache_path: str, sort_index_path: str, freq_sort: str, collator_locale: str):
+    """
+    Write a sort index of a cached freq. result. The index is a flat array of 64-bit
+    integers containing row byte offsets of each block in the required order:
+    [data_mtime_ns, data_size, num_blocks, block_1_md_offset, ..., block_N_md_offset,
+     block_1_size, ..., block_N_size, block_1_offsets..., ..., block_N_offsets...]
+
+    Sorting requires reading the whole result so this should not run on the event loop
+    (see stored_to_fs() and afind_cached_result()).
+    """
+    block_offsets = []
+    block_sizes = []
+    row_offsets = array('q')
+    with open(cache_path, 'rb') as fr:
+        data_version = _data_version(fr)
+        common_md = _load_common_md(fr.readline())
+        for _ in range(common_md.num_blocks):
+            block_offsets.append(fr.tell())
+            block_md = _load_block_md(fr.readline())
+            rows = []
+            for _ in range(block_md.size):
+                offset = fr.tell()
+                rows.append((offset, _load_freq_item(fr.readline())))
+            block_sizes.append(block_md.size)
+            row_offsets.extend(
+                offset for offset, _ in sort_freq_items(rows, freq_sort, collator_locale, lambda v: v[1]))
+    index = array('q', [*data_version, common_md.num_blocks])
+    index.extend(block_offsets)
+    index.extend(block_sizes)
+    index.extend(row_offsets)
+    tmp_path = _tmp_file_path(sort_index_path)
+    with open(tmp_path, 'wb') as fw:
+        index.tofile(fw)
+    os.replace(tmp_path, sort_index_path)
+
+
+def _load_with_sort_index(
+        fr, index: memoryview, common_md: CommonMetadata, first_line: int, last_line: int) -> FreqCalcResult:
+    freqs: List[FreqData] = []
+    num_blocks = index[2]
+    index_pos = 3 + 2 * num_blocks
+    for b in range(num_blocks):
+        fr.seek(index[3 + b])
+        block_md = _load_block_md(fr.readline())
+        items = []
+        for i in range(first_line, min(block_md.size, last_line + 1)):
+            fr.seek(index[index_pos + i])
+            items.append(_load_freq_item(fr.readline()))
+        freqs.append(FreqData(
+            Head=[dict(h) for h in block_md.head], Items=items, SkippedEmpty=block_md.skipped_empty,
+            NoRelSorting=block_md.no_rel_sorting, Size=block_md.size))
+        index_pos += index[2 + num_blocks + b]
+    return FreqCalcResult(freqs=freqs, conc_size=common_md.conc_size)
+
+
+def _load_sorted_result(
+        cache_path: str, sort_index_path: str,
+        first_line: int, last_line: int) -> Optional[Tuple[CommonMetadata, FreqCalcResult]]:
+    """
+    Load a page of a cached result using a sort index. In case the index
+    is missing or it does not match the data, None is returned.
+    """
+    try:
+        fi = open(sort_index_path, 'rb')
+    except FileNotFoundError:
+        return None
+    with open(cache_path, 'rb') as fr, fi:
+        if os.fstat(fi.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = memoryview(mm).cast('q')
+            try:
+                if index[0:2].tolist() != _data_version(fr):
+                    return None
+                common_md = _load_common_md(fr.readline())
+                return common_md, _load_with_sort_index(fr, index, common_md, first_line, last_line)
+            finally:
+                index.release()
+
+
+def _find_sorted_result(
+        args: FreqCalcArgs, cache_path: str, sort_index_path: str,
+        first_line: int, last_line: int) -> Tuple[CommonMetadata, FreqCalcResult]:
+    ans = _load_sorted_result(cache_path, sort_index_path, first_line, last_line)
+    if ans is None:
+        _write_sort_index(cache_path, sort_index_path, args.freq_sort, args.collator_locale)
+        ans = _load_sorted_result(cache_path, sort_index_path, first_line, last_line)
+        if ans is None:
+            raise BgCalcError(f'Cached freq. result {cache_path} changed while being sorted')
+    return ans
+
+
+def find_cached_result(args: FreqCalcArgs, track_stats: bool = False) -> Tuple[Optional[FreqCalcResult], str]:
+    """
+    Load a page of a cached freq. result. If there is a page index available
+    (see stored_to_fs), the function seeks directly to the first row of the page.
+    Otherwise, all the rows before the page must be read.
+
+    Results are stored sorted by frequency. For other sortings, a sort index
+    containing row offsets in the required order is used to load the pages. The index
+    is created by the worker along with the result (for the requested sorting) or with
+    the first request for a different sorting. As the function may need to read
+    (and sort) the whole result, an event loop should use afind_cached_result().
+
+    arguments:
+    args -- freq. calculation arguments
+    track_stats -- if True, the lookup is included in cache lookup statistics; this should
+                   be set only where a user request enters (see calculate_freqs()) so a single
+                   miss is not counted also by the worker (see stored_to_fs())
+    """
     cache_path = _cache_file_path(args)
-    if os.path.exists(cache_path):
-        with open(cache_path, 'r') as fr:
-            common_md = CommonMetadata.from_dict(json.loads(fr.readline()))
-            data = FreqCalcResult(freqs=[], conc_size=common_md.conc_size)
-            blocks = common_md.num_blocks
-            first_line = (args.fpage - 1) * args.fpagesize
-            last_line = first_line + args.fpagesize - 1
-            for _ in range(blocks):
-                block_md = BlockMetadata.from_dict(json.loads(fr.readline()))
-                freq = FreqData(
-                    Head=block_md.head, Items=[], SkippedEmpty=block_md.skipped_empty,
-                    NoRelSorting=block_md.no_rel_sorting, Size=block_md.size)
-                for i in range(block_md.size):
-                    raw_line = fr.readline()
-                    if i < first_line:
-                        continue
-                    if i > last_line:
-                        break
-                    freq.Items.append(FreqItem.from_dict(json.loads(raw_line)))
-                data.freqs.append(freq)
-        return data, cache_path
-    return None, cache_path
+    if not os.path.exists(cache_path):
+        if track_stats:
+            _lookup_stats.add(args, None)
+        return None, cache_path
+    first_line = (args.fpage - 1) * args.fpagesize
+    last_line = first_line + args.fpagesize - 1
+    sort_index_path = _sort_index_file_path(cache_path, args.freq_sort, args.collator_locale)
+    if sort_index_path is not None:
+        common_md, data = _find_sorted_result(args, cache_path, sort_index_path, first_line, last_line)
+    else:
+        index_path = _index_file_path(cache_path)
+        with open(cache_path, 'rb') as fr:
+            common_md = _load_common_md(fr.readline())
+            data = None
+            if os.path.exists(index_path) and os.path.getsize(index_path) > 0:
+                with open(index_path, 'rb') as fi, mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    index = memoryview(mm).cast('q')
+                    try:
+                        if (index[0] == INDEX_STRIDE and index[1:3].tolist() == _data_version(fr)
+                                and index[3] == common_md.num_blocks):
+                            data = _load_with_index(fr, index, common_md, first_line, last_line)
+                    finally:
+                        index.release()
+            if data is None:
+                freqs: List[FreqData] = []
+                for _ in range(common_md.num_blocks):
+                    block_md = _load_block_md(fr.readline())
+                    freqs.append(FreqData(
+                        Head=[dict(h) for h in block_md.head],
+                        Items=_read_block_items(fr, block_md, first_line, last_line),
+                        SkippedEmpty=block_md.skipped_empty, NoRelSorting=block_md.no_rel_sorting,
+                        Size=block_md.size))
+                data = FreqCalcResult(freqs=freqs, conc_size=common_md.conc_size)
+    if track_stats:
+        _lookup_stats.add(args, common_md)
+    return data, cache_path
+
+
+afind_cached_result = as_async(find_cached_result)
+"""
+find_cached_result() running in a thread pool (i.e. without blocking the event loop)
+"""
 
 
 def stored_to_fs(func: Callable[[FreqCalcArgs], Coroutine[None, None, FreqCalcResult]]):
@@ -119,6 +421,8 @@ def stored_to_fs(func: Callable[[FreqCalcArgs], Coroutine[None, None, FreqCalcRe
     Please note that the function also checks for data size (num. of result rows) and in case it is
     more than MAX_DATA_LEN_DIRECT_PROVIDING, it sets the result to None (attr `freqs`) and instead
     sets the `data_path` argument so client can read the data directly from a corresponding file.
+    The data are always calculated and stored sorted by STORED_SORT, other sortings are
+    applied when reading the data.
     """
     @wraps(func)
     async def wrapper(args: FreqCalcArgs) -> FreqCalcResult:
@@ -131,27 +435,54 @@ def stored_to_fs(func: Callable[[FreqCalcArgs], Coroutine[None, None, FreqCalcRe
                 os.makedirs(cache_dir)
                 os.chmod(cache_dir, 0o775)
 
-            data: FreqCalcResult = await func(args)
-            with open(cache_path, 'w') as bw:
-                common_md = CommonMetadata(num_blocks=len(data.freqs), conc_size=data.conc_size)
-                bw.write(json.dumps(common_md.to_dict()) + '\n')
+            data = await func(replace(args, freq_sort=STORED_SORT))
+            index_path = _index_file_path(cache_path)
+            # stale indices would not be used with new data anyway (see _data_version())
+            for path in [index_path] + _sort_index_file_paths(cache_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+            block_offsets = []
+            row_offsets = []
+            # readers must never see partially written data
+            if data.freqs is None:
+                raise BgCalcError('FreqCalcResult instance does not provide direct data')
+            tmp_path = _tmp_file_path(cache_path)
+            with open(tmp_path, 'wb') as bw:
+                common_md = CommonMetadata(
+                    num_blocks=len(data.freqs), conc_size=data.conc_size, user_id=args.user_id,
+                    freq_sort=args.freq_sort)
+                bw.write(json.dumps(common_md.to_dict()).encode('utf-8') + b'\n')
                 max_len = 0
-                if data.freqs is None:
-                    raise BgCalcError('FreqCalcResult instance does not provide direct data')
                 for block in data.freqs:
                     data_len = len(block.Items)
                     if data_len > max_len:
                         max_len = data_len
                     block_md = BlockMetadata(
-                        head=[_Head(**x) for x in block.Head],
+                        head=[cast(_Head, dict(x)) for x in block.Head],
                         skipped_empty=block.SkippedEmpty,
                         no_rel_sorting=block.NoRelSorting,
                         size=data_len)
-                    bw.write(json.dumps(block_md.to_dict()) + '\n')
-                    for item in block.Items:
-                        bw.write(json.dumps(item.to_dict()) + '\n')
-                if data_len >= MAX_DATA_LEN_DIRECT_PROVIDING:
-                    data.fs_stored_data = True
-                    data.freqs = None
+                    block_offsets.append(bw.tell())
+                    bw.write(json.dumps(block_md.to_dict()).encode('utf-8') + b'\n')
+                    offsets = array('q')
+                    for i, item in enumerate(block.Items):
+                        if i % INDEX_STRIDE == 0:
+                            offsets.append(bw.tell())
+                        bw.write(json.dumps(item.to_dict()).encode('utf-8') + b'\n')  # type: ignore[attr-defined]
+                    row_offsets.append(offsets)
+                bw.flush()
+                data_version = _data_version(bw)
+            os.replace(tmp_path, cache_path)
+            _write_index(index_path, data_version, block_offsets, row_offsets)
+            sort_index_path = _sort_index_file_path(cache_path, args.freq_sort, args.collator_locale)
+            if sort_index_path is not None:
+                # the requested sorting is likely to be requested again (e.g. other pages)
+                _write_sort_index(cache_path, sort_index_path, args.freq_sort, args.collator_locale)
+            if data_len >= MAX_DATA_LEN_DIRECT_PROVIDING:
+                data.fs_stored_data = True
+                data.freqs = None
+            elif args.freq_sort != STORED_SORT:
+                for block in data.freqs:
+                    block.Items = sort_freq_items(block.Items, args.freq_sort, args.collator_locale)
         return data
     return wrapper
@@ -73,7 +73,8 @@ async def calc_merged_freqs(
     Calculate paradigmatic query providing existing concordances. Althought the calculation
     consists of multiple independent freq. distrib. calculations, several tests have shown
     that there is almost no gain from running the calculations in parallel. So we stick with
-    async Tasks by default. But for testing/benchmarking purposes, there are also some
+    async Tasks by default. A process pool based variant (see the 'procpool' module) can be
+    enabled via calc_backend.pquery_calc_mode. For testing/benchmarking purposes, there are also some
     alternative implementations is the 'extra' package.
 
     pquery --
@@ -0,0 +1,257 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A process pool based implementation of paradigmatic query calculation. Individual
+freq. distributions (= branches) are calculated in parallel by a bounded pool
+of processes so the calculation is not limited by the GIL. The pool processes
+are spawned (not forked) and each of them initializes its own plug-ins and event loop
+so no connections are shared with the parent process.
+
+As spawning a process is expensive, the pool is meant to be reused between jobs, i.e.
+it can be used only by a non-forking ("warm") worker (calc_backend/rq_warm_worker).
+A forking worker would create a new pool (and start new interpreters) for each job
+(see can_use_procpool()).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple, cast
+
+import settings
+from action.argmapping.pquery import PqueryFormArgs
+from bgcalc.errors import BgCalcError
+from bgcalc.freqs import FreqCalcArgs, calculate_freqs_bg
+from bgcalc.freqs.storage import find_cached_result
+from bgcalc.pquery import SUBTASK_TIMEOUT_SECS, create_freq_calc_args, extract_freqs
+from bgcalc.pquery.storage import stored_to_fs
+from util import runs_on_persistent_loop
+
+DEFAULT_MAX_PROCS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+_process_loop: Optional[asyncio.AbstractEventLoop] = None
+"""
+An event loop of a pool process. It is kept for the whole lifetime of the process
+as plug-ins' connections are bound to the loop they were created in.
+"""
+
+
+def _init_process():
+    global _process_loop
+    from action.plugin import initializer
+
+    if settings.get('global', 'manatee_path', None):
+        sys.path.insert(0, settings.get('global', 'manatee_path'))
+    os.environ['MANATEE_REGISTRY'] = settings.get('corpora', 'manatee_registry')
+    initializer.init_plugin('getlang')
+    initializer.init_plugin('db')
+    initializer.init_plugin('integration_db')
+    initializer.init_plugin('auth')
+    initializer.init_plugin('conc_cache')
+    _process_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_process_loop)
+
+
+async def _calc_freqs(args: FreqCalcArgs) -> List[Tuple[str, int]]:
+    result = await calculate_freqs_bg(args)
+    if result.fs_stored_data:
+        result, _ = find_cached_result(args)
+        if result is None:
+            raise BgCalcError('Failed to get expected freqs result')
+    return extract_freqs(result)
+
+
+def _calc_branch(args: FreqCalcArgs) -> Tuple[List[Tuple[str, int]], float, int]:
+    """
+    Calculate a freq. distribution of a single branch (runs within a pool process).
+
+    returns:
+    a 3-tuple (list of (value, freq) pairs, calculation time, process ID)
+    """
+    if _process_loop is None:
+        raise BgCalcError('Pool process not initialized')
+    t0 = time.monotonic()
+    ans = _process_loop.run_until_complete(_calc_freqs(args))
+    return ans, time.monotonic() - t0, os.getpid()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.get_int('calc_backend', 'pquery_max_procs', DEFAULT_MAX_PROCS),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process)
+    return _pool
+
+
+def _drop_pool(terminate: bool = False):
+    """
+    Shut down the current pool (a new one is created with the next request).
+
+    arguments:
+    terminate -- if True, the pool processes are terminated (this
+                 is the only way how to stop calculations in progress)
+    """
+    global _pool
+    if _pool is not None:
+        processes = list(_pool._processes.values()) if terminate and _pool._processes else []
+        _pool.shutdown(wait=False, cancel_futures=True)
+        for proc in processes:
+            proc.terminate()
+        _pool = None
+
+
+def shutdown_pool():
+    """
+    Terminate the pool processes (if any). This must be called before the current
+    process is replaced via exec as the pool processes would be orphaned otherwise.
+    """
+    _drop_pool(terminate=True)
+
+
+def can_use_procpool() -> bool:
+    """
+    Test whether the process pool can be reused between jobs, i.e. whether
+    the current job runs within a non-forking worker.
+    """
+    return runs_on_persistent_loop()
+
+
+@stored_to_fs
+async def calc_merged_freqs_procpool(
+        _,
+        pquery: PqueryFormArgs,
+        raw_queries: Dict[str, List[str]],
+        subcpath: str,
+        user_id: int,
+        collator_locale: str):
+    """
+    Calculate paradigmatic query providing existing concordances. All the freq. distributions
+    are submitted to the process pool at once and their results are merged as soon as they
+    are available.
+
+    pquery --
+    raw_queries -- a mapping between conc_id and actual query understood by Manatee
+    subcpath -- a root path to user subcorpora
+    user_id -- user ID
+    collator_locale -- a locale used for collation within the current corpus
+    """
+    t0 = time.monotonic()
+    # branch type ('specif', 'cond1', 'cond2'), index within the type, conc_id
+    branches: List[Tuple[str, int, str]] = []
+    branch_args: List[FreqCalcArgs] = []
+    for i, conc_id in enumerate(pquery.conc_ids):
+        branches.append(('specif', i, conc_id))
+        branch_args.append(create_freq_calc_args(
+            pquery=pquery, conc_id=conc_id, raw_queries=raw_queries, subcpath=subcpath, user_id=user_id,
+            collator_locale=collator_locale))
+    # auxiliary data for the "(almost) never" condition
+    if pquery.conc_subset_complements:
+        for i, conc_id in enumerate(pquery.conc_subset_complements.conc_ids):
+            branches.append(('cond1', i, conc_id))
+            branch_args.append(create_freq_calc_args(
+                pquery=pquery, conc_id=conc_id, raw_queries=raw_queries, subcpath=subcpath, user_id=user_id,
+                collator_locale=collator_locale, flimit_override=1))
+    # auxiliary data (the superset here) for the "(almost) always" condition
+    if pquery.conc_superset:
+        branches.append(('cond2', 0, pquery.conc_superset.conc_id))
+        branch_args.append(create_freq_calc_args(
+            pquery=pquery, conc_id=pquery.conc_superset.conc_id, raw_queries=raw_queries, subcpath=subcpath,
+            user_id=user_id, collator_locale=collator_locale))
+
+    async def run_branch(idx: int):
+        result = await loop.run_in_executor(pool, _calc_branch, branch_args[idx])
+        return idx, result
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    num_specif = len(pquery.conc_ids)
+    merged: Dict[str, List[Optional[int]]] = defaultdict(lambda: [None] * num_specif)
+    complements: Dict[str, int] = defaultdict(lambda: 0)
+    cond2_freqs: Dict[str, int] = defaultdict(lambda: 0)
+    timings = []
+    tasks = [asyncio.create_task(run_branch(i)) for i in range(len(branches))]
+    try:
+        # merge partial results as soon as they are available
+        for next_done in asyncio.as_completed(tasks, timeout=SUBTASK_TIMEOUT_SECS):
+            idx, (freqs, calc_time, pid) = await next_done
+            branch_type, type_idx, conc_id = branches[idx]
+            t1 = time.monotonic()
+            if branch_type == 'specif':
+                for word, freq in freqs:
+                    merged[word][type_idx] = freq
+            elif branch_type == 'cond1':
+                for word, freq in freqs:
+                    complements[word] += freq
+            else:
+                for word, freq in freqs:
+                    cond2_freqs[word] = freq
+            timings.append(dict(
+                branch=branch_type, conc_id=conc_id, pid=pid, calc_time=round(calc_time, 3),
+                merge_time=round(time.monotonic() - t1, 3), finished_at=round(t1 - t0, 3)))
+    except BrokenProcessPool:
+        _drop_pool()
+        raise
+    except asyncio.TimeoutError:
+        # the processes would keep calculating the abandoned branches
+        _drop_pool(terminate=True)
+        raise BgCalcError(f'Paradigmatic query calculation timed out (limit {SUBTASK_TIMEOUT_SECS}s)')
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # all the realizations must be present
+    complete: Dict[str, List[int]] = {
+        w: cast(List[int], freqs) for w, freqs in merged.items() if None not in freqs}
+
+    if pquery.conc_subset_complements:
+        # filter out values with too high ratio of "opposite examples"
+        for k in [k2 for k2 in complete.keys() if k2 in complements]:
+            ratio = complements[k] / (sum(complete[k]) + complements[k])
+            if ratio * 100 > pquery.conc_subset_complements.max_non_matching_ratio:
+                del complete[k]
+
+    if pquery.conc_superset:
+        # filter out values found as extra instances too many times in the superset
+        for k in list(complete.keys()):
+            if cond2_freqs[k] == 0:  # => not in superset
+                del complete[k]
+            elif cond2_freqs[k] > sum(complete[k]):  # if there are extra instances in the superset
+                ratio = 100 - sum(complete[k]) / cond2_freqs[k] * 100
+                if ratio > pquery.conc_superset.max_non_matching_ratio:
+                    del complete[k]
+
+    items = [
+        (w, ) + tuple(freq) for w, freq in sorted(complete.items(), key=lambda v: sum(v[1]), reverse=True)]
+    logging.getLogger(__name__).info({
+        'type': 'pquery_timings',
+        'corpname': pquery.corpname,
+        'total_time': round(time.monotonic() - t0, 3),
+        'branches': timings,
+    })
+    total_row = [('total', len(items)) + tuple(None for _ in range(len(pquery.conc_ids) - 1))]
+    return total_row + items
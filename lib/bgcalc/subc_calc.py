@@ -20,6 +20,8 @@ import aiofiles.os
 import conclib.search
 import corplib
 import plugins
+import settings
+from bgcalc.freqs import schedule_freq_precalc
 from action.argmapping.subcorpus import (
     CreateSubcorpusArgs, CreateSubcorpusRawCQLArgs, CreateSubcorpusWithinArgs)
 from corplib.abstract import SubcorpusIdent
@@ -75,4 +77,9 @@ class CreateSubcorpusTask:
                 size=conc.size(),
                 public_description=specification.description,
                 data=specification)
+        try:
+            cf = corplib.CorpusFactory(subc_root=settings.get('corpora', 'subcorpora_dir'))
+            await schedule_freq_precalc(await cf.get_corpus(subcorpus_id, no_cache_read=True))
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'Failed to schedule freq. data precalculation: {ex}')
         return ans
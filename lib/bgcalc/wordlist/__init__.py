@@ -16,7 +16,7 @@ import hashlib
 import os
 import sys
 from functools import wraps
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 
 import aiofiles
 import aiofiles.os
@@ -26,7 +26,7 @@ import ujson as json
 from action.argmapping.wordlist import WordlistFormArgs
 from bgcalc.jsonl_cache import load_cached_full, load_cached_partial
 from bgcalc.wordlist.errors import WordlistResultNotFound
-from corplib import frq_db
+from corplib import FrqView, frq_db
 from corplib.corpus import AbstractKCorpus
 from manatee import Structure  # TODO wrap this out
 
@@ -140,7 +140,8 @@ def doc_sizes(corp: AbstractKCorpus, struct: Structure, attrname: str, i: int, n
     return cnt
 
 
-async def get_attrfreq(corp: AbstractKCorpus, attr, wlattr, wlnums):
+async def get_attrfreq(corp: AbstractKCorpus, attr, wlattr, wlnums) -> Union[Dict[int, int], FrqView]:
+    attrfreq: Union[Dict[int, int], FrqView]
     if '.' in wlattr:  # attribute of a structure
         struct = corp.get_struct(wlattr.split('.')[0])
         if wlnums == 'doc sizes':
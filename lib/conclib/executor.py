@@ -0,0 +1,138 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A size-limited thread pool for blocking Manatee calls (concordance
+synchronization, KWIC lines generation, sorting, saving etc.). Running
+these on the event loop would block all the other requests handled by
+the same process.
+
+A process pool is not an option here as Manatee objects (corpora,
+concordances) cannot be passed between processes. Corpus handles are
+shared by requests (see corplib.handles) and they are used both by the event
+loop thread and by the pool threads. The calls are not serialized per corpus
+(a slow concordance would block all the other requests for the corpus and
+waiting calls would occupy all the pool threads). Instead, code changing
+the state of a shared handle (e.g. AbstractKCorpus.set_default_attr) must hold
+the corpus lock (AbstractKCorpus.manatee_lock) only for the time the state is
+changed (see conclib.pyconc.PyConc). Please also note that concordance objects
+are not shared, but a single one should not be used again before the previous
+call on it is awaited.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import settings
+
+DEFAULT_NUM_WORKERS = 4
+
+SLOW_WAIT_LOG_THRESHOLD = 1.0
+"""
+wait time (in seconds) for a free worker thread considered worth logging
+"""
+
+T = TypeVar('T')
+
+
+@dataclass
+class ExecutorStats:
+    calls: int = 0
+    queued: int = 0
+    running: int = 0
+    max_queued: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+    total_run: float = 0
+
+
+class ManateeExecutor:
+    """
+    ManateeExecutor runs blocking functions in a dedicated thread pool
+    and collects data about queue depth and wait times so the pool
+    can be sized properly.
+    """
+
+    def __init__(self, num_workers: int):
+        self._num_workers = num_workers
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='manatee')
+        self._stats = ExecutorStats()
+        self._lock = threading.Lock()
+
+    def _run_tracked(self, submitted: float, fn: Callable[[], T]) -> T:
+        started = time.monotonic()
+        wait = started - submitted
+        with self._lock:
+            self._stats.queued -= 1
+            self._stats.running += 1
+            self._stats.total_wait += wait
+            self._stats.max_wait = max(self._stats.max_wait, wait)
+        if wait >= SLOW_WAIT_LOG_THRESHOLD:
+            logging.getLogger(__name__).warning(
+                f'Manatee call {getattr(fn, "func", fn)} waited {wait:.2f}s for a free worker, stats: {self.stats()}')
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._stats.running -= 1
+                self._stats.total_run += time.monotonic() - started
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking function in the pool and wait for its result.
+        """
+        with self._lock:
+            self._stats.calls += 1
+            self._stats.queued += 1
+            self._stats.max_queued = max(self._stats.max_queued, self._stats.queued)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._run_tracked, time.monotonic(), partial(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ans = asdict(self._stats)
+        ans['num_workers'] = self._num_workers
+        ans['avg_wait'] = ans['total_wait'] / ans['calls'] if ans['calls'] > 0 else 0
+        return ans
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = ExecutorStats(queued=self._stats.queued, running=self._stats.running)
+
+
+_executor: Optional[ManateeExecutor] = None
+
+
+def get_manatee_executor() -> ManateeExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ManateeExecutor(
+            settings.get_int('corpora', 'manatee_executor_size', DEFAULT_NUM_WORKERS))
+    return _executor
+
+
+async def run_manatee(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking Manatee-related function without blocking the event loop.
+    """
+    return await get_manatee_executor().run(fn, *args, **kwargs)
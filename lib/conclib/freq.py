@@ -15,8 +15,9 @@
 
 from dataclasses import dataclass
 from dataclasses_json import dataclass_json
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, TypeVar
 
+import l10n
 from action.argmapping.action import IntOpt, StrOpt
 
 
@@ -39,6 +40,35 @@ class FreqData:
     Items: List[FreqItem]
 
 
+T = TypeVar('T')
+
+
+def sort_freq_items(
+        items: List[T], sortkey: str, collator_locale: str,
+        get_item: Callable[[Any], FreqItem] = lambda v: v) -> List[T]:
+    """
+    Sort frequency distribution items. The sortkey is either an index of a column
+    (items are sorted alphabetically according to the locale) or one of 'freq', 'rel'
+    (items are sorted in descending order). Unknown keys are treated as 'freq'.
+
+    arguments:
+    items -- items to be sorted (FreqItem instances or any values wrapping them)
+    sortkey -- a column index or a numeric value to sort by
+    collator_locale -- a locale used for sorting by columns
+    get_item -- a function extracting a FreqItem from an item
+    """
+    try:
+        int_sortkey = int(sortkey)
+    except (ValueError, TypeError):
+        int_sortkey = None
+
+    if int_sortkey is not None and len(items) > 0 and 0 <= int_sortkey < len(get_item(items[0]).Word):
+        return l10n.sort(items, loc=collator_locale, key=lambda v: get_item(v).Word[int_sortkey]['n'])
+    if sortkey not in ('freq', 'rel'):
+        sortkey = 'freq'
+    return sorted(items, key=lambda v: getattr(get_item(v), sortkey), reverse=True)
+
+
 @dataclass
 class MLFreqArgs:
 
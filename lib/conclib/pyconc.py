@@ -21,12 +21,12 @@ import logging
 import os
 import re
 from sys import stderr
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Mapping, Tuple
 
-import l10n
 import manatee
-from conclib.freq import FreqData, FreqItem
+from conclib.freq import FreqData, FreqItem, sort_freq_items
 from corplib.corpus import AbstractKCorpus
+from corplib.sattr_sizes import get_sattr_sizes
 from kwiclib.common import lngrp_sortcrit
 from strings import escape_attr_val
 
@@ -106,14 +106,22 @@ class PyConc(manatee.Concordance):
         self._conc_file = None
         try:
             if action == 'q':
-                manatee.Concordance.__init__(
-                    self, corp.unwrap(), params, sample_size, full_size)
+                # the shared Manatee corpus object (see corplib.handles) must not have its default
+                # attribute temporarily changed by an 'a' query at the same time
+                with corp.manatee_lock:
+                    manatee.Concordance.__init__(
+                        self, corp.unwrap(), params, sample_size, full_size)
             elif action == 'a':
                 # query with a default attribute
                 default_attr, query = params.split(',', 1)
-                corp.set_default_attr(default_attr)
-                manatee.Concordance.__init__(
-                    self, corp.unwrap(), query, sample_size, full_size)
+                with corp.manatee_lock:
+                    corp.set_default_attr(default_attr)
+                    try:
+                        manatee.Concordance.__init__(
+                            self, corp.unwrap(), query, sample_size, full_size)
+                    finally:
+                        # the Manatee corpus object is shared (see corplib.handles) so we must restore it
+                        corp.set_default_attr(corp.get_conf('DEFAULTATTR'))
             elif action == 'l':
                 # load from a file
                 self._conc_file = params
@@ -233,10 +241,10 @@ class PyConc(manatee.Concordance):
                              excludekwic)
         self.delete_pnfilter(collnum, ispositive)
 
-    def get_attr_values_sizes(self, full_attr_name):
+    def get_attr_values_sizes(self, full_attr_name) -> Mapping[str, int]:
         """
         Returns all values of provided structural attribute and their corresponding
-        sizes in positions.
+        sizes in positions. Precalculated sizes are used if available (see corplib.sattr_sizes).
 
         arguments:
         full_attr_name -- fully qualified structural attribute name (e.g. "opus.srclang",
@@ -245,25 +253,9 @@ class PyConc(manatee.Concordance):
                           is ignored.
 
         returns:
-        a dictionary (key = "structural attribute value" and value = "size in positions")
+        a mapping (key = "structural attribute value" and value = "size in positions")
         """
-        full_attr_name = re.split(r'\s+', full_attr_name)[0]
-        struct_name, attr_name = full_attr_name.split('.')
-        struct = self.pycorp.get_struct(struct_name)
-        attr = struct.get_attr(attr_name)
-        normvals = dict([(struct.beg(
-            i), struct.end(i) - struct.beg(i)) for i in range(struct.size())])
-        ans = {}
-        for i in range(attr.id_range()):
-            value = attr.id2str(i)
-            valid = attr.str2id(value)
-            r = self.pycorp.filter_query(struct.attr_val(attr_name, valid))
-            cnt = 0
-            while not r.end():
-                cnt += normvals[r.peek_beg()]
-                r.next()
-            ans[value] = cnt
-        return ans
+        return get_sattr_sizes(self.pycorp, re.split(r'\s+', full_attr_name)[0])
 
     def compute_ARF(self):
         """
@@ -357,17 +349,7 @@ class PyConc(manatee.Concordance):
                     norm=0
                 ))
 
-        try:
-            int_sortkey = int(sortkey)
-        except ValueError:
-            int_sortkey = None
-
-        if int_sortkey is not None and 0 <= int_sortkey < len(lines[0].Word):
-            lines = l10n.sort(lines, loc=collator_locale, key=lambda v: v.Word[int_sortkey]['n'])
-        else:
-            if sortkey not in ('freq', 'rel'):
-                sortkey = 'freq'
-            lines = sorted(lines, key=lambda v: getattr(v, sortkey), reverse=True)
+        lines = sort_freq_items(lines, sortkey, collator_locale)
         return FreqData(Head=head, Items=lines, SkippedEmpty=has_empty_item, NoRelSorting=bool(rel_mode), Size=len(lines))
 
     def xdistribution(self, xrange: List[int], amplitude: int) -> Tuple[List[int], List[int]]:
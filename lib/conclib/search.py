@@ -34,6 +34,7 @@ from bgcalc.conc.base import GeneralWorker, ConcRegistration
 from conclib.common import KConc
 from conclib.empty import InitialConc
 from conclib.errors import ConcCalculationStatusException
+from conclib.executor import run_manatee
 from conclib.pyconc import PyConc
 from corplib.corpus import AbstractKCorpus
 from plugin_types.conc_cache import ConcCacheStatus
@@ -62,7 +63,9 @@ async def _get_streamed_bg_conc(corp: AbstractKCorpus, user_id, q, cutoff, minsi
     conc_avail = await wait_for_conc(
         cache_map=cache_map, corp_cache_key=corp.cache_key, q=q, cutoff=cutoff, minsize=minsize)
     if conc_avail:
-        return PyConc(corp, 'l', await cache_map.readable_cache_path(corp.cache_key, q, cutoff))
+        conc = PyConc(corp, 'l', await cache_map.readable_cache_path(corp.cache_key, q, cutoff))
+        await cache_map.record_access(corp.cache_key, q, cutoff)
+        return conc
     else:
         return InitialConc(
             corp=corp,
@@ -111,7 +114,9 @@ async def _get_bg_conc(
     _, finished = await check_result(
         cache_map=cache_map, corp_cache_key=corp_cache_key, q=q, cutoff=cutoff, minsize=minsize)
     if finished:
-        return PyConc(corp, 'l', await cache_map.readable_cache_path(corp_cache_key, q, cutoff))
+        conc = PyConc(corp, 'l', await cache_map.readable_cache_path(corp_cache_key, q, cutoff))
+        await cache_map.record_access(corp_cache_key, q, cutoff)
+        return conc
     else:
         # return empty yet unfinished concordance to make the client watch the calculation
         return InitialConc(corp, await cache_map.readable_cache_path(corp_cache_key, q, cutoff))
@@ -131,18 +136,18 @@ async def _get_sync_conc_no_worker(
     status = worker.create_new_calc_status()
     cache_map = plugins.runtime.CONC_CACHE.instance.get_mapping(corp)
     try:
-        conc = worker.create_conc_instance(corp, q, cutoff)
-        conc.sync()  # wait for the computation to finish
+        conc = await run_manatee(worker.create_conc_instance, corp, q, cutoff)
+        await run_manatee(conc.sync)  # wait for the computation to finish
         status.update(
             finished=True,
             readable=True,
             concsize=conc.size(),
             fullsize=conc.fullsize())
         status.recalc_relconcsize(corp)
-        status.arf = round(conc.compute_ARF(), 2) if not corp.subcorpus_id else None
+        status.arf = round(await run_manatee(conc.compute_ARF), 2) if not corp.subcorpus_id else None
         status = await cache_map.add_to_map(corp.cache_key, q[:1], cutoff, status)
         _normalize_permissions(status.cachefile)  # in case the file already exists
-        conc.save(status.cachefile)
+        await run_manatee(conc.save, status.cachefile)
         _normalize_permissions(status.cachefile)
         await cache_map.add_to_map(corp.cache_key, q[:1], cutoff, status, overwrite=True)
         # update size in map file
@@ -171,7 +176,7 @@ def _should_be_bg_query(corp: AbstractKCorpus, query: Tuple[str, ...], asnc: int
 async def perform_tail_ops(worker: GeneralWorker, corp: AbstractKCorpus, base_conc: Union[PyConc, InitialConc], calc_from, q, cutoff):
     for act in range(calc_from, len(q)):
         command, args = q[act][0], q[act][1:]
-        base_conc.exec_command(command, args)
+        await run_manatee(base_conc.exec_command, command, args)
         cache_map = plugins.runtime.CONC_CACHE.instance.get_mapping(corp)
         curr_status = await cache_map.get_calc_status(corp.cache_key, q[:act + 1], cutoff)
         if curr_status and not curr_status.finished:
@@ -184,7 +189,7 @@ async def perform_tail_ops(worker: GeneralWorker, corp: AbstractKCorpus, base_co
             calc_status = worker.create_new_calc_status()
             calc_status.concsize = base_conc.size()
             calc_status = await cache_map.add_to_map(corp.cache_key, q[:act + 1], cutoff, calc_status)
-            base_conc.save(calc_status.cachefile)
+            await run_manatee(base_conc.save, calc_status.cachefile)
             _normalize_permissions(calc_status.cachefile)
             # TODO can we be sure here that conc is finished even if its not the first query op.?
             await cache_map.update_calc_status(
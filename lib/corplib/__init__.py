@@ -36,6 +36,8 @@ from .corpus import AbstractKCorpus, KCorpus
 from .errors import (
     CorpusInstantiationError, MissingSubCorpFreqFile, VirtualSubcFreqFileError)
 from .fallback import EmptyCorpus, ErrorCorpus
+from .frq_files import FrqView, get_frq_view
+from .handles import get_handle_cache, get_handle_lock
 from .subcorpus import KSubcorpus
 
 TYPO_CACHE_KEY = 'cached_registry_typos'
@@ -89,6 +91,16 @@ def conf_bool(v: str) -> bool:
     return v in ('y', 'yes', 'true', 't', '1')
 
 
+async def _corp_files_mtime(registry_file: str, data_path: str) -> float:
+    """
+    Return the latest modification time of a corpus registry file
+    and its data directory (see also KCorpus.corp_mtime).
+    """
+    reg_mtime = await aiofiles.os.path.getmtime(registry_file)
+    data_dir = os.path.dirname(data_path) if data_path.endswith('/') else data_path
+    return max(reg_mtime, await aiofiles.os.path.getmtime(data_dir))
+
+
 class CorpusFactory:
 
     def __init__(self, subc_root: Optional[str] = None) -> None:
@@ -124,9 +136,10 @@ class CorpusFactory:
         if cache_key in self._cache and not no_cache_read:
             return self._cache[cache_key]
 
-        corp = manatee.Corpus(registry_file)
+        corp = await self._open_corpus(registry_file, no_cache_read)
         data_path = corp.get_conf('PATH')
         if not os.path.exists(data_path):
+            get_handle_cache().invalidate(registry_file)
             return ErrorCorpus(
                 RuntimeError(f'corpus data path does not exist: {data_path}'),
                 corpname,
@@ -137,14 +150,34 @@ class CorpusFactory:
         # KonText does not need such an attribute but to keep developers informed we leave
         # the comment here.
         if isinstance(corp_ident, SubcorpusIdent):
-            subc = await KSubcorpus.load(corp, corp_ident, self.subcpath)
+            subc = await KSubcorpus.load(corp, corp_ident, self.subcpath, registry_path=registry_file)
             self._cache[cache_key] = subc
             return subc
         else:
-            kcorp = KCorpus(corp, corpname)
+            kcorp = KCorpus(corp, corpname, get_handle_lock(registry_file))
             self._cache[cache_key] = kcorp
         return kcorp
 
+    @staticmethod
+    async def _open_corpus(registry_file: str, no_cache_read: bool) -> manatee.Corpus:
+        """
+        Return an opened Manatee corpus. Already opened corpora are shared within
+        the process (see corplib.handles) as long as their registry file and data
+        are not modified.
+        """
+        handles = get_handle_cache()
+        key = (registry_file, '')
+        if not no_cache_read:
+            corp = await handles.get(key, lambda c: _corp_files_mtime(registry_file, c.get_conf('PATH')))
+            if corp is not None:
+                return corp
+        corp = manatee.Corpus(registry_file)
+        try:
+            handles.put(key, await _corp_files_mtime(registry_file, corp.get_conf('PATH')), corp)
+        except OSError:
+            pass  # missing data is handled by the caller
+        return corp
+
     async def get_info(self, corpus_id: str) -> ManateeCorpusInfo:
         """
         Return a low-level information (provided via Manatee) about a corpus
@@ -325,21 +358,17 @@ def _print_attr_hierarchy(layer, level=0, label='', hsep='::'):
     return result
 
 
-def _frq_from_file(data, path, id_range):
-    if not os.path.isfile(path):
-        raise IOError(f'frq file does not exist: {path}')
-    data.fromfile(open(path, 'rb'), id_range)
-
-
-async def frq_db(corp: AbstractKCorpus, attrname: str, nums: str = 'frq', id_range: int = 0) -> array:
-    import array
+async def frq_db(corp: AbstractKCorpus, attrname: str, nums: str = 'frq', id_range: int = 0) -> FrqView:
+    """
+    Return precalculated frequencies (frq, arf, docf) of all the values of a positional attribute
+    as a read-only sequence indexed by value IDs (see corplib.frq_files).
+    """
     filename = corp.freq_precalc_file(attrname, nums)
     if not id_range:
         id_range = corp.get_attr(attrname).id_range()
     if nums == 'arf':
-        frq = array.array('f')
         try:
-            _frq_from_file(frq, filename, id_range)  # type: ignore
+            frq = get_frq_view(filename, 'f', id_range)
         except IOError as ex:
             raise MissingSubCorpFreqFile(ex, corp.corpname, corp.subcorpus_id)
         except EOFError as ex:
@@ -349,8 +378,7 @@ async def frq_db(corp: AbstractKCorpus, attrname: str, nums: str = 'frq', id_ran
         try:
             if corp.get_conf('VIRTUAL') and not corp.subcorpus_id and nums == 'frq':
                 raise VirtualSubcFreqFileError()
-            frq = array.array('i')
-            _frq_from_file(frq, filename, id_range)  # type: ignore
+            frq = get_frq_view(filename, 'i', id_range)
         except EOFError as ex:
             try:
                 await aiofiles.os.remove(filename)
@@ -358,13 +386,12 @@ async def frq_db(corp: AbstractKCorpus, attrname: str, nums: str = 'frq', id_ran
                 pass
             raise MissingSubCorpFreqFile(ex, corp.corpname, corp.subcorpus_id)
         except (VirtualSubcFreqFileError, IOError):
-            frq = array.array('l')
             try:
-                _frq_from_file(frq, filename + '64', id_range)  # type: ignore
+                frq = get_frq_view(filename + '64', 'l', id_range)
             except IOError as ex:
                 if not corp.subcorpus_id and nums == 'frq':
                     a = corp.get_attr(attrname)
-                    frq.fromlist([a.freq(i) for i in range(a.id_range())])
+                    frq = array('l', [a.freq(i) for i in range(a.id_range())])
                 else:
                     raise MissingSubCorpFreqFile(ex, corp.corpname, corp.subcorpus_id)
     return frq
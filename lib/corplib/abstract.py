@@ -22,7 +22,7 @@ import hashlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Awaitable, List, Optional, Union
+from typing import Any, Awaitable, ContextManager, List, Optional, Union
 
 import aiofiles
 from dataclasses_json import dataclass_json
@@ -203,6 +203,16 @@ class AbstractKCorpus(ABC):
     def unwrap(self) -> Corpus:
         pass
 
+    @property
+    @abstractmethod
+    def manatee_lock(self) -> ContextManager:
+        """
+        Provide a lock which must be held while the state of the underlying Manatee
+        object is changed (e.g. via set_default_attr) as the object may be shared
+        by more requests and threads (see corplib.handles, conclib.executor).
+        """
+        pass
+
     @abstractmethod
     def freq_dist(self, rs, crit, limit, words, freqs, norms):
         pass
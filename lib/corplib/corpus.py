@@ -17,7 +17,8 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import os
-from typing import Any, Awaitable, List, Union
+import threading
+from typing import Any, Awaitable, List, Optional, Union
 
 import aiofiles
 import aiofiles.os
@@ -37,10 +38,12 @@ class KCorpus(AbstractKCorpus):
 
     _corpname: str
     _corp: Corpus
+    _manatee_lock: threading.RLock
 
-    def __init__(self, corp: Corpus, corpname: str):
+    def __init__(self, corp: Corpus, corpname: str, manatee_lock: Optional[threading.RLock] = None):
         self._corp = corp
         self._corpname = corpname
+        self._manatee_lock = manatee_lock if manatee_lock is not None else threading.RLock()
 
     def __str__(self):
         return f'KCorpus(corpname={self.corpname})'
@@ -129,6 +132,10 @@ class KCorpus(AbstractKCorpus):
     def unwrap(self) -> Corpus:
         return self._corp
 
+    @property
+    def manatee_lock(self) -> threading.RLock:
+        return self._manatee_lock
+
     def freq_dist(self, rs, crit, limit, words, freqs, norms):
         return self._corp.freq_dist(rs, crit, limit, words, freqs, norms)
 
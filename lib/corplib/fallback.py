@@ -11,6 +11,7 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
+import contextlib
 from typing import Any, Awaitable, List
 
 from corplib import SubcorpusIdent
@@ -113,6 +114,10 @@ class EmptyCorpus(AbstractKCorpus):
     def unwrap(self) -> Corpus:
         return None
 
+    @property
+    def manatee_lock(self):
+        return contextlib.nullcontext()
+
     def freq_dist(self, rs, crit, limit, words, freqs, norms):
         pass
 
@@ -0,0 +1,95 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Read-only, memory-mapped views of precalculated frequency files (.frq, .frq64,
+.arf, .docf). Instead of copying whole files into memory on each request, the files
+are mapped and the mappings are kept in a small cache. As the mapped pages live
+in the OS page cache, they are also shared by all the processes reading the same file.
+
+A mapped file must never be rewritten in place as accessing pages beyond the end
+of a truncated file crashes the process (SIGBUS). Manatee rewrites frequency files
+in place so the files must be discarded (see discard_frq_files) before they are rebuilt.
+A removed file stays valid for the existing mappings and new readers map the new file
+(the cache tests modification time and size).
+"""
+
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from typing import Iterable, Tuple, Union
+
+MAX_CACHED_FILES = 32
+
+FrqView = Union[memoryview, array]
+
+_cache: OrderedDict[Tuple[str, str], Tuple[float, int, memoryview]] = OrderedDict()
+
+
+def _map_file(path: str, typecode: str, itemsize: int) -> memoryview:
+    with open(path, 'rb') as fr:
+        mm = mmap.mmap(fr.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mm)
+    return data[:len(data) - len(data) % itemsize].cast(typecode)  # type: ignore[call-overload]
+
+
+def get_frq_view(path: str, typecode: str, id_range: int) -> FrqView:
+    """
+    Return a read-only sequence of the first id_range numbers stored in a frequency
+    file. The typecode has the same meaning as in the array module.
+
+    raises:
+    IOError -- if the file does not exist
+    EOFError -- if the file contains less than id_range items
+    """
+    if not os.path.isfile(path):
+        _cache.pop((path, typecode), None)  # do not keep a removed file mapped
+        raise IOError(f'frq file does not exist: {path}')
+    st = os.stat(path)
+    itemsize = array(typecode).itemsize
+    if st.st_size < id_range * itemsize:
+        raise EOFError(f'frq file {path} contains less than {id_range} items')
+    if st.st_size < itemsize:
+        return array(typecode)
+    key = (path, typecode)
+    entry = _cache.get(key)
+    if entry is None or entry[0] != st.st_mtime or entry[1] != st.st_size:
+        entry = (st.st_mtime, st.st_size, _map_file(path, typecode, itemsize))
+        _cache[key] = entry
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return entry[2][:id_range]
+
+
+def discard_frq_files(paths: Iterable[str]):
+    """
+    Remove frequency files (and their mappings cached by the current process)
+    which are going to be rebuilt. Missing files are ignored.
+    """
+    for path in paths:
+        for key in [k for k in _cache.keys() if k[0] == path]:
+            del _cache[key]
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def clear_cache():
+    _cache.clear()
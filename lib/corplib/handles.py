@@ -0,0 +1,174 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A process-wide cache of opened Manatee corpus handles (manatee.Corpus, manatee.SubCorpus).
+
+Opening a corpus is relatively expensive and each opened corpus keeps some file descriptors
+of its indices. Because CorpusFactory instances are short-lived (typically one per action
+or per worker task), the handles are shared via this module so the number of open
+corpora (and their file descriptors) within a process stays bounded.
+
+Please note that only the raw Manatee objects are cached. KCorpus/KSubcorpus wrappers
+are still created by the CorpusFactory as they carry request-specific state.
+
+A shared handle may be used by more requests (and threads, see conclib.executor) at the same
+time. Read-only use of a handle needs no synchronization but code changing the state of a handle
+(e.g. a temporary change of the default attribute) must hold the lock of the corpus (see
+get_handle_lock) while the state differs from the default one. The lock is shared by all
+the handles created from the corpus (i.e. including its subcorpora).
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import settings
+
+DEFAULT_CACHE_SIZE = 50
+
+STATS_LOG_INTERVAL = 1000
+"""
+Cache statistics are logged each STATS_LOG_INTERVAL-th lookup
+"""
+
+HandleKey = Tuple[str, str]
+"""
+(registry file path, subcorpus id); for a corpus, the subcorpus id is an empty string
+"""
+
+
+@dataclass
+class HandleCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+def _num_open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+class CorpusHandleCache:
+    """
+    A size-bounded LRU cache of opened Manatee corpus handles. Each entry is
+    stored along with a modification time of the files it was created from
+    so outdated handles (e.g. after a corpus is re-compiled) are never returned.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._data: OrderedDict[HandleKey, Tuple[float, Any]] = OrderedDict()
+        self._stats = HandleCacheStats()
+
+    async def get(self, key: HandleKey, mtime_fn: Callable[[Any], Awaitable[float]]) -> Optional[Any]:
+        """
+        Return a cached handle or None if there is no such handle or if the handle
+        is outdated. The mtime_fn should return the current modification time of the files
+        the handle has been created from. In case the function raises OSError, the handle
+        is considered outdated too.
+
+        Once a corpus handle is outdated, all the handles of its subcorpora are removed too.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self._count_lookup(hit=False)
+            return None
+        try:
+            is_valid = entry[0] >= await mtime_fn(entry[1])
+        except OSError:
+            is_valid = False
+        if not is_valid:
+            if key[1]:
+                del self._data[key]
+                self._stats.invalidations += 1
+            else:
+                self.invalidate(key[0])
+            self._count_lookup(hit=False)
+            return None
+        self._data.move_to_end(key)
+        self._count_lookup(hit=True)
+        return entry[1]
+
+    def _count_lookup(self, hit: bool):
+        if hit:
+            self._stats.hits += 1
+        else:
+            self._stats.misses += 1
+        if (self._stats.hits + self._stats.misses) % STATS_LOG_INTERVAL == 0:
+            logging.getLogger(__name__).info({'type': 'corpus_handle_cache_stats', **self.stats()})
+
+    def put(self, key: HandleKey, mtime: float, handle: Any):
+        self._data[key] = (mtime, handle)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            evicted, _ = self._data.popitem(last=False)
+            self._stats.evictions += 1
+            logging.getLogger(__name__).debug(f'evicted corpus handle {evicted}, stats: {self.stats()}')
+
+    def invalidate(self, registry_path: str):
+        """
+        Remove all the handles (i.e. the corpus and its subcorpora) created from a registry file
+        """
+        for key in [k for k in self._data.keys() if k[0] == registry_path]:
+            del self._data[key]
+            self._stats.invalidations += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        ans = asdict(self._stats)
+        ans['size'] = len(self._data)
+        ans['max_size'] = self._max_size
+        ans['open_fds'] = _num_open_fds()
+        return ans
+
+
+_handle_cache: Optional[CorpusHandleCache] = None
+
+
+def get_handle_cache() -> CorpusHandleCache:
+    global _handle_cache
+    if _handle_cache is None:
+        _handle_cache = CorpusHandleCache(
+            settings.get_int('corpora', 'corpus_handle_cache_size', DEFAULT_CACHE_SIZE))
+    return _handle_cache
+
+
+_handle_locks: Dict[str, threading.RLock] = {}
+
+_handle_locks_guard = threading.Lock()
+
+
+def get_handle_lock(registry_path: str) -> threading.RLock:
+    """
+    Return a lock guarding all the Manatee handles created from a registry file.
+    The lock is never removed so even an evicted handle which is still in use
+    is guarded by the same lock as its replacement.
+    """
+    with _handle_locks_guard:
+        if registry_path not in _handle_locks:
+            _handle_locks[registry_path] = threading.RLock()
+        return _handle_locks[registry_path]
@@ -0,0 +1,214 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Sizes (in positions) of structural attribute values, i.e. for each value of
+e.g. 'doc.txtype' we know how many tokens are covered by the structures with the value.
+These are used as norms for freq. distributions of structural attributes.
+
+The sizes are stored as a flat array of 64-bit integers indexed by attribute value ID.
+Files of corpora are stored in the corpora/freqs_precalc_dir directory (corpus data
+directories are not expected to be writable), files of subcorpora are stored next to other
+precalculated freq. files of the subcorpus (.frq, .arf, .docf). The files are compiled
+by the compile_sattr_sizes worker task only. In case a file is missing, the task is queued
+and the sizes are calculated in memory in the meantime.
+"""
+
+import logging
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from typing import Callable, Iterator, Mapping, Optional, Set, Tuple
+
+import settings
+
+from .corpus import AbstractKCorpus
+
+FILE_TYPE = 'sizes'
+
+MAX_UNSTORED_CACHE_SIZE = 20
+"""
+max. number of computed sizes kept in memory until their file is compiled
+"""
+
+TASK_TIME_LIMIT = settings.get_int('calc_backend', 'task_time_limit', 300)
+
+_unstored: 'OrderedDict[Tuple[str, float], array]' = OrderedDict()
+
+_queued: Set[Tuple[str, float]] = set()
+"""
+files (and versions of their source data) the compilation has been already queued for
+"""
+
+
+def _split_attr(full_attr_name: str) -> Tuple[str, str]:
+    struct_name, attr_name = full_attr_name.split('.')
+    return struct_name, attr_name
+
+
+def compute_sattr_sizes(
+        corp: AbstractKCorpus, full_attr_name: str, struct_norm: Optional[Callable[[int], int]] = None) -> array:
+    """
+    Calculate sizes of all the values of a structural attribute in a single
+    pass over the structure. For a subcorpus, only structures within
+    the subcorpus are counted (each with its full size).
+
+    arguments:
+    corp --
+    full_attr_name -- a structural attribute (e.g. doc.txtype)
+    struct_norm -- a function returning a size of a structure (by its number);
+                   by default, the size in positions is used
+
+    returns:
+    an array where i-th item is a size of the attribute value with ID i
+    """
+    struct_name, attr_name = _split_attr(full_attr_name)
+    struct = corp.get_struct(struct_name)
+    attr = struct.get_attr(attr_name)
+    if struct_norm is None:
+        struct_norm = lambda num: struct.end(num) - struct.beg(num)
+    ans = array('q', bytes(8 * attr.id_range()))
+    if corp.subcorpus_id:
+        r = corp.filter_query(struct.whole())
+        while not r.end():
+            num = struct.num_at_pos(r.peek_beg())
+            ans[attr.pos2id(num)] += struct_norm(num)
+            r.next()
+    else:
+        for num in range(struct.size()):
+            ans[attr.pos2id(num)] += struct_norm(num)
+    return ans
+
+
+def _index_path(corp: AbstractKCorpus, full_attr_name: str) -> str:
+    if corp.subcorpus_id:
+        return corp.freq_precalc_file(full_attr_name, FILE_TYPE)
+    return os.path.join(
+        settings.get('corpora', 'freqs_precalc_dir'), corp.corpname, f'{full_attr_name}.{FILE_TYPE}')
+
+
+def _source_mtime(corp: AbstractKCorpus, full_attr_name: str) -> float:
+    """
+    Return the latest modification time of the data the sizes
+    are calculated from (attribute lexicon, subcorpus data)
+    """
+    lex_path = corp.get_conf('PATH') + full_attr_name + '.lex'
+    if os.path.isfile(lex_path):
+        ans = os.path.getmtime(lex_path)
+    else:
+        ans = os.path.getmtime(corp.get_confpath())
+    if corp.subcorpus_id:
+        subc_data = os.path.join(os.path.dirname(_index_path(corp, full_attr_name)), 'data.subc')
+        ans = max(ans, os.path.getmtime(subc_data))
+    return ans
+
+
+def store_sattr_sizes(corp: AbstractKCorpus, full_attr_name: str, data: array):
+    path = _index_path(corp, full_attr_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as fw:
+        data.tofile(fw)
+    os.replace(tmp_path, path)
+
+
+def is_compiled(corp: AbstractKCorpus, full_attr_name: str) -> bool:
+    path = _index_path(corp, full_attr_name)
+    return os.path.isfile(path) and os.path.getmtime(path) >= _source_mtime(corp, full_attr_name)
+
+
+class SAttrSizes(Mapping[str, int]):
+    """
+    A read-only mapping (attr. value => size in positions) backed
+    by a memory-mapped file of precalculated sizes.
+    """
+
+    def __init__(self, corp: AbstractKCorpus, full_attr_name: str, path: str):
+        struct_name, attr_name = _split_attr(full_attr_name)
+        self._attr = corp.get_struct(struct_name).get_attr(attr_name)
+        with open(path, 'rb') as fr:
+            self._mmap = mmap.mmap(fr.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) > 0 else b''
+        self._data = memoryview(self._mmap).cast('q')
+
+    def __getitem__(self, value: str) -> int:
+        value_id = self._attr.str2id(value)
+        if value_id < 0 or value_id >= len(self._data):
+            raise KeyError(value)
+        return self._data[value_id]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._attr.id2str(i) for i in range(len(self._data)))
+
+
+def load_sattr_sizes(corp: AbstractKCorpus, full_attr_name: str) -> Optional[SAttrSizes]:
+    """
+    Load precalculated sizes of a structural attribute values. In case there are
+    no up-to-date precalculated data, None is returned.
+    """
+    if not is_compiled(corp, full_attr_name):
+        return None
+    return SAttrSizes(corp, full_attr_name, _index_path(corp, full_attr_name))
+
+
+def queue_compilation(corp: AbstractKCorpus, full_attr_name: str) -> bool:
+    """
+    Queue the compile_sattr_sizes worker task as a low-priority background task
+    (calc_backend/rq_low_priority_queue). Failures are only logged as the sizes can
+    be always calculated on demand.
+
+    returns:
+    True if the task has been queued, else False
+    """
+    import bgcalc  # bgcalc depends on corplib
+    try:
+        worker = bgcalc.calc_backend_client(settings)
+        worker.send_task_sync(
+            'compile_sattr_sizes', object.__class__, (corp.portable_ident, full_attr_name),
+            time_limit=TASK_TIME_LIMIT, queue=settings.get('calc_backend', 'rq_low_priority_queue', None))
+        return True
+    except Exception as ex:
+        logging.getLogger(__name__).error(
+            f'Failed to queue sizes calculation of {corp.corpname}/{full_attr_name}: {ex}')
+        return False
+
+
+def get_sattr_sizes(corp: AbstractKCorpus, full_attr_name: str) -> Mapping[str, int]:
+    """
+    Return sizes of all the values of a structural attribute. Precalculated data are used if
+    available. Otherwise, the compile_sattr_sizes worker task is queued (once per source data
+    version) and the sizes are calculated and kept in memory until the file is compiled
+    so the current request does not wait for the task.
+    """
+    ans: Optional[Mapping[str, int]] = load_sattr_sizes(corp, full_attr_name)
+    if ans is None:
+        unstored_key = (_index_path(corp, full_attr_name), _source_mtime(corp, full_attr_name))
+        if unstored_key not in _queued and queue_compilation(corp, full_attr_name):
+            _queued.add(unstored_key)
+        data = _unstored.get(unstored_key)
+        if data is None:
+            data = compute_sattr_sizes(corp, full_attr_name)
+            _unstored[unstored_key] = data
+            if len(_unstored) > MAX_UNSTORED_CACHE_SIZE:
+                _queued.discard(_unstored.popitem(last=False)[0])
+        struct_name, attr_name = _split_attr(full_attr_name)
+        attr = corp.get_struct(struct_name).get_attr(attr_name)
+        ans = {attr.id2str(i): v for i, v in enumerate(data)}
+    return ans
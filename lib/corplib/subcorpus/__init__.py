@@ -18,6 +18,7 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-13
 
 import os
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional, Union
@@ -33,6 +34,7 @@ from ..corpus import AbstractKCorpus, KCorpus
 from ..errors import (
     CorpusInstantiationError, InvalidSubCorpFreqFileType,
     SubcorpusAlreadyExistsError)
+from ..handles import get_handle_cache, get_handle_lock
 
 """
 This module defines a backend-independent subcorpus representation.
@@ -128,8 +130,13 @@ class KSubcorpus(KCorpus):
     orig_description.
     """
 
-    def __init__(self, corp: SubCorpus, data_record: Union[SubcorpusIdent, SubcorpusRecord], subcorp_root_dir: str):
-        super().__init__(corp, data_record.corpus_name)
+    def __init__(
+            self,
+            corp: SubCorpus,
+            data_record: Union[SubcorpusIdent, SubcorpusRecord],
+            subcorp_root_dir: str,
+            manatee_lock: Optional[threading.RLock] = None):
+        super().__init__(corp, data_record.corpus_name, manatee_lock)
         self._corpname = data_record.corpus_name
         self._data_record = data_record
         self._subcorp_root_dir = subcorp_root_dir
@@ -138,18 +145,33 @@ class KSubcorpus(KCorpus):
         return f'KSubcorpus(corpname={self.corpname}, subcorpus_id={self.subcorpus_id}, subcorpus_name={self.subcorpus_name})'
 
     @staticmethod
-    async def load(corp: Corpus, data_record: Union[SubcorpusIdent, SubcorpusRecord], subcorp_root_dir: str) -> 'KSubcorpus':
+    async def load(
+            corp: Corpus,
+            data_record: Union[SubcorpusIdent, SubcorpusRecord],
+            subcorp_root_dir: str,
+            registry_path: Optional[str] = None) -> 'KSubcorpus':
         """
         load is a recommended factory function to create a KSubcorpus instance.
+        In case registry_path of the corpus is provided, the subcorpus handle
+        is shared within the process (see corplib.handles) and so is the lock
+        guarding it.
         """
         full_data_path = os.path.join(subcorp_root_dir, data_record.data_path)
         if not await aiofiles.os.path.isfile(full_data_path):
             if isinstance(data_record, SubcorpusIdent) and not (isinstance(data_record, SubcorpusRecord) and data_record.is_draft):
                 raise CorpusInstantiationError(f'Subcorpus data not found for "{data_record.id}"')
             subc = corp
+        elif registry_path:
+            handles = get_handle_cache()
+            key = (registry_path, data_record.id)
+            subc = await handles.get(key, lambda _: aiofiles.os.path.getmtime(full_data_path))
+            if subc is None:
+                subc = SubCorpus(corp, full_data_path)
+                handles.put(key, await aiofiles.os.path.getmtime(full_data_path), subc)
         else:
             subc = SubCorpus(corp, full_data_path)
-        kcorp = KSubcorpus(subc, data_record, subcorp_root_dir)
+        kcorp = KSubcorpus(
+            subc, data_record, subcorp_root_dir, get_handle_lock(registry_path) if registry_path else None)
         kcorp._corp = subc
         return kcorp
 
@@ -221,7 +243,7 @@ class KSubcorpus(KCorpus):
         return self._data_record.public_description
 
     def freq_precalc_file(self, attrname: str, ftype: str) -> str:
-        if ftype not in ('frq', 'docf', 'arf', 'token:l'):
+        if ftype not in ('frq', 'docf', 'arf', 'token:l', 'sizes'):
             raise InvalidSubCorpFreqFileType(
                 f'invalid subcorpus freq type file specification: {ftype}')
         return os.path.join(self._subcorp_root_dir, self._data_record.data_dir, f'data.{attrname}.{ftype}')
@@ -27,6 +27,7 @@ from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 import manatee
 from conclib.common import KConc
 from conclib.empty import InitialConc
+from conclib.executor import run_manatee
 from corplib.corpus import AbstractKCorpus
 from kwiclib.common import (
     AttrRole, KwicPageData, MergedPosAttrs, Pagination, SortCritType,
@@ -218,9 +219,11 @@ class Kwic:
         self.conc = conc
         self.all_corp_merged_posattrs = all_corp_merged_posattrs
 
-    def kwicpage(self, args: KwicPageArgs) -> KwicPageData:
+    async def kwicpage(self, args: KwicPageArgs) -> KwicPageData:
         """
-        Generates template data for page displaying provided concordance
+        Generates template data for page displaying provided concordance.
+        As the data are produced by blocking Manatee calls, the work is
+        performed by the Manatee executor (see conclib.executor).
 
         arguments:
             args -- a KwicArgs instance
@@ -228,6 +231,9 @@ class Kwic:
         returns:
         KwicPageData converted into a dict
         """
+        return await run_manatee(self._kwicpage, args)
+
+    def _kwicpage(self, args: KwicPageArgs) -> KwicPageData:
         attrs = args.attrs.split(',')
         for corpname, avail in self.all_corp_merged_posattrs.items():
             self.all_corp_merged_posattrs[corpname] = [x for x in avail if x[0] in attrs]
@@ -34,8 +34,7 @@ internationalisation of KonText:
    processed using the same module.
 """
 
-from functools import cmp_to_key
-from threading import local
+from threading import Lock, local
 from typing import Any, Dict
 
 try:
@@ -56,6 +55,9 @@ except ImportError:
         def compare(self, s1, s2):
             return locale.strcoll(s1, s2)
 
+        def getSortKey(self, s):
+            return locale.strxfrm(s)
+
         @staticmethod
         def createInstance(locale):
             return Collator(locale)
@@ -64,10 +66,33 @@ except ImportError:
 _formats: Dict[str, Any] = {}  # contains lang_code -> Formatter() pairs
 _current = local()  # thread-local variable stores per-request formatter
 
+_collators: Dict[str, Collator] = {}  # contains locale -> Collator() pairs
+_collators_lock = Lock()
+
+
+def get_collator(loc: str) -> Collator:
+    """
+    Return a collator for the passed locale. Collators are expensive to create
+    so they are cached (ICU collators can be shared by threads as long as they
+    are not modified).
+    """
+    if not loc:
+        loc = 'en_US'
+    collator = _collators.get(loc)
+    if collator is None:
+        with _collators_lock:
+            collator = _collators.get(loc)
+            if collator is None:
+                collator = Collator.createInstance(Locale(loc))
+                _collators[loc] = collator
+    return collator
+
 
 def sort(iterable, loc, key=None, reverse=False):
     """
     Creates new sorted list from passed list (or any iterable data) according to the passed locale.
+    The function calculates a binary sort key for each item once and sorts the items by the keys
+    (which produces the same order as comparing the items by the collator).
 
     arguments:
     iterable -- iterable object (typically a list or a tuple)
@@ -75,15 +100,12 @@ def sort(iterable, loc, key=None, reverse=False):
     key -- access to sorted value
     reverse -- whether the result should be in reversed order (default is False)
     """
-    if not loc:
-        loc = 'en_US'
-    collator = Collator.createInstance(Locale(loc))
+    sort_key = get_collator(loc).getSortKey
     if key is None:
-        kf = cmp_to_key(collator.compare)
+        kf = sort_key
     else:
-        def tmp(v1, v2):
-            return collator.compare(key(v1), key(v2))
-        kf = cmp_to_key(tmp)
+        def kf(v):
+            return sort_key(key(v))
     return sorted(iterable, key=kf, reverse=reverse)
 
 
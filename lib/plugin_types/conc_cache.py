@@ -25,17 +25,29 @@ the instance of AbstractConcCache is request-dependent.
 """
 
 import abc
+import asyncio
 import importlib
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from dataclasses import asdict, dataclass, field, InitVar
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from corplib.corpus import AbstractKCorpus
 
 QueryType = Tuple[str, ...]
 
+DISPERSION_FILE_SUFFIX = '.disp'
+
+
+def dispersion_cache_path(conc_cache_path: str) -> str:
+    """
+    Return a path of a file containing cached dispersion data of a concordance
+    (the file is stored next to the concordance cache file and it shares its lifetime).
+    """
+    return os.path.splitext(conc_cache_path)[0] + DISPERSION_FILE_SUFFIX
+
 
 class ConcCacheStatusException(Exception):
     pass
@@ -220,11 +232,21 @@ class AbstractConcCache(abc.ABC):
         elements. If there is no entry matching (corp_cache_key, q) or if a respective
         entry is not in the 'readable' state then None must be returned.
 
+        The method is also used to test whether a cached concordance exists
+        so it should not be considered as an access to the concordance (see record_access).
+
         arguments:
         corp_cache_key -- a unique key/hash representing corpus(+subcorpus)
         q -- a list of query items
         """
 
+    async def record_access(self, corp_cache_key: Optional[str], q: QueryType, cutoff: int):
+        """
+        Record that a cached concordance has been loaded. Implementations may use this
+        e.g. to decide which entries should be evicted first. The default implementation
+        does nothing.
+        """
+
     @abc.abstractmethod
     async def add_to_map(
             self,
@@ -270,6 +292,19 @@ class AbstractConcCache(abc.ABC):
     async def update_calc_status(self, corp_cache_key: Optional[str], query: QueryType, cutoff: int, **kw):
         pass
 
+    @asynccontextmanager
+    async def status_listener(
+            self, corp_cache_key: Optional[str], q: QueryType, cutoff: int) -> AsyncIterator[asyncio.Event]:
+        """
+        Provide an event which is set each time the calculation status of the entry
+        (corp_cache_key, q, cutoff) changes. The event is valid only within the context
+        and consumers are expected to clear it by themselves.
+
+        The default implementation provides an event which is never set, i.e. consumers
+        must always be able to fall back to a timeout.
+        """
+        yield asyncio.Event()
+
 
 class AbstractCacheMappingFactory(abc.ABC):
     """
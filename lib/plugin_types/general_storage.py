@@ -17,11 +17,48 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
 import abc
-from typing import Awaitable, Callable, Dict, List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
 
 from plugin_types.common import Serializable
 
 
+class KeyValuePipeline:
+    """
+    KeyValuePipeline collects write operations which are then sent to a storage
+    at once (see KeyValueStorage.pipeline()). The methods have the same meaning
+    as the respective methods of KeyValueStorage but they are not awaited
+    as nothing is written until the pipeline is executed.
+    """
+
+    def __init__(self):
+        self.ops: List[Tuple[str, Tuple[Any, ...]]] = []
+
+    def set(self, key: str, data: Serializable):
+        self.ops.append(('set', (key, data)))
+
+    def remove(self, key: str):
+        self.ops.append(('remove', (key,)))
+
+    def hash_set(self, key: str, field: str, value: Serializable):
+        self.ops.append(('hash_set', (key, field, value)))
+
+    def hash_del(self, key: str, field: str):
+        self.ops.append(('hash_del', (key, field)))
+
+    def hash_set_map(self, key: str, mapping: Dict[str, Serializable]):
+        self.ops.append(('hash_set_map', (key, mapping)))
+
+    def hash_del_many(self, key: str, fields: List[str]):
+        self.ops.append(('hash_del_many', (key, fields)))
+
+    def incr(self, key: str, amount: int = 1):
+        self.ops.append(('incr', (key, amount)))
+
+    def set_ttl(self, key: str, ttl: int):
+        self.ops.append(('set_ttl', (key, ttl)))
+
+
 class KeyValueStorage(abc.ABC):
     """
     A general key-value storage is a core data storage for KonText and its default
@@ -139,6 +176,50 @@ class KeyValueStorage(abc.ABC):
         field -- the field to be deleted
         """
 
+    async def hash_get_many(self, key: str, fields: List[str]) -> List[Serializable]:
+        """
+        Get multiple values from a hash table stored under the passed key.
+        Values are returned in the order of the passed fields; for missing
+        fields, None is returned.
+
+        The default implementation calls hash_get() for each field. Implementations
+        are encouraged to provide a more effective solution (e.g. a single request).
+
+        arguments:
+        key -- data access key
+        fields -- hash table entry keys
+        """
+        return [await self.hash_get(key, field) for field in fields]
+
+    async def hash_set_map(self, key: str, mapping: Dict[str, Serializable]):
+        """
+        Put multiple values into a hash table stored under the passed key
+        (i.e. like Redis HSET with multiple fields). Existing fields not present
+        in the mapping are preserved. Values are json-serialized.
+
+        The default implementation calls hash_set() for each item. Implementations
+        are encouraged to provide a more effective solution (e.g. a single request).
+
+        arguments:
+        key -- data access key
+        mapping -- hash table entries to be stored
+        """
+        for field, value in mapping.items():
+            await self.hash_set(key, field, value)
+
+    async def hash_del_many(self, key: str, fields: List[str]):
+        """
+        Remove multiple fields from a hash item.
+
+        The default implementation calls hash_del() for each field.
+
+        arguments:
+        key -- hash item access key
+        fields -- the fields to be deleted
+        """
+        for field in fields:
+            await self.hash_del(key, field)
+
     @abc.abstractmethod
     async def hash_get_all(self, key: str) -> Dict[str, Serializable]:
         """
@@ -161,6 +242,19 @@ class KeyValueStorage(abc.ABC):
         default -- a value to be returned in case there is no such key
         """
 
+    async def get_many(self, keys: List[str]) -> List[Serializable]:
+        """
+        Get values stored under multiple keys. Values are returned
+        in the order of the passed keys; for missing keys, None is returned.
+
+        The default implementation calls get() for each key. Implementations
+        are encouraged to provide a more effective solution (e.g. a single request).
+
+        arguments:
+        keys -- data access keys
+        """
+        return [await self.get(key) for key in keys]
+
     @abc.abstractmethod
     async def set(self, key: str, data: Serializable):
         """
@@ -249,18 +343,36 @@ class KeyValueStorage(abc.ABC):
         """
 
     @abc.abstractmethod
-    async def hash_set_map(self, key, mapping: Serializable):
+    async def keys(self, pattern: str = '*') -> List[str]:
         """
-        Set key to value within hash 'name' for each corresponding
-        key and value from the 'mapping' dict.
-        Before setting, the values are json-serialized
+        Lists available keys by pattern
         """
 
-    @abc.abstractmethod
-    async def keys(self, pattern: str = '*') -> List[str]:
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[KeyValuePipeline]:
         """
-        Lists available keys by pattern
+        Collect write operations and send them to the storage at once when
+        the context is left. In case the context is left due to an exception,
+        nothing is written.
+
+        E.g.:
+        async with db.pipeline() as pipe:
+            pipe.hash_del('foo', 'a')
+            pipe.remove('bar')
+        """
+        pipe = KeyValuePipeline()
+        yield pipe
+        if len(pipe.ops) > 0:
+            await self.execute_pipeline(pipe.ops)
+
+    async def execute_pipeline(self, ops: List[Tuple[str, Tuple[Any, ...]]]):
+        """
+        Perform operations collected by a pipeline. The default implementation
+        performs the operations one by one. Implementations are encouraged to
+        send the operations in a single request and (if possible) within a transaction.
         """
+        for op, args in ops:
+            await getattr(self, op)(*args)
 
     async def get_instance(self, plugin_id):
         """
@@ -100,6 +100,27 @@ class AbstractQueryPersistence(abc.ABC):
         a dictionary containing operation data or None if nothing is found
         """
 
+    async def open_many(self, data_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Load operation data of multiple operations at once. This is intended
+        for listings (e.g. query history) where loading the records one by one
+        would require too many round-trips to the storage.
+
+        The default implementation calls open() for each ID. Implementations
+        are encouraged to provide a more effective solution (e.g. a single request).
+
+        arguments:
+        data_ids -- unique IDs of operation data
+
+        returns:
+        a dictionary data_id => operation data (or None if nothing is found)
+        """
+        ans: Dict[str, Optional[Dict]] = {}
+        for data_id in data_ids:
+            if data_id not in ans:
+                ans[data_id] = await self.open(data_id)
+        return ans
+
     @abc.abstractmethod
     async def store(self, user_id: int, curr_data: Dict, prev_data: Optional[Dict] = None) -> str:
         """
@@ -161,6 +182,19 @@ class AbstractQueryPersistence(abc.ABC):
             return data['lastop_form'].get('form_type')
         return None
 
+    @staticmethod
+    def pquery_conc_ids(data: Dict[str, Any]) -> List[str]:
+        """
+        Return IDs of all the concordances a serialized pquery consists of
+        """
+        form = data.get('form', {})
+        ans = list(form.get('conc_ids', []))
+        if form.get('conc_subset_complements') is not None:
+            ans.extend(form['conc_subset_complements'].get('conc_ids', []))
+        if form.get('conc_superset') is not None:
+            ans.append(form['conc_superset']['conc_id'])
+        return ans
+
     @staticmethod
     def stored_query_supertype(data: Dict[str, Any]) -> str:
         """
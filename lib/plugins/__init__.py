@@ -234,6 +234,17 @@ def inject_plugin(ident: _ID, obj: object) -> None:
     _plugins[ident.name] = obj
 
 
+async def close_request_resources() -> None:
+    """
+    Let plug-ins release resources bound to the current request
+    (typically database connections) via their on_response() method.
+    """
+    for p in runtime:
+        instance = p.instance
+        if instance is not None and hasattr(instance, 'on_response'):
+            await instance.on_response()
+
+
 def add_missing_plugin(name: str) -> None:
     _plugins[name] = None
 
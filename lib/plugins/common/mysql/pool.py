@@ -0,0 +1,263 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A bounded pool of mysql.connector.aio connections. Because the connections
+are bound to the event loop they were created in, the pool is meant to be used
+within a single loop (see MySqlIntegrationDb for a per-loop setup).
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from mysql.connector.aio.abstracts import MySQLConnectionAbstract
+
+SLOW_WAIT_LOG_THRESHOLD = 1.0
+"""
+wait time (in seconds) for a free connection considered worth logging
+"""
+
+RECLAIM_CHECK_INTERVAL = 1.0
+"""
+how often (in seconds) callers waiting for a connection look for abandoned connections
+"""
+
+
+class PoolExhausted(Exception):
+    """
+    No connection became available within the acquire timeout
+    """
+
+
+@dataclass
+class PoolStats:
+    acquired: int = 0
+    exhausted: int = 0
+    timeouts: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+    created: int = 0
+    closed: int = 0
+    failed_health_checks: int = 0
+    reclaimed: int = 0
+
+
+class ConnectionPool:
+    """
+    ConnectionPool keeps up to max_size opened connections. Connections are validated
+    (pinged) when borrowed after being idle for more than health_check_after seconds
+    and they are closed once they are older than max_lifetime seconds. In case all
+    the connections are in use, callers wait (at most acquire_timeout seconds) for
+    a connection to be returned.
+
+    Each borrowed connection is bound to the task which acquired it. If the task
+    finishes without returning the connection (e.g. a request handler cancelled due
+    to a client disconnect), the connection is closed and its slot is reclaimed
+    once the pool runs out of connections.
+    """
+
+    def __init__(
+            self,
+            conn_factory: Callable[[], Awaitable[MySQLConnectionAbstract]],
+            max_size: int,
+            max_lifetime: float,
+            health_check_after: float,
+            acquire_timeout: float):
+        self._conn_factory = conn_factory
+        self._max_size = max_size
+        self._max_lifetime = max_lifetime
+        self._health_check_after = health_check_after
+        self._acquire_timeout = acquire_timeout
+        self._idle: Deque[Tuple[MySQLConnectionAbstract, float, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        # id(conn) => (conn, task which borrowed the connection)
+        self._borrowed: Dict[int, Tuple[MySQLConnectionAbstract, Optional[asyncio.Task]]] = {}
+        self._size = 0
+        self._available = asyncio.Condition()
+        self._stats = PoolStats()
+
+    async def _close(self, conn: MySQLConnectionAbstract):
+        self._created_at.pop(id(conn), None)
+        self._stats.closed += 1
+        try:
+            await conn.close()
+        except Exception as ex:
+            logging.getLogger(__name__).warning(f'failed to close a pooled mysql connection: {ex}')
+        finally:
+            async with self._available:
+                self._size -= 1
+                self._available.notify()
+
+    async def _is_usable(self, conn: MySQLConnectionAbstract, created_at: float, last_used: float) -> bool:
+        now = time.monotonic()
+        if now - created_at > self._max_lifetime:
+            return False
+        if now - last_used > self._health_check_after:
+            try:
+                healthy = await conn.is_connected()
+            except Exception:
+                healthy = False
+            if not healthy:
+                self._stats.failed_health_checks += 1
+                return False
+        return True
+
+    async def _create(self) -> MySQLConnectionAbstract:
+        try:
+            conn = await self._conn_factory()
+        except BaseException:
+            async with self._available:
+                self._size -= 1
+                self._available.notify()
+            raise
+        self._created_at[id(conn)] = time.monotonic()
+        self._stats.created += 1
+        return conn
+
+    def _collect_abandoned(self) -> List[MySQLConnectionAbstract]:
+        """
+        Release slots of borrowed connections whose tasks have finished without
+        returning them. Must be called with the condition lock acquired.
+
+        returns:
+        a list of abandoned connections (to be closed by the caller)
+        """
+        ans = []
+        for conn_id, (conn, task) in list(self._borrowed.items()):
+            if task is not None and task.done():
+                del self._borrowed[conn_id]
+                self._created_at.pop(conn_id, None)
+                self._size -= 1
+                ans.append(conn)
+        if len(ans) > 0:
+            self._stats.reclaimed += len(ans)
+            logging.getLogger(__name__).warning(f'reclaimed {len(ans)} abandoned mysql connection(s)')
+        return ans
+
+    async def _wait_for_slot(self, t0: float, abandoned: List[MySQLConnectionAbstract]):
+        """
+        Wait until there is an idle connection or a free slot for a new one.
+        Must be called with the condition lock acquired. Reclaimed abandoned
+        connections are added to the 'abandoned' list.
+        """
+        waited = False
+        while len(self._idle) == 0 and self._size >= self._max_size:
+            reclaimed = self._collect_abandoned()
+            if len(reclaimed) > 0:
+                abandoned.extend(reclaimed)
+                continue
+            if not waited:
+                self._stats.exhausted += 1
+                waited = True
+            remaining = self._acquire_timeout - (time.monotonic() - t0)
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                await asyncio.wait_for(self._available.wait(), min(remaining, RECLAIM_CHECK_INTERVAL))
+            except asyncio.TimeoutError:
+                if remaining > RECLAIM_CHECK_INTERVAL:
+                    continue
+                self._stats.timeouts += 1
+                raise PoolExhausted(
+                    f'no mysql connection available within {self._acquire_timeout}s, stats: {self.stats()}')
+
+    async def _discard(self, conns: List[MySQLConnectionAbstract]):
+        for conn in conns:
+            self._stats.closed += 1
+            try:
+                await conn.close()
+            except Exception as ex:
+                logging.getLogger(__name__).warning(f'failed to close an abandoned mysql connection: {ex}')
+
+    async def acquire(self) -> MySQLConnectionAbstract:
+        """
+        Borrow a connection. The connection must be returned via release().
+
+        raises:
+        PoolExhausted -- if no connection is available within the acquire timeout
+        """
+        t0 = time.monotonic()
+        abandoned: List[MySQLConnectionAbstract] = []
+        try:
+            while True:
+                async with self._available:
+                    await self._wait_for_slot(t0, abandoned)
+                    if len(self._idle) > 0:
+                        conn, created_at, last_used = self._idle.pop()
+                    else:
+                        self._size += 1
+                        conn = None
+                if conn is None:
+                    conn = await self._create()
+                    break
+                if await self._is_usable(conn, created_at, last_used):
+                    break
+                await self._close(conn)
+        finally:
+            await self._discard(abandoned)
+        self._borrowed[id(conn)] = (conn, asyncio.current_task())
+        wait = time.monotonic() - t0
+        self._stats.acquired += 1
+        self._stats.total_wait += wait
+        self._stats.max_wait = max(self._stats.max_wait, wait)
+        if wait >= SLOW_WAIT_LOG_THRESHOLD:
+            logging.getLogger(__name__).warning(
+                f'waited {wait:.2f}s for a mysql connection, stats: {self.stats()}')
+        return conn
+
+    async def release(self, conn: MySQLConnectionAbstract):
+        """
+        Return a borrowed connection back to the pool. A possible pending
+        transaction is rolled back.
+        """
+        if self._borrowed.pop(id(conn), None) is None:
+            logging.getLogger(__name__).warning('returned mysql connection not borrowed from the pool (ignoring)')
+            return
+        created_at = self._created_at.get(id(conn), 0)
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            reusable = time.monotonic() - created_at <= self._max_lifetime
+        except Exception as ex:
+            logging.getLogger(__name__).warning(f'failed to return a mysql connection to the pool: {ex}')
+            reusable = False
+        if reusable:
+            async with self._available:
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._available.notify()
+        else:
+            await self._close(conn)
+
+    async def close(self):
+        while len(self._idle) > 0:
+            await self._close(self._idle.pop()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        ans = asdict(self._stats)
+        ans['size'] = self._size
+        ans['idle'] = len(self._idle)
+        ans['borrowed'] = len(self._borrowed)
+        ans['max_size'] = self._max_size
+        ans['avg_wait'] = ans['total_wait'] / ans['acquired'] if ans['acquired'] > 0 else 0
+        return ans
+
+    def reset_stats(self):
+        self._stats = PoolStats()
@@ -30,16 +30,20 @@ element conc_cache {
 }
 
 """
+import asyncio
 import hashlib
 import logging
 import os
-from typing import Optional, Tuple, Union
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 
 import aiofiles.os
 import plugins
 from corplib.corpus import AbstractKCorpus
 from plugin_types.conc_cache import (AbstractCacheMappingFactory, AbstractConcCache, ConcCacheStatus)
-from plugin_types.general_storage import KeyValueStorage
+from plugin_types.general_storage import KeyValuePipeline, KeyValueStorage
 from plugins import inject
 
 
@@ -60,6 +64,14 @@ def _uniqname(corp_cache_key: Optional[str], query: Tuple[str, ...], cutoff: int
     return hashlib.sha1(('#'.join([q for q in query]) + corp_cache_key + str(cutoff)).encode('utf-8')).hexdigest()
 
 
+_local_listeners: Dict[str, Set[asyncio.Event]] = defaultdict(set)
+"""
+In-process listeners of cache entries status changes. This is used
+in case the DB plug-in does not support pub/sub channels and also
+to notify listeners within the same process without a round-trip to the DB.
+"""
+
+
 class DefaultCacheMapping(AbstractConcCache):
     """
     This class provides cache mapping between corp_cache_key+query and cached information
@@ -67,12 +79,38 @@ class DefaultCacheMapping(AbstractConcCache):
 
     Mapping looks like this:
     md5(corp_cache_key, q) => [stored_conc_size, calc_status, hash_of(corp_cache_key, q[0])]
+
+    To be able to remove all the entries derived from a base query without scanning
+    the whole corpus mapping, there is also a reverse index for each base query:
+    hash_of(corp_cache_key, q[0]) => {md5(corp_cache_key, q): 1, ...}
+    The index expires (Q0_INDEX_TTL) unless new entries are added. For entries without
+    an index (expired or created by older versions), the whole mapping is scanned.
+
+    Each time a cached concordance is loaded, its last access time and number of hits
+    are recorded (separately from the entry itself to prevent overwriting status
+    updates of running calculations):
+    md5(corp_cache_key, q) => last_access_time
+    and a counter (incremented atomically, expiring after HITS_TTL without access):
+    conc_cache_hits:{corpus}:{md5(corp_cache_key, q)} => num_hits
+    This is used by the cache monitor to decide which entries should be evicted first.
     """
 
     KEY_TEMPLATE = 'conc_cache:{}'
 
     DEBUG_KEY_TEMPLATE = 'conc_cache:debug:{}'
 
+    Q0_INDEX_KEY_TEMPLATE = 'conc_cache_q0:{}:{}'
+
+    Q0_INDEX_TTL = 7 * 24 * 3600
+
+    STATUS_CHANNEL_TEMPLATE = 'conc_cache:status:{}'
+
+    ACCESS_KEY_TEMPLATE = 'conc_cache_access:{}'
+
+    HITS_KEY_TEMPLATE = 'conc_cache_hits:{}:{}'
+
+    HITS_TTL = 30 * 24 * 3600
+
     def __init__(self, cache_dir: str, corpus: AbstractKCorpus, db: KeyValueStorage, is_debug: bool):
         self._cache_root_dir = cache_dir
         self._corpus = corpus
@@ -85,14 +123,56 @@ class DefaultCacheMapping(AbstractConcCache):
             return ConcCacheStatus.from_storage(**val)
         return None
 
-    async def _set_entry(self, corp_cache_key, q, cutoff, data: ConcCacheStatus):
-        to_write = data.to_dict()
+    def _write_entry(self, pipe: KeyValuePipeline, corp_cache_key, q, cutoff, data: ConcCacheStatus):
+        entry_key = _uniqname(corp_cache_key, q, cutoff)
         if self._is_debug:
-            await self._db.hash_set(
-                self._mk_debug_key(),
-                _uniqname(corp_cache_key, q, cutoff),
-                dict(corpus=corp_cache_key, q=q, cutoff=cutoff))
-        await self._db.hash_set(self._mk_key(), _uniqname(corp_cache_key, q, cutoff), to_write)
+            pipe.hash_set(self._mk_debug_key(), entry_key, dict(corpus=corp_cache_key, q=q, cutoff=cutoff))
+        pipe.hash_set(self._mk_key(), entry_key, data.to_dict())
+
+    async def _set_entry(self, corp_cache_key, q, cutoff, data: ConcCacheStatus):
+        async with self._db.pipeline() as pipe:
+            self._write_entry(pipe, corp_cache_key, q, cutoff, data)
+        await self._notify_status_change(_uniqname(corp_cache_key, q, cutoff))
+
+    async def _notify_status_change(self, entry_key: str):
+        for event in _local_listeners.get(entry_key, ()):
+            event.set()
+        try:
+            await self._db.publish_channel(
+                DefaultCacheMapping.STATUS_CHANNEL_TEMPLATE.format(entry_key), entry_key)
+        except NotImplementedError:
+            pass  # local listeners only
+        except Exception as ex:
+            # listeners fall back to polling so a failed notification must not break the status update
+            logging.getLogger(__name__).warning(f'failed to publish conc. cache status change: {ex}')
+
+    @asynccontextmanager
+    async def status_listener(self, corp_cache_key, q, cutoff) -> AsyncIterator[asyncio.Event]:
+        entry_key = _uniqname(corp_cache_key, q, cutoff)
+        event = asyncio.Event()
+
+        async def handler(msg: str) -> bool:
+            event.set()
+            return False
+
+        async def subscribe():
+            try:
+                await self._db.subscribe_channel(
+                    DefaultCacheMapping.STATUS_CHANNEL_TEMPLATE.format(entry_key), handler)
+            except NotImplementedError:
+                pass  # local listeners only
+            except Exception as ex:
+                logging.getLogger(__name__).warning(f'conc. cache status subscription failed: {ex}')
+
+        _local_listeners[entry_key].add(event)
+        subscription = asyncio.create_task(subscribe())
+        try:
+            yield event
+        finally:
+            subscription.cancel()
+            _local_listeners[entry_key].discard(event)
+            if len(_local_listeners[entry_key]) == 0:
+                del _local_listeners[entry_key]
 
     def _mk_key(self) -> str:
         return DefaultCacheMapping.KEY_TEMPLATE.format(self._corpus.corpname.lower())
@@ -100,6 +180,15 @@ class DefaultCacheMapping(AbstractConcCache):
     def _mk_debug_key(self) -> str:
         return DefaultCacheMapping.DEBUG_KEY_TEMPLATE.format(self._corpus.corpname.lower())
 
+    def _mk_access_key(self) -> str:
+        return DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format(self._corpus.corpname.lower())
+
+    def _mk_hits_key(self, entry_key: str) -> str:
+        return DefaultCacheMapping.HITS_KEY_TEMPLATE.format(self._corpus.corpname.lower(), entry_key)
+
+    def _mk_q0_index_key(self, q0hash: str) -> str:
+        return DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(self._corpus.corpname.lower(), q0hash)
+
     async def get_stored_calc_status(
             self, corp_cache_key: Optional[str], q: Tuple[str, ...], cutoff: int) -> Union[ConcCacheStatus, None]:
         return await self._get_entry(corp_cache_key, q, cutoff)
@@ -124,7 +213,20 @@ class DefaultCacheMapping(AbstractConcCache):
 
     async def readable_cache_path(self, corp_cache_key, q, cutoff) -> Optional[str]:
         val = await self._get_entry(corp_cache_key, q, cutoff)
-        return val.cachefile if val and val.readable and os.path.isfile(val.cachefile) else None
+        if val and val.readable and os.path.isfile(val.cachefile):
+            return val.cachefile
+        return None
+
+    async def record_access(self, corp_cache_key, q, cutoff):
+        entry_key = _uniqname(corp_cache_key, q, cutoff)
+        hits_key = self._mk_hits_key(entry_key)
+        try:
+            async with self._db.pipeline() as pipe:
+                pipe.hash_set(self._mk_access_key(), entry_key, time.time())
+                pipe.incr(hits_key)
+                pipe.set_ttl(hits_key, DefaultCacheMapping.HITS_TTL)
+        except Exception as ex:
+            logging.getLogger(__name__).warning(f'failed to record conc. cache access: {ex}')
 
     async def add_to_map(self, corp_cache_key, query, cutoff, calc_status, overwrite=False) -> ConcCacheStatus:
         """
@@ -136,7 +238,13 @@ class DefaultCacheMapping(AbstractConcCache):
             return prev_status
         calc_status.q0hash = _uniqname(corp_cache_key, query[:1], cutoff)
         calc_status.cachefile = self._create_cache_file_path(corp_cache_key, query, cutoff)
-        await self._set_entry(corp_cache_key, query, cutoff, calc_status)
+        entry_key = _uniqname(corp_cache_key, query, cutoff)
+        index_key = self._mk_q0_index_key(calc_status.q0hash)
+        async with self._db.pipeline() as pipe:
+            self._write_entry(pipe, corp_cache_key, query, cutoff, calc_status)
+            pipe.hash_set(index_key, entry_key, 1)
+        await self._db.set_ttl(index_key, DefaultCacheMapping.Q0_INDEX_TTL)
+        await self._notify_status_change(entry_key)
         return calc_status
 
     async def get_calc_status(
@@ -150,27 +258,48 @@ class DefaultCacheMapping(AbstractConcCache):
             await self._set_entry(corp_cache_key, query, cutoff, stored_data)
 
     async def del_entry(self, corp_cache_key, q, cutoff):
-        if self._is_debug:
-            await self._db.hash_del(self._mk_debug_key(), _uniqname(corp_cache_key, q, cutoff))
-        await self._db.hash_del(self._mk_key(), _uniqname(corp_cache_key, q, cutoff))
+        entry_key = _uniqname(corp_cache_key, q, cutoff)
+        async with self._db.pipeline() as pipe:
+            if self._is_debug:
+                pipe.hash_del(self._mk_debug_key(), entry_key)
+            pipe.hash_del(self._mk_key(), entry_key)
+            pipe.hash_del(self._mk_access_key(), entry_key)
+            pipe.remove(self._mk_hits_key(entry_key))
+            pipe.hash_del(self._mk_q0_index_key(_uniqname(corp_cache_key, q[:1], cutoff)), entry_key)
+        await self._notify_status_change(entry_key)
+
+    async def _find_q0_entries(self, q0hash: str) -> List[str]:
+        """
+        Find entries with a specified base query by scanning the whole
+        mapping (for entries not listed in a base query index).
+        """
+        ans = []
+        for k, stored in (await self._db.hash_get_all(self._mk_key())).items():
+            if type(stored) is not dict:
+                logging.getLogger(__name__).warning('Removed unsupported conc cache value: {}'.format(stored))
+                ans.append(k)
+            elif stored.get('q0hash') == q0hash:
+                # original record's key must be used (k ~ entry_key match can be partial)
+                ans.append(k)
+        return ans
 
     async def del_full_entry(self, corp_cache_key, q, cutoff):
-        for k, stored in (await self._db.hash_get_all(self._mk_key())).items():
-            if stored:
-                if type(stored) is not dict:
-                    logging.getLogger(__name__).warning(
-                        'Removed unsupported conc cache value: {}'.format(stored))
-                    await self._db.hash_del(self._mk_key(), k)
-                    if self._is_debug:
-                        await self._db.hash_del(self._mk_debug_key(), k)
-                else:
-                    status = ConcCacheStatus.from_storage(**stored)
-                    if _uniqname(corp_cache_key, q[:1], cutoff) == status.q0hash:
-                        # original record's key must be used (k ~ entry_key match can be partial)
-                        # must use direct access here (no del_entry())
-                        await self._db.hash_del(self._mk_key(), k)
-                        if self._is_debug:
-                            await self._db.hash_del(self._mk_debug_key(), k)
+        q0hash = _uniqname(corp_cache_key, q[:1], cutoff)
+        index_key = self._mk_q0_index_key(q0hash)
+        entry_keys = list((await self._db.hash_get_all(index_key)).keys())
+        if len(entry_keys) == 0:
+            entry_keys = await self._find_q0_entries(q0hash)
+        # must use direct access here (no del_entry())
+        async with self._db.pipeline() as pipe:
+            pipe.hash_del_many(self._mk_key(), entry_keys)
+            pipe.hash_del_many(self._mk_access_key(), entry_keys)
+            for k in entry_keys:
+                pipe.remove(self._mk_hits_key(k))
+            if self._is_debug:
+                pipe.hash_del_many(self._mk_debug_key(), entry_keys)
+            pipe.remove(index_key)
+        for k in entry_keys:
+            await self._notify_status_change(k)
 
 
 class CacheMappingFactory(AbstractCacheMappingFactory):
@@ -199,13 +328,18 @@ class CacheMappingFactory(AbstractCacheMappingFactory):
             return await run_cleanup(
                 root_dir=self._cache_dir,
                 corpus_id=corpus_id, ttl_hours=ttl_hours, subdir=subdir, dry_run=dry_run,
-                db_plugin=self._db, entry_key_gen=lambda c: DefaultCacheMapping.KEY_TEMPLATE.format(c))
+                db_plugin=self._db, entry_key_gen=lambda c: DefaultCacheMapping.KEY_TEMPLATE.format(c),
+                q0_index_key_gen=lambda c, q0: DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(c, q0),
+                access_key_gen=lambda c: DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format(c),
+                hits_key_gen=lambda c, item: DefaultCacheMapping.HITS_KEY_TEMPLATE.format(c, item))
 
         async def conc_cache_monitor(min_file_age, free_capacity_goal, free_capacity_trigger, elastic_conf):
             """
             This function is exported as a Celery task within KonText's worker and
             is intended to be used via Celery Beat as an additional monitoring and
-            protection in situations when system load jumps high.
+            protection in situations when system load jumps high. Files are removed
+            according to a cost-aware policy (see eviction.py) so popular concordances
+            which are expensive to calculate are kept as long as possible.
 
             arguments:
             min_file_age -- a minimum age a cache file must be of to be deletable (in seconds)
@@ -217,6 +351,9 @@ class CacheMappingFactory(AbstractCacheMappingFactory):
             return await run_monitor(
                 root_dir=self._cache_dir, db_plugin=self._db,
                 entry_key_gen=lambda c: DefaultCacheMapping.KEY_TEMPLATE.format(c),
+                q0_index_key_gen=lambda c, q0: DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(c, q0),
+                access_key_gen=lambda c: DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format(c),
+                hits_key_gen=lambda c, item: DefaultCacheMapping.HITS_KEY_TEMPLATE.format(c, item),
                 min_file_age=min_file_age, free_capacity_goal=free_capacity_goal,
                 free_capacity_trigger=free_capacity_trigger, elastic_conf=elastic_conf)
 
@@ -25,13 +25,26 @@ import collections
 import logging
 import os
 import time
-from typing import Dict, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import aiofiles.os
+from plugin_types.conc_cache import DISPERSION_FILE_SUFFIX, dispersion_cache_path
 from plugin_types.general_storage import KeyValueStorage
 
+
 DEFAULT_TTL = 60  # in minutes
 
+DEL_BATCH_SIZE = 500
+"""
+max. number of expired cache files processed (and removed) at once
+"""
+
+CHECKPOINT_KEY = 'conc_cache:cleanup:checkpoint'
+
+CHECKPOINT_TTL = 7 * 24 * 3600
+"""
+an interrupted clean-up is resumed only if the next run starts within this time (in seconds)
+"""
+
 
 class CacheFiles(object):
 
@@ -41,10 +54,15 @@ class CacheFiles(object):
         self._corpus = corpus
         self._curr_time = time.time()
 
-    async def list_dir(self) -> Dict[str, Tuple[str, float, int]]:
+    @property
+    def _path(self) -> str:
+        return self._root_path if not self._subdir else os.path.normpath(
+            os.path.join(self._root_path, self._subdir))
+
+    def list_corpora(self) -> List[str]:
         """
-        Searches for cache files in a directory specified by the 'path'
-        argument. The method expects a specific fixed directory structure:
+        Return (sorted) names of corpora cache directories. The method expects
+        a specific fixed directory structure:
         [path]
           [corpname_1]
             cache_file_1_1
@@ -53,77 +71,217 @@ class CacheFiles(object):
           [corpname_2]
           ...
           [corpname_N]
+        """
+        if self._corpus:
+            return [self._corpus] if os.path.isdir(os.path.join(self._path, self._corpus)) else []
+        elif os.path.isdir(self._path):
+            with os.scandir(self._path) as entries:
+                return sorted(entry.name for entry in entries if entry.is_dir())
+        return []
 
-        It means it does not search recursively.
+    def corpus_key(self, corpus_dir: str) -> str:
+        return corpus_dir if not self._subdir else os.path.join(self._subdir, corpus_dir)
 
-        returns:
-        a dict [corpus_id] => [list of 3-tuples]
-        where 3-tuple is
-        (cache_file_abs_path, age_of_file_in_sec, size_of_file_in_Bytes)
+    def iter_files(self, corpus_dir: str) -> Iterator[Tuple[str, float, int]]:
         """
-        path = self._root_path if not self._subdir else os.path.normpath(
-            os.path.join(self._root_path, self._subdir))
-        if self._corpus:
-            corpora_dirs = [self._corpus]
-        elif await aiofiles.os.path.isdir(path):
-            corpora_dirs = os.listdir(path)
-        else:
-            corpora_dirs = []
+        Iterate over cache files of a corpus (non-recursively) without loading
+        the whole directory listing into memory.
 
-        ans = collections.defaultdict(list)
-        for corpus_dir in corpora_dirs:
-            corp_full_path = os.path.join(path, corpus_dir)
-            if not await aiofiles.os.path.isdir(corp_full_path):
-                continue
-            for cache_file in os.listdir(corp_full_path):
-                cache_full_path = os.path.join(corp_full_path, cache_file)
-                corpus_key = corpus_dir if not self._subdir else os.path.join(
-                    self._subdir, corpus_dir)
-                ans[corpus_key].append(
-                    (cache_full_path,
-                     self._curr_time - (await aiofiles.os.path.getmtime(cache_full_path)),
-                     await aiofiles.os.path.getsize(cache_full_path)))
-        return dict(ans)
+        returns:
+        an iterator of 3-tuples (cache_file_abs_path, age_of_file_in_sec, size_of_file_in_Bytes)
+        """
+        with os.scandir(os.path.join(self._path, corpus_dir)) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed in the meantime
+                yield entry.path, self._curr_time - st.st_mtime, st.st_size
 
 
 class CacheCleanup(CacheFiles):
 
-    def __init__(self, db: KeyValueStorage, root_path, corpus, ttl_hours, subdir, entry_key_gen):
+    def __init__(
+            self, db: KeyValueStorage, root_path, corpus, ttl_hours, subdir, entry_key_gen, q0_index_key_gen,
+            access_key_gen=None, hits_key_gen=None):
         super(CacheCleanup, self).__init__(root_path, subdir, corpus)
         self._db = db
         self._ttl_hours = ttl_hours
         self._entry_key_gen = entry_key_gen
+        self._q0_index_key_gen = q0_index_key_gen
+        self._access_key_gen = access_key_gen
+        self._hits_key_gen = hits_key_gen
         self._num_processed = 0
         self._num_removed = 0
 
+    @property
+    def _checkpoint_key(self) -> str:
+        return f'{CHECKPOINT_KEY}:{self._subdir}' if self._subdir else CHECKPOINT_KEY
+
+    async def _load_checkpoint(self) -> Optional[str]:
+        checkpoint = await self._db.get(self._checkpoint_key)
+        return checkpoint.get('corpus') if isinstance(checkpoint, dict) else None
+
+    async def _save_checkpoint(self, corpus_dir: str):
+        await self._db.set(self._checkpoint_key, dict(corpus=corpus_dir, updated=time.time()))
+        await self._db.set_ttl(self._checkpoint_key, CHECKPOINT_TTL)
+
+    async def _del_entries(self, corpus_id: str, cache_key: str, items: Dict[str, Any]):
+        """
+        Remove cache map entries (item_hash => item) along with their
+        base query index records using a single pipeline.
+        """
+        q0_index = collections.defaultdict(list)
+        for item_hash, item in items.items():
+            if type(item) is dict and item.get('q0hash'):
+                q0_index[self._q0_index_key_gen(corpus_id, item['q0hash'])].append(item_hash)
+        async with self._db.pipeline() as pipe:
+            pipe.hash_del_many(cache_key, list(items.keys()))
+            if self._access_key_gen:
+                pipe.hash_del_many(self._access_key_gen(corpus_id), list(items.keys()))
+            if self._hits_key_gen:
+                for item_hash in items.keys():
+                    pipe.remove(self._hits_key_gen(corpus_id, item_hash))
+            for q0_key, item_hashes in q0_index.items():
+                pipe.hash_del_many(q0_key, item_hashes)
+
     @staticmethod
-    def _log_stats(files):
-        for k, v in list(files.items()):
-            logging.getLogger(__name__).info({
-                'type': 'file_count',
-                'directory': k,
-                'count': len(v)
-            })
+    def _remove_dispersion_file(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            logging.getLogger(__name__).warning(f'Failed to remove file {path}: {ex}')
+
+    async def _remove_expired(self, corpus_id: str, cache_key: str, expired: Dict[str, str], dry_run: bool) -> int:
+        """
+        Remove a batch of expired cache files (item_hash => path) along with
+        their cache map entries. Files without a cache map entry (= unbound files)
+        are removed too. Files read within the TTL are kept.
+
+        returns:
+        number of removed cache map entries
+        """
+        item_hashes = list(expired.keys())
+        items = await self._db.hash_get_many(cache_key, item_hashes)
+        if self._access_key_gen:
+            access = await self._db.hash_get_many(self._access_key_gen(corpus_id), item_hashes)
+        else:
+            access = [None] * len(item_hashes)
+        entries_to_del = {}
+        for item_hash, item, last_access in zip(item_hashes, items, access):
+            if (item is not None and isinstance(last_access, (int, float))
+                    and self._curr_time - last_access <= self._ttl_hours * 3600):
+                continue
+            if item is None:
+                logging.getLogger(__name__).warning(f'deleted unbound cache file: {expired[item_hash]}')
+            else:
+                entries_to_del[item_hash] = item
+            if not dry_run:
+                try:
+                    os.unlink(expired[item_hash])
+                except OSError as ex:
+                    logging.getLogger(__name__).warning(f'Failed to remove file {expired[item_hash]}: {ex}')
+                self._remove_dispersion_file(dispersion_cache_path(expired[item_hash]))
+        if len(entries_to_del) > 0 and not dry_run:
+            await self._del_entries(corpus_id, cache_key, entries_to_del)
+        return len(entries_to_del)
+
+    async def _remove_stale_entries(
+            self, corpus_id: str, cache_key: str, real_file_hashes: set, scan_start: float, dry_run: bool):
+        """
+        Remove cache map entries (and access records) without a matching file.
+        Entries created after the corpus directory scan started are ignored as their
+        files may have been created after the scan passed them.
+        """
+        stale = {}
+        for item_hash, item in (await self._db.hash_get_all(cache_key)).items():
+            if item_hash in real_file_hashes:
+                continue
+            if type(item) is dict and item.get('created', 0) >= scan_start:
+                continue
+            stale[item_hash] = item
+            logging.getLogger(__name__).warning(f'deleted stale cache map entry [{cache_key}][{item_hash}]')
+        if len(stale) > 0 and not dry_run:
+            await self._del_entries(corpus_id, cache_key, stale)
+        if self._access_key_gen and not dry_run:
+            access_key = self._access_key_gen(corpus_id)
+            orphans = [
+                item_hash for item_hash, last_access in (await self._db.hash_get_all(access_key)).items()
+                if item_hash not in real_file_hashes
+                and (not isinstance(last_access, (int, float)) or last_access < scan_start)]
+            if len(orphans) > 0:
+                async with self._db.pipeline() as pipe:
+                    pipe.hash_del_many(access_key, orphans)
+                    if self._hits_key_gen:
+                        for item_hash in orphans:
+                            pipe.remove(self._hits_key_gen(corpus_id, item_hash))
+
+    async def _process_corpus(self, corpus_dir: str, dry_run: bool) -> Tuple[int, int]:
+        """
+        returns:
+        a 2-tuple (num. of processed files, num. of deleted cache entries)
+        """
+        corpus_id = self.corpus_key(corpus_dir)
+        cache_key = self._entry_key_gen(corpus_id)
+        scan_start = time.time()
+        num_processed = 0
+        num_deleted = 0
+        real_file_hashes = set()  # to be able to compare cache map with actual files
+        expired = {}
+        for item_path, item_age, item_size in self.iter_files(corpus_dir):
+            if item_path.endswith(DISPERSION_FILE_SUFFIX):
+                # cached dispersion is removed along with its concordance file
+                if not dry_run and not os.path.exists(os.path.splitext(item_path)[0] + '.conc'):
+                    self._remove_dispersion_file(item_path)
+                continue
+            num_processed += 1
+            item_key = os.path.basename(item_path).rsplit('.conc')[0]
+            real_file_hashes.add(item_key)
+            if self._ttl_hours * 3600 < item_age:
+                expired[item_key] = item_path
+                if len(expired) >= DEL_BATCH_SIZE:
+                    num_deleted += await self._remove_expired(corpus_id, cache_key, expired, dry_run)
+                    expired = {}
+        if len(expired) > 0:
+            num_deleted += await self._remove_expired(corpus_id, cache_key, expired, dry_run)
+        try:
+            await self._remove_stale_entries(corpus_id, cache_key, real_file_hashes, scan_start, dry_run)
+        except Exception as ex:
+            logging.getLogger(__name__).warning(f'Failed to process cache map {cache_key} (will be deleted): {ex}')
+            if not dry_run:
+                await self._db.remove(cache_key)
+        logging.getLogger(__name__).info({
+            'type': 'file_count',
+            'directory': corpus_id,
+            'count': num_processed
+        })
+        return num_processed, num_deleted
 
     async def run(self, dry_run=False):
         """
-        Performs the clean-up operation by taking the following sequence of steps:
-         1. lists all cache files in individual corpora cache dirs
-         2. for all the corpora
-           2.1 find which files are old enough (see TTL) to be deleted
-           2.2 find an cache map entry in Redis and iterate over records found there
-             2.2.1 if a record matches a file which is waiting to be deleted, then both the
-                    file and the record are removed
-             2.2.2 if a record does not match any existing file than it is removed with
-                   logged warning about a stale record
-           2.3 if there are still some files to be deleted it means that they are 'unbound'
-               (= there is no record in the respective cache map file);
-                these files are also deleted with a warning
+        Performs the clean-up operation corpus by corpus (in alphabetical order).
+        For each corpus:
+         1. cache files are streamed from the corpus cache directory; files older
+            than TTL and not read within the TTL are processed in batches:
+           1.1 their cache map entries are fetched at once
+           1.2 the files are deleted along with their cache map entries (and cached dispersion
+               files); files without a cache map entry are 'unbound' and they are deleted with a warning
+           1.3 cached dispersion files without a concordance file are deleted
+         2. cache map entries not matching any existing file are removed with logged
+            warning about a stale record
+
+        Once a corpus is processed, a checkpoint is stored so an interrupted run
+        is resumed by the next one (starting with the first unprocessed corpus).
+        A run limited to a single corpus and a dry run do not use checkpoints.
 
         Please note that this algorithm is unable to remove stale cache map entries as long
-        as there is no existing file within a matching directory (e.g. there is a bunch
-        of records for the "syn2010" corpus in Redis but the cache directory "/path/to/cache/syn2010"
-        is empty). During normal operation, the system should be able to fix such consistency
+        as there is no existing directory for a corpus (e.g. there is a bunch of records
+        for the "syn2010" corpus in Redis but the cache directory "/path/to/cache/syn2010"
+        does not exist). During normal operation, the system should be able to fix such consistency
         deviations. But it is a good idea to check the mapping from time to time whether there
         are no stale records (e.g. after a corpus was removed/blocked).
 
@@ -132,57 +290,34 @@ class CacheCleanup(CacheFiles):
         """
         num_deleted = 0
         num_processed = 0
-
-        cache_files = await self.list_dir()
-        self._log_stats(cache_files)
-        to_del = {}
-        # processing corpus by corpus
-        for corpus_id, corpus_cache_files in cache_files.items():
-            real_file_hashes = set()  # to be able to compare cache map with actual files
-            for item_path, item_age, item_size in corpus_cache_files:
-                num_processed += 1
-                item_key = os.path.basename(item_path).rsplit('.conc')[0]
-                real_file_hashes.add(item_key)
-                if self._ttl_hours * 3600 < item_age:
-                    to_del[item_key] = item_path
-
-            cache_key = self._entry_key_gen(corpus_id)
-            cache_map = await self._db.hash_get_all(cache_key)
-            if cache_map:
-                try:
-                    for item_hash, _ in list(cache_map.items()):
-                        if item_hash in to_del:
-                            if not dry_run:
-                                os.unlink(to_del[item_hash])
-                                await self._db.hash_del(cache_key, item_hash)
-                            else:
-                                del to_del[item_hash]
-                            num_deleted += 1
-                        elif item_hash not in real_file_hashes:
-                            if not dry_run:
-                                await self._db.hash_del(cache_key, item_hash)
-                            logging.getLogger().warning(
-                                'deleted stale cache map entry [%s][%s]' % (cache_key, item_hash))
-                except Exception as ex:
-                    logging.getLogger().warning('Failed to process cache map file (will be deleted): %s' % (ex,))
-                    await self._db.remove(cache_key)
-            else:
-                logging.getLogger().error('Cache map [%s] not found' % cache_key)
-                for item_hash, unbound_file in to_del.items():
-                    if not dry_run:
-                        try:
-                            os.unlink(unbound_file)
-                        except OSError as ex:
-                            logging.getLogger().warning('Failed to remove file %s: %s' % (unbound_file, ex))
-                    logging.getLogger().warning('deleted unbound cache file: %s' % unbound_file)
+        use_checkpoint = not dry_run and not self._corpus
+        last_done = await self._load_checkpoint() if use_checkpoint else None
+        if last_done:
+            logging.getLogger(__name__).info(f'resuming interrupted clean-up after corpus {last_done}')
+        for corpus_dir in self.list_corpora():
+            if last_done and corpus_dir <= last_done:
+                continue
+            try:
+                corp_processed, corp_deleted = await self._process_corpus(corpus_dir, dry_run)
+            except FileNotFoundError:
+                continue  # corpus directory removed in the meantime
+            num_processed += corp_processed
+            num_deleted += corp_deleted
+            if use_checkpoint:
+                await self._save_checkpoint(corpus_dir)
+        if use_checkpoint:
+            await self._db.remove(self._checkpoint_key)
 
         ans = {'type': 'summary', 'processed': num_processed, 'deleted': num_deleted}
         logging.getLogger(__name__).info(ans)
         return ans
 
 
-async def run(root_dir, corpus_id, ttl_hours, subdir, dry_run, db_plugin, entry_key_gen):
+async def run(
+        root_dir, corpus_id, ttl_hours, subdir, dry_run, db_plugin, entry_key_gen, q0_index_key_gen,
+        access_key_gen=None, hits_key_gen=None):
     proc = CacheCleanup(
         db=db_plugin, root_path=root_dir, corpus=corpus_id, ttl_hours=ttl_hours, subdir=subdir,
-        entry_key_gen=entry_key_gen)
+        entry_key_gen=entry_key_gen, q0_index_key_gen=q0_index_key_gen, access_key_gen=access_key_gen,
+        hits_key_gen=hits_key_gen)
     return await proc.run(dry_run=dry_run)
@@ -0,0 +1,75 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A cost-aware eviction policy for concordance cache files. A file is a good candidate
+for removal if it is large, it has not been used for a long time, it has been used
+only a few times and it can be recalculated quickly. I.e. popular concordances which
+are expensive to calculate are kept as long as possible.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+MIN_RECALC_TIME = 1.0
+"""
+a recalculation time (in seconds) used for quick and unknown (e.g. unfinished,
+unbound) calculations; this prevents very quick calculations from getting extreme scores
+"""
+
+
+def access_record(last_access: Any, num_hits: Any) -> Optional[List[Union[float, int]]]:
+    """
+    Create an access record [last_access_time, num_hits] out of stored
+    access data (None if the entry has never been read).
+    """
+    if last_access is None:
+        return None
+    return [last_access, int(num_hits) if num_hits else 0]
+
+
+def recalc_time(status: Optional[Dict[str, Any]]) -> float:
+    """
+    Estimate how long a concordance calculation takes based on serialized
+    ConcCacheStatus (time of creation and time of the last update)
+    """
+    if type(status) is not dict or not status.get('finished') or status.get('error'):
+        return MIN_RECALC_TIME
+    return max(status.get('last_upd', 0) - status.get('created', 0), MIN_RECALC_TIME)
+
+
+def eviction_score(
+        size: int,
+        age: float,
+        status: Optional[Dict[str, Any]],
+        access: Optional[List[Union[float, int]]],
+        curr_time: float) -> float:
+    """
+    Calculate eviction score of a cache file. Files with higher score should
+    be removed first.
+
+    arguments:
+    size -- file size in bytes
+    age -- file age in seconds (used as an idle time in case there is no access record)
+    status -- serialized ConcCacheStatus of the file (None for unbound files)
+    access -- an access record [last_access_time, num_hits] (None if never read)
+    curr_time -- current time
+    """
+    if access:
+        idle_time, num_hits = max(curr_time - access[0], 0), access[1]
+    else:
+        idle_time, num_hits = age, 0
+    return size * idle_time / (recalc_time(status) * (1 + num_hits))
@@ -36,6 +36,9 @@ if __name__ == '__main__':
     def mk_key(corpus_id):
         return DefaultCacheMapping.KEY_TEMPLATE.format(corpus_id)
 
+    def mk_q0_index_key(corpus_id, q0hash):
+        return DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(corpus_id, q0hash)
+
     parser = argparse.ArgumentParser(description='A script to control UCNK concordance cache')
     parser.add_argument('--dry-run', '-d', action='store_true',
                         help='Just analyze, do not modify anything')
@@ -60,4 +63,5 @@ if __name__ == '__main__':
     root_dir = autoconf.settings.get('plugins', 'conc_cache')['cache_dir']
 
     asyncio.run(cleanup.run(root_dir=root_dir, corpus_id=args.corpus, ttl=args.ttl, subdir=args.subdir,
-                            dry_run=args.dry_run, db_plugin=plugins.runtime.DB.instance, entry_key_gen=mk_key))
+                            dry_run=args.dry_run, db_plugin=plugins.runtime.DB.instance, entry_key_gen=mk_key,
+                            q0_index_key_gen=mk_q0_index_key))
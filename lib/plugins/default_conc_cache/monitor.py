@@ -12,14 +12,17 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
+import heapq
 import os
 import os.path
 import time
+from collections import defaultdict
 from datetime import datetime
 from hashlib import sha1
+from typing import List, Tuple
 
-import aiofiles.os
 import ujson as json
+from plugin_types.conc_cache import DISPERSION_FILE_SUFFIX, dispersion_cache_path
 from plugin_types.general_storage import KeyValueStorage
 
 try:
@@ -27,6 +30,19 @@ try:
 except ImportError:
     from .es_dummy import Elasticsearch
 
+from .eviction import access_record, eviction_score
+
+DEL_BATCH_SIZE = 100
+"""
+max. number of cache files whose map entries are removed at once
+"""
+
+SCORE_BATCH_SIZE = 500
+"""
+max. number of cache files whose map entries and access records are fetched at once
+to calculate eviction scores
+"""
+
 
 def get_disk_free_space(path):
     info = os.statvfs(path)
@@ -43,40 +59,114 @@ class Record(object):
 
 class Monitor(object):
 
-    def __init__(self, root_dir, db_plugin: KeyValueStorage, entry_key_gen, min_file_age, free_capacity_goal, free_capacity_trigger,
-                 elastic_conf):
+    def __init__(self, root_dir, db_plugin: KeyValueStorage, entry_key_gen, q0_index_key_gen, min_file_age,
+                 free_capacity_goal, free_capacity_trigger, elastic_conf, access_key_gen=None, hits_key_gen=None):
         """
         arguments:
             root_dir -- cache root directory
             db_plugin -- KonText database plug-in
             entry_key_gen -- a function generating first level key for
                              a specific corpus cache entries within key-value database
+            q0_index_key_gen -- a function generating a key of the base query reverse index
+                                for a specific corpus and base query hash
             min_file_age -- a minimum age a cache file must be of to be deletable (in seconds)
             free_capacity_goal -- a minimum capacity the task will try to free up in a single run (in bytes)
             free_capacity_trigger -- a maximum disk free capacity which triggers file removal process
             elastic_conf -- a tuple (URL, index, type) containing ElasticSearch server, index and document type
                             configuration for storing monitoring info; if None then the function is disabled
+            access_key_gen -- a function generating a key of cache entries access records for a specific corpus;
+                              if None then access statistics are not used for choosing files to be removed
+            hits_key_gen -- a function generating a key of a cache entry hit counter for a specific corpus
+                            and cache entry hash
         """
         self._root_dir = root_dir
         self.db_plugin = db_plugin
         self.entry_key_gen = entry_key_gen
+        self.q0_index_key_gen = q0_index_key_gen
+        self.access_key_gen = access_key_gen
+        self.hits_key_gen = hits_key_gen
         self.min_file_age = min_file_age
         self.free_capacity_goal = free_capacity_goal
         self.free_capacity_trigger = free_capacity_trigger
         self.elastic_conf = elastic_conf
-        self._data = []
         self._time = None
+        self._num_files = 0
+        self._total_bytes = 0
+        self._top_10: List[int] = []
+        # min-heap of (eviction score, seq, Record) containing the best removal candidates
+        self._candidates: List[Tuple[float, int, Record]] = []
+        self._candidates_size = 0
+        self._seq = 0
 
-    async def create_record(self, file_path):
-        return Record(file_path, round(self._time - (await aiofiles.os.path.getctime(file_path))), await aiofiles.os.path.getsize(file_path))
+    def iter_records(self, path):
+        """
+        Walk (iteratively, without building a complete listing) all the files
+        within the path and yield them as Records.
+        """
+        dirs = [path]
+        while dirs:
+            with os.scandir(dirs.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.path)
+                        else:
+                            st = entry.stat()
+                            yield Record(entry.path, round(self._time - st.st_ctime), st.st_size)
+                    except FileNotFoundError:
+                        pass  # removed in the meantime
 
-    async def analyze_directory(self, path):
-        for item in os.listdir(path):
-            abs_path = os.path.join(path, item)
-            if await aiofiles.os.path.isdir(abs_path):
-                await self.analyze_directory(abs_path)
+    def _add_candidate(self, record, score):
+        """
+        Keep only as many of the best (= with the highest eviction score) removal candidates
+        as needed to reach free_capacity_goal.
+        """
+        self._seq += 1
+        heapq.heappush(self._candidates, (score, self._seq, record))
+        self._candidates_size += record.size
+        while self._candidates_size - self._candidates[0][2].size >= self.free_capacity_goal:
+            self._candidates_size -= heapq.heappop(self._candidates)[2].size
+
+    async def _add_candidates(self, records):
+        """
+        Calculate eviction scores of cache files from the same directory (= corpus)
+        and add them to removal candidates.
+        """
+        corpus_id = os.path.basename(os.path.dirname(records[0].path))
+        item_hashes = [self.parse_conc_code(r.path)[1] for r in records]
+        statuses = await self.db_plugin.hash_get_many(self.entry_key_gen(corpus_id), item_hashes)
+        if self.access_key_gen:
+            last_access = await self.db_plugin.hash_get_many(self.access_key_gen(corpus_id), item_hashes)
+            if self.hits_key_gen:
+                hits = await self.db_plugin.get_many([self.hits_key_gen(corpus_id, h) for h in item_hashes])
             else:
-                self._data.append(await self.create_record(abs_path))
+                hits = [None] * len(records)
+            access = [access_record(la, nh) for la, nh in zip(last_access, hits)]
+        else:
+            access = [None] * len(records)
+        for record, status, acc in zip(records, statuses, access):
+            self._add_candidate(record, eviction_score(record.size, record.age, status, acc, self._time))
+
+    async def analyze_directory(self, path, find_candidates):
+        batch = []
+        for record in self.iter_records(path):
+            self._num_files += 1
+            self._total_bytes += record.size
+            if len(self._top_10) < 10:
+                heapq.heappush(self._top_10, record.size)
+            elif record.size > self._top_10[0]:
+                heapq.heapreplace(self._top_10, record.size)
+            # cached dispersion files are removed along with their concordance files
+            if find_candidates and record.age > self.min_file_age and not record.path.endswith(
+                    DISPERSION_FILE_SUFFIX):
+                if len(batch) > 0 and (
+                        len(batch) >= SCORE_BATCH_SIZE or
+                        os.path.dirname(batch[0].path) != os.path.dirname(record.path)):
+                    await self._add_candidates(batch)
+                    batch = []
+                batch.append(record)
+        if len(batch) > 0:
+            await self._add_candidates(batch)
 
     @staticmethod
     def create_doc_hash(doc):
@@ -84,15 +174,17 @@ class Monitor(object):
 
     async def run(self):
         self._time = time.time()
-        self._data = []
-        await self.analyze_directory(self._root_dir)
+        self._num_files = 0
+        self._total_bytes = 0
+        self._top_10 = []
+        self._candidates = []
+        self._candidates_size = 0
         free_sp = get_disk_free_space(self._root_dir)
-        top_10 = self.get_10_largest_items_size()
-        total_files = len(self._data)
-        total_bytes = sum(v.size for v in self._data)
+        await self.analyze_directory(self._root_dir, find_candidates=free_sp < self.free_capacity_trigger)
 
-        ans = dict(datetime=self.export_timestamp(), top_10_sum_bytes=round(top_10 / 1e6), num_cache_files=total_files,
-                   sum_cache_bytes=round(total_bytes / 1e6), disk_free_bytes=round(free_sp / 1e6))
+        ans = dict(datetime=self.export_timestamp(), top_10_sum_bytes=round(sum(self._top_10) / 1e6),
+                   num_cache_files=self._num_files, sum_cache_bytes=round(self._total_bytes / 1e6),
+                   disk_free_bytes=round(free_sp / 1e6))
 
         if free_sp < self.free_capacity_trigger:
             rm_ans = await self.find_rm_candidates()
@@ -107,40 +199,79 @@ class Monitor(object):
     def export_timestamp(self):
         return time.strftime('%Y-%m-%dT%H:%M:%S', datetime.fromtimestamp(self._time).timetuple())
 
-    def get_10_largest_items_size(self):
-        return sum(x.size for x in sorted(self._data, key=lambda x: x.size, reverse=True)[:10])
-
     def parse_conc_code(self, path):
         return self.entry_key_gen(os.path.basename(os.path.dirname(path))), os.path.basename(path)[:-len('.conc')]
 
+    async def del_entries(self, records):
+        """
+        Remove cache map entries (including base query index records) of multiple
+        cache files. For each corpus, the entries are fetched at once and all
+        the removals are sent within a single pipeline.
+        """
+        by_corpus = defaultdict(list)
+        for record in records:
+            by_corpus[os.path.basename(os.path.dirname(record.path))].append(record)
+        async with self.db_plugin.pipeline() as pipe:
+            for corpus_id, corp_records in by_corpus.items():
+                key = self.entry_key_gen(corpus_id)
+                item_hashes = [self.parse_conc_code(r.path)[1] for r in corp_records]
+                items = await self.db_plugin.hash_get_many(key, item_hashes)
+                pipe.hash_del_many(key, item_hashes)
+                if self.access_key_gen:
+                    pipe.hash_del_many(self.access_key_gen(corpus_id), item_hashes)
+                if self.hits_key_gen:
+                    for item_hash in item_hashes:
+                        pipe.remove(self.hits_key_gen(corpus_id, item_hash))
+                for item_hash, item in zip(item_hashes, items):
+                    if type(item) is dict and item.get('q0hash'):
+                        pipe.hash_del(self.q0_index_key_gen(corpus_id, item['q0hash']), item_hash)
+
     async def find_rm_candidates(self):
-        rmlist = sorted([v for v in self._data if v.age > self.min_file_age],
-                        key=lambda v: v.size * v.age, reverse=True)
+        rmlist = [v[2] for v in sorted(self._candidates, reverse=True)]
         total = 0
+        num_removed = 0
         i = 0
         errors = []
         while i < len(rmlist) and total < self.free_capacity_goal:
-            try:
-                key, key2 = self.parse_conc_code(rmlist[i].path)
-                await self.db_plugin.hash_del(key, key2)
-                os.unlink(rmlist[i].path)
-                total += rmlist[i].size
+            batch = []
+            batch_size = 0
+            while i < len(rmlist) and len(batch) < DEL_BATCH_SIZE and total + batch_size < self.free_capacity_goal:
+                batch.append(rmlist[i])
+                batch_size += rmlist[i].size
                 i += 1
+            try:
+                await self.del_entries(batch)
             except Exception as e:
                 errors.append(e)
-        return dict(num_removed=i, bytes_removed=total, num_errors=len(errors),
+                continue
+            for item in batch:
+                try:
+                    os.unlink(item.path)
+                    total += item.size
+                    num_removed += 1
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                try:
+                    os.unlink(dispersion_cache_path(item.path))
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    errors.append(e)
+        return dict(num_removed=num_removed, bytes_removed=total, num_errors=len(errors),
                     first_error=errors[0] if len(errors) > 0 else None)
 
     def remove_item(self):
         pass
 
 
-async def run(db_plugin, entry_key_gen, root_dir, min_file_age, free_capacity_goal, free_capacity_trigger,
-              elastic_conf=None):
+async def run(db_plugin, entry_key_gen, q0_index_key_gen, root_dir, min_file_age, free_capacity_goal,
+              free_capacity_trigger, elastic_conf=None, access_key_gen=None, hits_key_gen=None):
     """
     See Monitor.__init__() for arguments.
     """
     monitor = Monitor(root_dir=root_dir, db_plugin=db_plugin, entry_key_gen=entry_key_gen,
+                      q0_index_key_gen=q0_index_key_gen, access_key_gen=access_key_gen, hits_key_gen=hits_key_gen,
                       min_file_age=min_file_age, free_capacity_goal=free_capacity_goal,
                       free_capacity_trigger=free_capacity_trigger, elastic_conf=elastic_conf)
     return await monitor.run()
@@ -0,0 +1,139 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from plugins.default_conc_cache import DefaultCacheMapping
+from plugins.default_conc_cache.cleanup import CHECKPOINT_KEY, CacheCleanup
+from plugins.sqlite3_db import DefaultDb
+
+CORPORA = ['bnc', 'susanne', 'syn2020']
+
+
+class InterruptedCleanup(CacheCleanup):
+
+    def __init__(self, *args, fail_on, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fail_on = fail_on
+
+    async def _process_corpus(self, corpus_dir, dry_run):
+        if corpus_dir == self._fail_on:
+            raise RuntimeError('interrupted')
+        return await super()._process_corpus(corpus_dir, dry_run)
+
+
+class CacheCleanupTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = DefaultDb(db_path)
+        self.root = os.path.join(self._tmp_dir.name, 'cache')
+        for corpus in CORPORA:
+            os.makedirs(os.path.join(self.root, corpus))
+            await self._add_file(corpus, 'old', age=7200)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    def _path(self, corpus, item_hash, suffix='.conc'):
+        return os.path.join(self.root, corpus, item_hash + suffix)
+
+    async def _add_file(self, corpus, item_hash, age, suffix='.conc', bound=True):
+        path = self._path(corpus, item_hash, suffix)
+        with open(path, 'wb') as fw:
+            fw.write(b'data')
+        os.utime(path, (time.time() - age, time.time() - age))
+        if bound and suffix == '.conc':
+            await self.db.hash_set(
+                DefaultCacheMapping.KEY_TEMPLATE.format(corpus), item_hash, dict(q0hash='q0', created=0))
+            await self.db.hash_set(
+                DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(corpus, 'q0'), item_hash, True)
+
+    def _cleanup(self, cls=CacheCleanup, **kwargs):
+        return cls(
+            db=self.db, root_path=self.root, corpus=None, ttl_hours=1, subdir=None,
+            entry_key_gen=lambda c: DefaultCacheMapping.KEY_TEMPLATE.format(c),
+            q0_index_key_gen=lambda c, q0: DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format(c, q0),
+            access_key_gen=lambda c: DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format(c),
+            hits_key_gen=lambda c, item: DefaultCacheMapping.HITS_KEY_TEMPLATE.format(c, item), **kwargs)
+
+    async def test_interrupted_run_is_resumed(self):
+        with self.assertRaises(RuntimeError):
+            await self._cleanup(InterruptedCleanup, fail_on='syn2020').run()
+        self.assertFalse(os.path.exists(self._path('bnc', 'old')))
+        self.assertFalse(os.path.exists(self._path('susanne', 'old')))
+        self.assertEqual('susanne', (await self.db.get(CHECKPOINT_KEY))['corpus'])
+        # a file the next run must not see in an already processed corpus
+        await self._add_file('bnc', 'old2', age=7200)
+
+        ans = await self._cleanup().run()
+        self.assertEqual(dict(type='summary', processed=1, deleted=1), ans)
+        self.assertFalse(os.path.exists(self._path('syn2020', 'old')))
+        self.assertTrue(os.path.exists(self._path('bnc', 'old2')))
+        self.assertIsNone(await self.db.get(CHECKPOINT_KEY))
+
+    async def test_single_corpus_run_ignores_checkpoint(self):
+        await self.db.set(CHECKPOINT_KEY, dict(corpus='syn2020', updated=time.time()))
+        cleanup = self._cleanup()
+        cleanup._corpus = 'susanne'
+        await cleanup.run()
+        self.assertFalse(os.path.exists(self._path('susanne', 'old')))
+        self.assertEqual('syn2020', (await self.db.get(CHECKPOINT_KEY))['corpus'])
+
+    async def test_expired_files_and_entries(self):
+        await self._add_file('susanne', 'fresh', age=10)
+        await self._add_file('susanne', 'read', age=7200)
+        await self.db.hash_set(DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format('susanne'), 'read', time.time())
+        await self._add_file('susanne', 'unbound', age=7200, bound=False)
+        await self.db.hash_set(DefaultCacheMapping.KEY_TEMPLATE.format('susanne'), 'stale', dict(created=0))
+
+        await self._cleanup().run()
+        self.assertEqual(
+            ['fresh.conc', 'read.conc'], sorted(os.listdir(os.path.join(self.root, 'susanne'))))
+        self.assertEqual(
+            {'fresh', 'read'},
+            set((await self.db.hash_get_all(DefaultCacheMapping.KEY_TEMPLATE.format('susanne'))).keys()))
+        self.assertEqual(
+            {'fresh', 'read'},
+            set((await self.db.hash_get_all(DefaultCacheMapping.Q0_INDEX_KEY_TEMPLATE.format('susanne', 'q0'))).keys()))
+
+    async def test_dispersion_is_removed_with_conc(self):
+        await self._add_file('susanne', 'old', age=7200, suffix='.disp')
+        await self._add_file('susanne', 'fresh', age=10)
+        await self._add_file('susanne', 'fresh', age=10, suffix='.disp')
+        await self._add_file('susanne', 'orphan', age=10, suffix='.disp')
+
+        await self._cleanup().run()
+        self.assertEqual(
+            ['fresh.conc', 'fresh.disp'], sorted(os.listdir(os.path.join(self.root, 'susanne'))))
+
+        await self._add_file('susanne', 'orphan', age=10, suffix='.disp')
+        await self._cleanup().run(dry_run=True)
+        self.assertTrue(os.path.exists(self._path('susanne', 'orphan', '.disp')))
+
+
+if __name__ == '__main__':
+    unittest.main()
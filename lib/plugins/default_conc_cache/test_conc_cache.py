@@ -0,0 +1,90 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from corplib.fallback import EmptyCorpus
+from plugin_types.conc_cache import ConcCacheStatus
+from plugins.default_conc_cache import DefaultCacheMapping, _uniqname
+from plugins.sqlite3_db import DefaultDb
+
+Q = ('aword,[lemma="pes"]',)
+
+
+class ConcCacheTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = DefaultDb(db_path)
+        self.cache_map = DefaultCacheMapping(
+            os.path.join(self._tmp_dir.name, 'cache'), EmptyCorpus('susanne'), self.db, False)
+        await self.cache_map.ensure_writable_storage()
+        status = await self.cache_map.add_to_map(None, Q, 0, ConcCacheStatus(finished=True, readable=True))
+        with open(status.cachefile, 'wb') as fw:
+            fw.write(b'conc')
+        self.entry_key = _uniqname(None, Q, 0)
+        self.hits_key = DefaultCacheMapping.HITS_KEY_TEMPLATE.format('susanne', self.entry_key)
+        self.access_key = DefaultCacheMapping.ACCESS_KEY_TEMPLATE.format('susanne')
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+
+class ConcCacheAccessTest(ConcCacheTestCase):
+
+    async def test_existence_check_is_not_an_access(self):
+        self.assertIsNotNone(await self.cache_map.readable_cache_path(None, Q, 0))
+        self.assertIsNone(await self.db.hash_get(self.access_key, self.entry_key))
+        self.assertIsNone(await self.db.get(self.hits_key))
+
+    async def test_concurrent_accesses_are_counted(self):
+        await asyncio.gather(*[self.cache_map.record_access(None, Q, 0) for _ in range(20)])
+        self.assertEqual(20, await self.db.get(self.hits_key))
+        self.assertIsNotNone(await self.db.hash_get(self.access_key, self.entry_key))
+        self.assertGreater(await self.db.get_ttl(self.hits_key), 0)
+
+    async def test_removed_entry_removes_access_data(self):
+        await self.cache_map.record_access(None, Q, 0)
+        await self.cache_map.del_entry(None, Q, 0)
+        self.assertIsNone(await self.db.hash_get(self.access_key, self.entry_key))
+        self.assertIsNone(await self.db.get(self.hits_key))
+
+
+class ConcCacheNotificationTest(ConcCacheTestCase):
+
+    async def test_failed_publishing_does_not_break_status_update(self):
+        async def publish_channel(channel_id, msg):
+            raise ConnectionError('Redis is gone')
+
+        self.db.publish_channel = publish_channel
+        async with self.cache_map.status_listener(None, Q, 0) as event:
+            await self.cache_map.update_calc_status(None, Q, 0, concsize=10)
+            self.assertTrue(event.is_set())
+        self.assertEqual(10, (await self.cache_map.get_calc_status(None, Q, 0)).concsize)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,11 +18,12 @@ A plugin providing a history for user's queries for services such as 'query hist
 Required config.xml/plugins entries: please see config.rng
 """
 
+import asyncio
 import logging
 import random
 import time
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Tuple
 
 import plugins
 from corplib.fallback import EmptyCorpus
@@ -47,6 +48,14 @@ class CorpusCache:
             self._corpora[cname] = await self._cf.get_corpus(cname)
         return self._corpora[cname]
 
+    async def preload(self, cnames: Iterable[str]):
+        """
+        Load multiple (not yet cached) corpora concurrently
+        """
+        todo = [cname for cname in set(cnames) if cname and cname not in self._corpora]
+        for cname, corp in zip(todo, await asyncio.gather(*(self._cf.get_corpus(cname) for cname in todo))):
+            self._corpora[cname] = corp
+
 
 class QueryHistory(AbstractQueryHistory):
 
@@ -143,11 +152,10 @@ class QueryHistory(AbstractQueryHistory):
         q_id = data['query_id']
         return await self._query_persistence.open(q_id) is not None
 
-    async def _merge_conc_data(self, plugin_ctx, data):
+    async def _merge_conc_data(self, plugin_ctx, data, edata):
         async def extract_id(
             item_id: str, item_data: Dict) -> Tuple[str, Dict]: return item_id, item_data
         q_id = data['query_id']
-        edata = await self._query_persistence.open(q_id)
         if edata:
             form_type = edata.get('lastop_form', {}).get('form_type', None)
             if form_type not in ('query', 'filter'):
@@ -219,13 +227,22 @@ class QueryHistory(AbstractQueryHistory):
         data = list(sorted(data, key=lambda v: v['created'], reverse=True))[offset:(offset + limit)]
         full_data = []
 
+        stored_map = await self._query_persistence.open_many(
+            [item['query_id'] for item in data if 'query_id' in item])
+        sub_conc_ids = []
+        for item in data:
+            stored = stored_map.get(item.get('query_id'))
+            if stored and item.get('q_supertype', item.get('qtype')) == 'pquery':
+                sub_conc_ids.extend(self._query_persistence.pquery_conc_ids(stored))
+        sub_conc_map = await self._query_persistence.open_many(sub_conc_ids)
         corpora = CorpusCache(corpus_factory)
+        await corpora.preload(c for stored in stored_map.values() if stored for c in stored.get('corpora', []))
         for item in data:
             if 'query_id' in item:
                 item_qs = item.get('q_supertype', item.get('qtype'))
                 item['q_supertype'] = item_qs  # upgrade possible deprecated qtype
                 if item_qs is None or item_qs == 'conc':
-                    tmp = await self._merge_conc_data(plugin_ctx, item)
+                    tmp = await self._merge_conc_data(plugin_ctx, item, stored_map.get(item['query_id']))
                     if not tmp:
                         continue
                     tmp['human_corpname'] = (await corpora.corpus(
@@ -235,7 +252,7 @@ class QueryHistory(AbstractQueryHistory):
                             ac['corpname'])).get_conf('NAME')
                     full_data.append(tmp)
                 elif item_qs == 'pquery':
-                    stored = await self._query_persistence.open(item['query_id'])
+                    stored = stored_map.get(item['query_id'])
                     if not stored:
                         continue
                     tmp = {'corpname': stored['corpora'][0], 'aligned': []}
@@ -244,7 +261,7 @@ class QueryHistory(AbstractQueryHistory):
                     q_join = []
 
                     for q in stored.get('form', {}).get('conc_ids', []):
-                        stored_q = await self._query_persistence.open(q)
+                        stored_q = sub_conc_map.get(q)
                         if stored_q is None:
                             logging.getLogger(__name__).warning(
                                 'Missing conc for pquery: {}'.format(q))
@@ -255,7 +272,7 @@ class QueryHistory(AbstractQueryHistory):
                     if q_subset is not None:
                         for q in q_subset.get('conc_ids', []):
                             max_ratio = q_subset.get('max_non_matching_ratio', 0)
-                            stored_q = await self._query_persistence.open(q)
+                            stored_q = sub_conc_map.get(q)
                             if stored_q is None or 'query' not in stored_q.get('lastop_form', {}).get('form_type'):
                                 logging.getLogger(__name__).warning(
                                     'Missing conc for pquery subset: {}'.format(q))
@@ -266,7 +283,7 @@ class QueryHistory(AbstractQueryHistory):
                     q_superset = stored.get('form', {}).get('conc_superset', None)
                     if q_superset is not None:
                         max_ratio = q_superset.get('max_non_matching_ratio', 0)
-                        stored_q = await self._query_persistence.open(q_superset['conc_id'])
+                        stored_q = sub_conc_map.get(q_superset['conc_id'])
                         if stored_q is None or 'query' not in stored_q.get('lastop_form', {}).get('form_type'):
                             logging.getLogger(__name__).warning(
                                 'Missing conc for pquery superset: {}'.format(q_superset['conc_id']))
@@ -279,7 +296,7 @@ class QueryHistory(AbstractQueryHistory):
                     tmp.update(stored)
                     full_data.append(tmp)
                 elif item_qs == 'wlist':
-                    stored = await self._query_persistence.open(item['query_id'])
+                    stored = stored_map.get(item['query_id'])
                     if not stored:
                         continue
                     tmp = dict(
@@ -294,7 +311,7 @@ class QueryHistory(AbstractQueryHistory):
                     tmp.update(stored)
                     full_data.append(tmp)
                 elif item_qs == 'kwords':
-                    stored = await self._query_persistence.open(item['query_id'])
+                    stored = stored_map.get(item['query_id'])
                     if not stored:
                         continue
                     tmp = dict(
@@ -22,7 +22,7 @@ free to be replaced/changed.
 """
 
 import abc
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
 
 from action.argmapping.wordlist import WordlistSaveFormArgs
 from action.model.concordance import ConcActionModel
@@ -188,6 +188,42 @@ class AbstractExport(AbstractConcExportMixin, AbstractCollExportMixin, AbstractF
     def raw_content(self) -> str:
         pass
 
+    def pop_content(self) -> bytes:
+        """
+        Return data written since the last call and release them
+        from the writer. Writers unable to produce a partial output
+        return an empty value here and provide all the data via final_content().
+        """
+        return b''
+
+    async def final_content(self) -> AsyncIterator[bytes]:
+        """
+        Yield data not returned by pop_content() yet. It is expected
+        that nothing is written to the writer once this is called.
+        """
+        data = self.raw_content()
+        yield data.encode('utf-8') if isinstance(data, str) else data
+
+    async def stream_conc(
+            self,
+            amodel: ConcActionModel,
+            chunks: AsyncIterator[KwicPageData],
+            args: SaveConcArgs
+    ) -> AsyncIterator[bytes]:
+        """
+        Write concordance chunks one by one and yield the produced output
+        as soon as it is available. This allows sending large exports
+        to a client without keeping the whole document in memory.
+        """
+        async for data in chunks:
+            await self.write_conc(amodel, data, args)
+            output = self.pop_content()
+            if output:
+                yield output
+        async for output in self.final_content():
+            if output:
+                yield output
+
 
 def lang_row_to_list(row):
     ans = []
@@ -76,6 +76,11 @@ class CSVExport(AbstractExport):
     def raw_content(self):
         return ''.join(self.csv_buff.rows)
 
+    def pop_content(self):
+        ans = self.raw_content().encode('utf-8')
+        self.csv_buff.rows = []
+        return ans
+
     def _write_ref_headings(self, data):
         self.csv_writer.writerow(data)
 
@@ -63,6 +63,11 @@ class JSONLExport(AbstractExport):
     def raw_content(self):
         return self._document.getvalue()
 
+    def pop_content(self):
+        ans = self._document.getvalue().encode('utf-8')
+        self._document = io.StringIO()
+        return ans
+
     def _writerow(self, anything):
         self._document.write(json.dumps(anything) + "\n")
 
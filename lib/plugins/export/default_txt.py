@@ -65,6 +65,11 @@ class TXTExport(AbstractExport):
     def raw_content(self):
         return self._data
 
+    def pop_content(self):
+        ans = self._data.encode('utf-8')
+        self._data = ''
+        return ans
+
     async def write_conc(self, amodel: ConcActionModel, data: KwicPageData, args: SaveConcArgs):
         output = asdict(data)
         output['from_line'] = int(args.from_line)
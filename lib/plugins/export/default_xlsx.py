@@ -20,8 +20,9 @@ like data can be used) to XLSX (Office Open XML) format.
 
 Plug-in requires openpyxl library.
 """
+import tempfile
 from io import BytesIO
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from action.argmapping.wordlist import WordlistSaveFormArgs
 from action.model.concordance import ConcActionModel
@@ -37,6 +38,7 @@ from conclib.errors import ConcordanceQueryParamsError
 from kwiclib.common import KwicPageData
 from openpyxl import Workbook
 from openpyxl.cell import WriteOnlyCell
+from util import as_async
 from views.colls import SavecollArgs
 from views.concordance import SaveConcArgs
 from views.freqs import SavefreqArgs
@@ -46,6 +48,9 @@ from views.pquery import SavePQueryArgs
 from . import AbstractExport, ExportPluginException, lang_row_to_list
 
 
+FINAL_CONTENT_CHUNK_SIZE = 65536
+
+
 class XLSXExport(AbstractExport):
 
     def __init__(self, locale: Locale):
@@ -67,6 +72,19 @@ class XLSXExport(AbstractExport):
         self._wb.save(filename=output)
         return output.getvalue()
 
+    async def final_content(self) -> AsyncIterator[bytes]:
+        # a write-only workbook keeps written rows in temporary files so
+        # here we only have to make sure the resulting archive is not loaded
+        # into memory at once (and that compressing it does not block the event loop)
+        with tempfile.TemporaryFile() as tmp:
+            await as_async(self._wb.save)(filename=tmp)
+            tmp.seek(0)
+            while True:
+                chunk = tmp.read(FINAL_CONTENT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
     def _writeheading(self, data):
         if len(data) > 1 and data[0] != '' and all(s == '' for s in data[1:]):
             self._sheet.append([data[0]])
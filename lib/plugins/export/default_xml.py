@@ -161,6 +161,26 @@ class ConcDocument(GeneralDocument):
         super(ConcDocument, self).__init__('concordance')
         self._lines = etree.Element('lines')
         self._root.append(self._lines)
+        self._serialization_started = False
+
+    def pop_serialized(self, final: bool = False) -> bytes:
+        """
+        Serialize lines added so far and remove them from the document.
+        The first call outputs also the beginning of the document
+        (including the heading), the final one closes the document.
+        """
+        ans = []
+        if not self._serialization_started:
+            ans.append(f'<{self._root.tag}>\n'.encode('utf-8'))
+            ans.append(etree.tostring(self._heading, pretty_print=True, encoding='UTF-8'))
+            ans.append(f'<{self._lines.tag}>\n'.encode('utf-8'))
+            self._serialization_started = True
+        for line_elm in list(self._lines):
+            ans.append(etree.tostring(line_elm, pretty_print=True, encoding='UTF-8'))
+            self._lines.remove(line_elm)
+        if final:
+            ans.append(f'</{self._lines.tag}>\n</{self._root.tag}>\n'.encode('utf-8'))
+        return b''.join(ans)
 
     def _append_lang(self, elm, data):
         """
@@ -293,6 +313,17 @@ class XMLExport(AbstractExport):
     def raw_content(self):
         return self._document.tostring()
 
+    def pop_content(self):
+        if isinstance(self._document, ConcDocument):
+            return self._document.pop_serialized()
+        return b''
+
+    async def final_content(self):
+        if isinstance(self._document, ConcDocument):
+            yield self._document.pop_serialized(final=True)
+        else:
+            yield self.raw_content()
+
     def _set_corpnames(self, corpnames):
         self._corpnames = corpnames
 
@@ -16,6 +16,7 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
+import asyncio
 import copy
 import logging
 import re
@@ -36,11 +37,14 @@ from plugin_types.corparch.backend import DatabaseBackend
 from plugin_types.corparch.corpus import (
     BrokenCorpusInfo, CorpusInfo, KwicConnect, MLPositionFilter, QuerySuggest,
     StructAttrInfo, TokenConnect, TokensLinking)
+from plugin_types.general_storage import KeyValueStorage
 from plugin_types.user_items import AbstractUserItems
 from plugins import inject
 from plugins.common.mysql import MySQLConf
 from plugins.common.mysql.adhocdb import AdhocDB
 from plugins.mysql_corparch.backend import Backend
+from plugins.mysql_corparch.cache import (
+    DEFAULT_LOCAL_SIZE, DEFAULT_SHARED_TTL, CorpusInfoCache)
 from plugins.mysql_corparch.corplist import (
     DefaultCorplistProvider, parse_query)
 from plugins.mysql_integration_db import MySqlIntegrationDb
@@ -83,7 +87,10 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
             max_num_hints,
             max_page_size,
             registry_lang: str,
-            prefer_vlo_metadata: bool):
+            prefer_vlo_metadata: bool,
+            kv_db: Optional[KeyValueStorage] = None,
+            corpus_info_cache_size: int = DEFAULT_LOCAL_SIZE,
+            corpus_info_shared_ttl: int = DEFAULT_SHARED_TTL):
         """
 
         arguments:
@@ -93,6 +100,9 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
             max_num_hints --
             max_page_size --
             registry_lang --
+            kv_db -- a key-value storage used to share corpus info between processes (None = no sharing)
+            corpus_info_cache_size -- max. number of corpus info items cached by each process
+            corpus_info_shared_ttl -- how long (in seconds) a shared corpus info is kept
         """
         self._backend = db_backend
         self._user_items = user_items
@@ -103,7 +113,10 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
 
         # caching localized corpora info as this is widely used throughout
         # the whole application
-        self._corpus_info_cache: Dict[Tuple[str, str], CorpusInfo] = {}
+        self._corpus_info_cache = CorpusInfoCache(
+            kv_db, self.create_corpus_info, local_size=corpus_info_cache_size, shared_ttl=corpus_info_shared_ttl,
+            on_drop=self._drop_providers)
+        self._corpus_info_listener: Optional[asyncio.Task] = None
         self._keywords = None  # keyword (aka tags) database for corpora; None = not loaded yet
         self._colors = {}
         self._tt_desc_i18n = defaultdict(lambda: {})
@@ -266,6 +279,12 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
         lang_key = self._get_iso639lang(lang)
         return self._keywords[lang_key]
 
+    def _drop_providers(self, corpus_id: str):
+        self._tc_providers.pop(corpus_id, None)
+        self._kc_providers.pop(corpus_id, None)
+        self._tl_providers.pop(corpus_id, None)
+        self._qs_providers.pop(corpus_id, None)
+
     async def _get_tckcqs_providers(self, cursor: MySQLCursorAbstract, corpus_id):
         if corpus_id not in self._tc_providers and corpus_id not in self._kc_providers:
             self._tc_providers[corpus_id] = TokenConnect()
@@ -286,8 +305,13 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
         return self._tc_providers[corpus_id], self._kc_providers[corpus_id], self._tl_providers[corpus_id], self._qs_providers[corpus_id]
 
     async def _fetch_corpus_info(self, plugin_ctx: AbstractCorpusPluginCtx, cursor: MySQLCursorAbstract, corpus_id: str) -> CorpusInfo:
-        cache_key = (corpus_id, plugin_ctx.user_lang)
-        if cache_key not in self._corpus_info_cache:
+        version, cached, is_local = await self._corpus_info_cache.get(corpus_id, plugin_ctx.user_lang)
+        if cached is not None:
+            if not is_local:
+                # Manatee-related info is always provided by the current process
+                cached.manatee = await plugin_ctx.corpus_factory.get_info(corpus_id)
+            return cached
+        else:
             row = await self._backend.load_corpus(cursor, corpus_id)
             corp = self._corp_info_from_row(row, plugin_ctx.user_lang)
             if corp is not None:
@@ -320,14 +344,30 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
                     full_corp_info.tokens_linking, full_corp_info.query_suggest
                 ) = await self._get_tckcqs_providers(cursor, corpus_id)
                 full_corp_info.metadata.interval_attrs = await self._backend.load_interval_attrs(cursor, corpus_id)
-                self._corpus_info_cache[cache_key] = full_corp_info
+                await self._corpus_info_cache.put(corpus_id, plugin_ctx.user_lang, version, full_corp_info)
+                return full_corp_info
             else:
                 return BrokenCorpusInfo(name=corpus_id)
-        return self._corpus_info_cache.get(cache_key, None)
+
+    async def invalidate_corpus_info(self, corpus_id: str):
+        """
+        Make all the KonText processes reload information about the corpus
+        (this should be called once the corpus configuration is modified)
+        """
+        await self._corpus_info_cache.invalidate(corpus_id.lower())
+
+    async def on_init(self):
+        self._corpus_info_listener = asyncio.create_task(self._corpus_info_cache.listen())
 
     async def on_soft_reset(self):
-        self._corpus_info_cache = {}
-        logging.getLogger(__name__).warning('mysql_corparch flush corpus_info_cache (soft reset)')
+        logging.getLogger(__name__).warning(
+            f'mysql_corparch flush corpus_info_cache (soft reset), stats: {self._corpus_info_cache.stats()}')
+        self._corpus_info_cache.reset()
+        self._corpus_info_cache.reset_stats()
+        self._tc_providers.clear()
+        self._kc_providers.clear()
+        self._tl_providers.clear()
+        self._qs_providers.clear()
 
     async def get_corpus_info(self, plugin_ctx: AbstractCorpusPluginCtx, corp_name: str) -> CorpusInfo:
         """
@@ -422,8 +462,8 @@ class MySQLCorparch(AbstractSearchableCorporaArchive):
         await self.backend.close()
 
 
-@inject(plugins.runtime.USER_ITEMS, plugins.runtime.INTEGRATION_DB)
-def create_instance(conf, user_items: AbstractUserItems, integ_db: MySqlIntegrationDb):
+@inject(plugins.runtime.USER_ITEMS, plugins.runtime.INTEGRATION_DB, plugins.runtime.DB)
+def create_instance(conf, user_items: AbstractUserItems, integ_db: MySqlIntegrationDb, kv_db: KeyValueStorage):
     plugin_conf = conf.get('plugins', 'corparch')
     if integ_db.is_active and 'mysql_host' not in plugin_conf:
         logging.getLogger(__name__).info(f'mysql_corparch uses integration_db[{integ_db.info}]')
@@ -442,4 +482,7 @@ def create_instance(conf, user_items: AbstractUserItems, integ_db: MySqlIntegrat
         max_page_size=plugin_conf.get('default_page_list_size', None),
         registry_lang=conf.get('corpora', 'manatee_registry_locale', 'en_US'),
         prefer_vlo_metadata=plugin_conf.get('prefer_vlo_metadata', False),
+        kv_db=kv_db,
+        corpus_info_cache_size=int(plugin_conf.get('corpus_info_cache_size', DEFAULT_LOCAL_SIZE)),
+        corpus_info_shared_ttl=int(plugin_conf.get('corpus_info_shared_ttl', DEFAULT_SHARED_TTL)),
     )
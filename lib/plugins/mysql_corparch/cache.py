@@ -0,0 +1,263 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A two-level cache of localized CorpusInfo instances. The local level is a size-limited
+LRU cache kept by each process. The shared level is stored in the key-value storage
+(typically Redis), so a corpus info loaded by one process (Sanic worker, RQ worker)
+can be used by all the others.
+
+Each corpus has a version counter stored in the key-value storage. A shared entry is
+valid only if it matches the current version of its corpus. Invalidation of a corpus
+increments the version and notifies all the processes (via pub/sub) to drop their local
+copies. Processes which do not listen to the notifications (or in case the key-value
+storage does not support pub/sub) validate their local entries against the current
+version periodically.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from plugin_types.corparch.corpus import (
+    CorpusInfo, MLPositionFilter, PosCategoryItem)
+from plugin_types.general_storage import KeyValueStorage
+
+DEFAULT_LOCAL_SIZE = 500
+
+DEFAULT_SHARED_TTL = 86400
+
+REVALIDATE_INTERVAL = 30
+"""
+how often (in seconds) a process not listening to invalidation messages checks
+whether its local entries are still up to date
+"""
+
+LISTENER_MIN_RESTART_DELAY = 1
+"""
+initial delay (in seconds) before a failed invalidation listener is restarted; the delay
+doubles with each subsequent failure up to LISTENER_MAX_RESTART_DELAY
+"""
+
+LISTENER_MAX_RESTART_DELAY = 60
+
+VERSION_KEY_TEMPLATE = 'corparch:corpus_info:version:{}'
+
+DATA_KEY_TEMPLATE = 'corparch:corpus_info:data:{}:{}'
+
+INVALIDATION_CHANNEL = 'corparch:corpus_info:invalidate'
+
+
+def _mk_version_key(corpus_id: str) -> str:
+    return VERSION_KEY_TEMPLATE.format(corpus_id)
+
+
+def _mk_data_key(corpus_id: str, lang: Optional[str]) -> str:
+    return DATA_KEY_TEMPLATE.format(corpus_id, lang)
+
+
+async def invalidate_corpus_info(db: KeyValueStorage, corpus_id: str):
+    """
+    Invalidate cached information about a corpus in all the KonText processes
+    using the provided key-value storage. This should be called after
+    the corpus configuration is modified in the database.
+    """
+    await db.incr(_mk_version_key(corpus_id))
+    try:
+        await db.publish_channel(INVALIDATION_CHANNEL, corpus_id)
+    except NotImplementedError:
+        pass  # processes will find out via their periodic version check
+
+
+class CorpusInfoCache:
+
+    def __init__(
+            self,
+            db: Optional[KeyValueStorage],
+            info_factory: Callable[[], CorpusInfo],
+            local_size: int = DEFAULT_LOCAL_SIZE,
+            shared_ttl: int = DEFAULT_SHARED_TTL,
+            on_drop: Optional[Callable[[str], None]] = None):
+        """
+        arguments:
+        db -- a key-value storage for the shared level; if None, only the local level is used
+        info_factory -- a function creating empty CorpusInfo instances (used to decode shared entries)
+        local_size -- max. number of locally cached items
+        shared_ttl -- how long (in seconds) a shared entry is kept
+        on_drop -- a function called with a corpus ID whenever local data of the corpus become
+                   outdated (via invalidation in this or another process or via a version check)
+                   or are evicted; it allows the caller to drop its own data derived from the corpus
+                   configuration
+        """
+        self._db = db
+        self._on_drop = on_drop
+        self._info_class = type(info_factory())
+        self._local_size = local_size
+        self._shared_ttl = shared_ttl
+        # (corpus_id, lang) => (version, time of last version check, info)
+        self._local: OrderedDict[Tuple[str, Optional[str]], Tuple[int, float, CorpusInfo]] = OrderedDict()
+        self._listening = False
+        # shared entries created before this time are ignored (see reset())
+        self._reset_time = 0
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._local)
+
+    def _encode(self, info: CorpusInfo) -> dict:
+        return info.to_dict(encode_json=True)  # type: ignore[attr-defined]
+
+    def _decode(self, data: dict) -> CorpusInfo:
+        # dataclasses_json is unable to decode lists of NamedTuples and enum values of None
+        pos_categories = [tagset.pop('posCategory', []) for tagset in data.get('tagsets', [])]
+        ml_position_filter = data.pop('ml_position_filter', None)
+        info = self._info_class.from_dict(data)  # type: ignore[attr-defined]
+        for tagset, pos_category in zip(info.tagsets, pos_categories):
+            tagset.pos_category = [PosCategoryItem(*item) for item in pos_category]
+        info.ml_position_filter = MLPositionFilter(ml_position_filter)
+        return info
+
+    def _store_local(self, corpus_id: str, lang: Optional[str], version: int, info: CorpusInfo):
+        self._local[(corpus_id, lang)] = (version, time.time(), info)
+        self._local.move_to_end((corpus_id, lang))
+        while len(self._local) > self._local_size:
+            (evicted_id, _), _ = self._local.popitem(last=False)
+            if self._on_drop is not None:
+                self._on_drop(evicted_id)
+
+    async def get(self, corpus_id: str, lang: Optional[str]) -> Tuple[int, Optional[CorpusInfo], bool]:
+        """
+        Find a cached corpus info.
+
+        returns:
+        a 3-tuple (current version of the corpus, corpus info or None, is_local_hit)
+        """
+        key = (corpus_id, lang)
+        entry = self._local.get(key)
+        if entry is not None and (
+                self._db is None or self._listening or time.time() - entry[1] < REVALIDATE_INTERVAL):
+            self._local.move_to_end(key)
+            self._hits += 1
+            return entry[0], entry[2], True
+        if self._db is None:
+            self._misses += 1
+            return 0, None, False
+
+        raw_version, shared = await self._db.get_many([_mk_version_key(corpus_id), _mk_data_key(corpus_id, lang)])
+        version = int(raw_version) if isinstance(raw_version, (int, str)) else 0
+        if entry is not None and entry[0] == version:
+            self._store_local(corpus_id, lang, version, entry[2])
+            self._hits += 1
+            return version, entry[2], True
+        if isinstance(shared, dict) and shared.get('version') == version and shared.get('created', 0) >= self._reset_time:
+            try:
+                info = self._decode(shared['data'])
+                self._store_local(corpus_id, lang, version, info)
+                self._shared_hits += 1
+                return version, info, False
+            except Exception as ex:
+                logging.getLogger(__name__).warning(f'failed to decode shared corpus info {corpus_id}: {ex}')
+        if any(k[0] == corpus_id and v[0] != version for k, v in self._local.items()):
+            # entries of all the languages are outdated
+            self.drop_local(corpus_id)
+        self._misses += 1
+        return version, None, False
+
+    async def put(self, corpus_id: str, lang: Optional[str], version: int, info: CorpusInfo):
+        """
+        Store a corpus info loaded for the specified version of the corpus
+        (as returned by get()).
+        """
+        self._store_local(corpus_id, lang, version, info)
+        if self._db is not None:
+            data_key = _mk_data_key(corpus_id, lang)
+            await self._db.set(data_key, dict(version=version, created=time.time(), data=self._encode(info)))
+            await self._db.set_ttl(data_key, self._shared_ttl)
+
+    def drop_local(self, corpus_id: str):
+        for key in [k for k in self._local if k[0] == corpus_id]:
+            del self._local[key]
+        if self._on_drop is not None:
+            self._on_drop(corpus_id)
+
+    async def invalidate(self, corpus_id: str):
+        self.drop_local(corpus_id)
+        if self._db is not None:
+            await invalidate_corpus_info(self._db, corpus_id)
+
+    def reset(self):
+        """
+        Drop all the local entries and ignore all the shared entries
+        created so far.
+        """
+        self._local.clear()
+        self._reset_time = time.time()
+
+    async def listen(self):
+        """
+        Listen to invalidation messages (this is expected to run as a task
+        for the whole lifetime of the process). A failed listener is restarted
+        after a delay (see LISTENER_MIN_RESTART_DELAY). Until then, local entries
+        are revalidated periodically.
+        """
+        async def handler(corpus_id: str) -> bool:
+            self.drop_local(corpus_id)
+            return False
+
+        if self._db is None:
+            return
+        delay = LISTENER_MIN_RESTART_DELAY
+        while True:
+            started = time.monotonic()
+            self._listening = True
+            try:
+                await self._db.subscribe_channel(INVALIDATION_CHANNEL, handler)
+                return
+            except NotImplementedError:
+                logging.getLogger(__name__).info(
+                    'db plug-in does not support pub/sub, corpus info cache will be revalidated periodically')
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                if time.monotonic() - started > LISTENER_MAX_RESTART_DELAY:
+                    delay = LISTENER_MIN_RESTART_DELAY
+                logging.getLogger(__name__).error(
+                    f'corpus info invalidation listener failed (restarting in {delay}s): {ex}')
+            finally:
+                self._listening = False
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, LISTENER_MAX_RESTART_DELAY)
+            # invalidation messages sent while the listener was down are lost
+            for corpus_id in {k[0] for k in self._local}:
+                self.drop_local(corpus_id)
+
+    def stats(self):
+        total = self._hits + self._shared_hits + self._misses
+        return dict(
+            size=len(self._local), hits=self._hits, shared_hits=self._shared_hits, misses=self._misses,
+            hit_ratio=(self._hits + self._shared_hits) / total if total > 0 else 0)
+
+    def reset_stats(self):
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
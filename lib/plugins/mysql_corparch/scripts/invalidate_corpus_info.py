@@ -0,0 +1,52 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Make all the running KonText processes reload cached information about
+the specified corpora. This should be run once a corpus configuration
+is modified in the database.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.realpath('%s/../../..' % os.path.dirname(os.path.realpath(__file__))))
+sys.path.insert(0, os.path.realpath('%s/../../../../scripts/' %
+                                    os.path.dirname(os.path.realpath(__file__))))
+
+import autoconf
+from action.plugin import initializer
+
+initializer.init_plugin('db')
+import plugins
+from plugins.mysql_corparch.cache import invalidate_corpus_info
+
+
+async def invalidate(corpora):
+    with plugins.runtime.DB as db:
+        for corpus_id in corpora:
+            await invalidate_corpus_info(db, corpus_id.lower())
+            print(f'invalidated {corpus_id}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Invalidate cached corpus information')
+    parser.add_argument('corpora', nargs='+', help='IDs of modified corpora')
+    args = parser.parse_args()
+    asyncio.run(invalidate(args.corpora))
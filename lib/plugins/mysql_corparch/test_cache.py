@@ -0,0 +1,122 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from plugin_types.corparch.corpus import CorpusInfo
+from plugins.mysql_corparch import cache as cache_module
+from plugins.mysql_corparch.cache import CorpusInfoCache
+from plugins.sqlite3_db import DefaultDb
+
+
+class PubSubDb(DefaultDb):
+    """
+    sqlite3_db with in-process pub/sub (to simulate Redis)
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._subscribers = []
+        self.num_failures = 0
+
+    async def subscribe_channel(self, channel_id, handler):
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise ConnectionError('connection lost')
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        while True:
+            if await handler(await queue.get()):
+                break
+
+    async def publish_channel(self, channel_id, msg):
+        for queue in self._subscribers:
+            queue.put_nowait(msg)
+
+
+class CorpusInfoCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = PubSubDb(db_path)
+        self.dropped = []
+        self.cache = CorpusInfoCache(self.db, CorpusInfo, on_drop=self.dropped.append)
+        self.other_process_cache = CorpusInfoCache(self.db, CorpusInfo)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    async def test_invalidation_message_drops_derived_data(self):
+        listener = asyncio.create_task(self.cache.listen())
+        await asyncio.sleep(0)
+        version, _, _ = await self.cache.get('susanne', 'en')
+        await self.cache.put('susanne', 'en', version, CorpusInfo(id='susanne'))
+        await self.other_process_cache.invalidate('susanne')
+        await asyncio.sleep(0)
+        listener.cancel()
+        self.assertEqual(['susanne'], self.dropped)
+        self.assertEqual(0, self.cache.size)
+
+    async def test_failed_listener_is_restarted(self):
+        version, _, _ = await self.cache.get('susanne', 'en')
+        await self.cache.put('susanne', 'en', version, CorpusInfo(id='susanne'))
+        self.db.num_failures = 2
+        with mock.patch.object(cache_module, 'LISTENER_MIN_RESTART_DELAY', 0.01):
+            listener = asyncio.create_task(self.cache.listen())
+            await asyncio.sleep(0.1)
+        self.assertEqual(0, self.db.num_failures)
+        self.assertTrue(self.cache._listening)
+        # messages sent while the listener was down may be lost
+        self.assertEqual(['susanne'], self.dropped)
+        await self.cache.put('susanne', 'en', version, CorpusInfo(id='susanne'))
+        await self.other_process_cache.invalidate('susanne')
+        await asyncio.sleep(0)
+        listener.cancel()
+        self.assertEqual(['susanne', 'susanne'], self.dropped)
+        self.assertEqual(0, self.cache.size)
+
+    async def test_version_check_drops_derived_data(self):
+        version, _, _ = await self.cache.get('susanne', 'en')
+        await self.cache.put('susanne', 'en', version, CorpusInfo(id='susanne'))
+        await self.cache.put('susanne', 'cs', version, CorpusInfo(id='susanne'))
+        await self.other_process_cache.invalidate('susanne')
+        self.cache._local[('susanne', 'en')] = (version, 0, CorpusInfo(id='susanne'))  # revalidation is due
+        new_version, info, _ = await self.cache.get('susanne', 'en')
+        self.assertGreater(new_version, version)
+        self.assertIsNone(info)
+        self.assertEqual(['susanne'], self.dropped)
+        self.assertEqual(0, self.cache.size)
+
+    async def test_evicted_corpus_drops_derived_data(self):
+        cache = CorpusInfoCache(None, CorpusInfo, local_size=1, on_drop=self.dropped.append)
+        await cache.put('susanne', 'en', 0, CorpusInfo(id='susanne'))
+        await cache.put('syn2020', 'en', 0, CorpusInfo(id='syn2020'))
+        self.assertEqual(['susanne'], self.dropped)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,8 +16,10 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
 
+import asyncio
 import logging
 import time
+import weakref
 from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
 from typing import Generator, Optional
@@ -27,7 +29,9 @@ from mysql.connector.abstracts import MySQLConnectionAbstract as SyncMySQLConnec
 
 from plugins.common.sqldb import AsyncDbContextManager, R, DbContextManager, SN, SR
 from plugins.common.mysql import MySQLOps, MySQLConf
+from plugins.common.mysql.pool import ConnectionPool
 from plugin_types.integration_db import IntegrationDatabase
+from util import runs_on_persistent_loop
 
 
 class MySqlIntegrationDb(
@@ -50,14 +54,40 @@ class MySqlIntegrationDb(
     The class keeps a single connection per request (via contextvars.ContextVar,
     as the class itself has a single instance per web worker) so methods like
     connection() which are context managers actually lie a bit as the connection
+    is borrowed from a connection pool in on_request() and returned in on_response().
+    As the connections are bound to an event loop, there is a separate pool for each loop.
     """
 
     def __init__(
-            self, conn_args: MySQLConf, environment_wait_sec: int
+            self, conn_args: MySQLConf, environment_wait_sec: int, pool_size: int = 20,
+            pool_max_lifetime: int = 3600, pool_health_check_after: int = 30, pool_acquire_timeout: int = 10
     ):
+        """
+        arguments:
+        conn_args -- connection configuration
+        environment_wait_sec -- see wait_for_environment()
+        pool_size -- max. number of opened connections per process (and event loop)
+        pool_max_lifetime -- max. age (in seconds) of a connection before it is closed
+        pool_health_check_after -- idle time (in seconds) after which a connection is validated before use
+        pool_acquire_timeout -- max. time (in seconds) to wait for a free connection
+        """
         self._ops = MySQLOps(conn_args)
         self._environment_wait_sec = environment_wait_sec
         self._db_conn: ContextVar[Optional[MySQLConnectionAbstract]] = ContextVar('database_connection', default=None)
+        self._pool_size = pool_size
+        self._pool_max_lifetime = pool_max_lifetime
+        self._pool_health_check_after = pool_health_check_after
+        self._pool_acquire_timeout = pool_acquire_timeout
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ConnectionPool] = weakref.WeakKeyDictionary()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        loop = asyncio.get_running_loop()
+        if loop not in self._pools:
+            self._pools[loop] = ConnectionPool(
+                self.create_connection, max_size=self._pool_size, max_lifetime=self._pool_max_lifetime,
+                health_check_after=self._pool_health_check_after, acquire_timeout=self._pool_acquire_timeout)
+        return self._pools[loop]
 
     @property
     def is_active(self):
@@ -94,21 +124,30 @@ class MySqlIntegrationDb(
     async def on_request(self):
         curr = self._db_conn.get()
         if not curr:
-            self._db_conn.set(await self.create_connection())
+            self._db_conn.set(await self.pool.acquire())
 
     async def on_response(self):
         curr = self._db_conn.get()
         if curr:
-            await curr.close()
-
+            self._db_conn.set(None)
+            await self.pool.release(curr)
 
     async def on_aio_task_enter(self):
-        self._db_conn.set(await self.create_connection())
+        self._db_conn.set(await self.pool.acquire())
 
     async def on_aio_task_exit(self):
         curr = self._db_conn.get()
         if curr:
-            await curr.close()
+            self._db_conn.set(None)
+            await self.pool.release(curr)
+        if not runs_on_persistent_loop():
+            # the loop (and thus the pool) will not be used again
+            await self.pool.close()
+
+    async def on_soft_reset(self):
+        for pool in list(self._pools.values()):
+            logging.getLogger(__name__).info(f'mysql connection pool stats: {pool.stats()}')
+            pool.reset_stats()
 
     async def create_connection(self) -> MySQLConnectionAbstract:
         return await connect(
@@ -169,4 +208,8 @@ def create_instance(conf):
     pconf = conf.get('plugins', 'integration_db')
     return MySqlIntegrationDb(
         MySQLConf.from_conf(pconf),
-        environment_wait_sec=int(pconf['environment_wait_sec']))
+        environment_wait_sec=int(pconf['environment_wait_sec']),
+        pool_size=int(pconf.get('pool_size', 20)),
+        pool_max_lifetime=int(pconf.get('pool_max_lifetime', 3600)),
+        pool_health_check_after=int(pconf.get('pool_health_check_after', 30)),
+        pool_acquire_timeout=int(pconf.get('pool_acquire_timeout', 10)))
@@ -29,9 +29,10 @@ configuration.
 }
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Tuple
 
 import plugins
 from corplib.abstract import AbstractKCorpus
@@ -59,6 +60,14 @@ class CorpusCache:
             self._corpora[cname] = await self._cf.get_corpus(cname)
         return self._corpora[cname]
 
+    async def preload(self, cnames: Iterable[str]):
+        """
+        Load multiple (not yet cached) corpora concurrently
+        """
+        todo = [cname for cname in set(cnames) if cname and cname not in self._corpora]
+        for cname, corp in zip(todo, await asyncio.gather(*(self._cf.get_corpus(cname) for cname in todo))):
+            self._corpora[cname] = corp
+
 
 class MySqlQueryHistory(AbstractQueryHistory):
 
@@ -226,11 +235,14 @@ class MySqlQueryHistory(AbstractQueryHistory):
 
         full_data = []
         corpora = CorpusCache(corpus_factory)
-        qdata_map = {}
+        stored_map = await self._query_persistence.open_many([item['query_id'] for item in rows])
+        qdata_map = {q_id: stored for q_id, stored in stored_map.items() if stored}
+        sub_conc_ids = []
         for item in rows:
-            stored = await self._query_persistence.open(item['query_id'])
-            if stored:
-                qdata_map[item['query_id']] = stored
+            if item['q_supertype'] == 'pquery' and item['query_id'] in qdata_map:
+                sub_conc_ids.extend(self._query_persistence.pquery_conc_ids(qdata_map[item['query_id']]))
+        sub_conc_map = await self._query_persistence.open_many(sub_conc_ids)
+        await corpora.preload(c for qdata in qdata_map.values() for c in qdata.get('corpora', []))
         subc_names = await self._subc_archive.get_names(
             [item.get('usesubcorp') for item in qdata_map.values() if item.get('usesubcorp')])
         for item in rows:
@@ -274,7 +286,7 @@ class MySqlQueryHistory(AbstractQueryHistory):
                 }
                 q_join = []
                 for q in qdata.get('form', {}).get('conc_ids', []):
-                    stored_q = await self._query_persistence.open(q)
+                    stored_q = sub_conc_map.get(q)
                     if stored_q is None:
                         logging.getLogger(__name__).warning(
                             'Missing conc for pquery: {}'.format(q))
@@ -285,7 +297,7 @@ class MySqlQueryHistory(AbstractQueryHistory):
                 if q_subset is not None:
                     for q in q_subset.get('conc_ids', []):
                         max_ratio = q_subset.get('max_non_matching_ratio', 0)
-                        stored_q = await self._query_persistence.open(q)
+                        stored_q = sub_conc_map.get(q)
                         if stored_q is None or 'query' not in stored_q.get('lastop_form', {}).get('form_type'):
                             logging.getLogger(__name__).warning(
                                 'Missing conc for pquery subset: {}'.format(q))
@@ -296,7 +308,7 @@ class MySqlQueryHistory(AbstractQueryHistory):
                 q_superset = qdata.get('form', {}).get('conc_superset', None)
                 if q_superset is not None:
                     max_ratio = q_superset.get('max_non_matching_ratio', 0)
-                    stored_q = await self._query_persistence.open(q_superset['conc_id'])
+                    stored_q = sub_conc_map.get(q_superset['conc_id'])
                     if stored_q is None or 'query' not in stored_q.get('lastop_form', {}).get('form_type'):
                         logging.getLogger(__name__).warning(
                             'Missing conc for pquery superset: {}'.format(q_superset['conc_id']))
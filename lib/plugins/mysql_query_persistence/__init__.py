@@ -119,6 +119,42 @@ class MySqlQueryPersistence(AbstractQueryPersistence):
             ans['corpora'] = await self._find_used_corpora(ans.get('prev_id'))
         return ans
 
+    async def open_many(self, data_ids):
+        """
+        Loads multiple records using a single multi-key request to the key-value
+        storage. Records not found there are searched in the archive using a single query.
+        """
+        data_ids = list(dict.fromkeys(data_ids))
+        ans = dict(zip(data_ids, await self.db.get_many([mk_key(data_id) for data_id in data_ids])))
+        missing = [data_id for data_id, data in ans.items() if data is None]
+        if len(missing) > 0:
+            try:
+                async with self._archive.connection() as conn:
+                    async with await conn.cursor(dictionary=True) as cursor:
+                        await self._archive.begin_tx(cursor)
+                        await cursor.execute(
+                            'SELECT id, data, created FROM kontext_conc_persistence '
+                            f'WHERE id IN ({", ".join(["%s"] * len(missing))})', missing)
+                        rows = await cursor.fetchall()
+                        for row in rows:
+                            ans[row['id']] = json.loads(row['data'])
+                        if len(rows) > 0:
+                            now = datetime.datetime.now().isoformat()
+                            await cursor.executemany(
+                                'UPDATE kontext_conc_persistence '
+                                'SET last_access = %s, num_access = num_access + 1 '
+                                'WHERE id = %s AND created = %s',
+                                [(now, row['id'], row['created'].isoformat()) for row in rows])
+                        await conn.commit()
+            except Exception as ex:
+                logging.getLogger(__name__).error(
+                    f'Failed to restore archived concordances {missing}: {ex}')
+                raise ex
+        for data in ans.values():
+            if data is not None and 'corpora' not in data:
+                data['corpora'] = await self._find_used_corpora(data.get('prev_id'))
+        return ans
+
     async def _load_query(self, data_id: str, save_access: bool):
         """
         Loads operation data according to the passed data_id argument.
@@ -154,6 +154,72 @@ class RedisDb(KeyValueStorage):
         """
         await self._redis.hdel(key, field)
 
+    async def hash_get_many(self, key, fields):
+        """
+        Gets multiple values from a hash table stored under the passed key
+        (using a single HMGET command)
+
+        arguments:
+        key -- data access key
+        fields -- hash table entry keys
+        """
+        if len(fields) == 0:
+            return []
+        return [json.loads(v) if v else None for v in await self._redis.hmget(key, fields)]
+
+    async def hash_set_map(self, key, mapping):
+        """
+        Puts multiple values into a hash table stored under the passed key
+        (using a single HSET command). Existing fields not present in the mapping
+        are preserved.
+
+        arguments:
+        key -- data access key
+        mapping -- hash table entries to be stored
+        """
+        if len(mapping) > 0:
+            await self._redis.hset(key, mapping={k: json.dumps(v) for k, v in mapping.items()})
+
+    async def hash_del_many(self, key, fields):
+        """
+        Removes multiple fields from a hash item (using a single HDEL command)
+
+        arguments:
+        key -- hash item access key
+        fields -- the fields to be deleted
+        """
+        if len(fields) > 0:
+            await self._redis.hdel(key, *fields)
+
+    async def execute_pipeline(self, ops):
+        """
+        Sends all the operations collected by a pipeline in a single
+        request performed as a transaction (MULTI/EXEC).
+        """
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for op, args in ops:
+                if op == 'set':
+                    pipe.set(args[0], json.dumps(args[1]))
+                elif op == 'remove':
+                    pipe.delete(args[0])
+                elif op == 'hash_set':
+                    pipe.hset(args[0], args[1], json.dumps(args[2]))
+                elif op == 'hash_del':
+                    pipe.hdel(args[0], args[1])
+                elif op == 'hash_set_map':
+                    if len(args[1]) > 0:
+                        pipe.hset(args[0], mapping={k: json.dumps(v) for k, v in args[1].items()})
+                elif op == 'hash_del_many':
+                    if len(args[1]) > 0:
+                        pipe.hdel(args[0], *args[1])
+                elif op == 'incr':
+                    pipe.incr(args[0], args[1])
+                elif op == 'set_ttl':
+                    pipe.expire(args[0], args[1])
+                else:
+                    raise ValueError(f'Unsupported pipeline operation {op}')
+            await pipe.execute()
+
     async def hash_get_all(self, key):
         """
         Returns a complete hash object (= Python dict) stored under the passed
@@ -180,6 +246,17 @@ class RedisDb(KeyValueStorage):
             return json.loads(data)
         return default
 
+    async def get_many(self, keys):
+        """
+        Gets values stored under multiple keys (using a single MGET command)
+
+        arguments:
+        keys -- data access keys
+        """
+        if len(keys) == 0:
+            return []
+        return [json.loads(v) if v else None for v in await self._redis.mget(keys)]
+
     async def set(self, key, data):
         """
         Saves 'data' with 'key'.
@@ -255,17 +332,6 @@ class RedisDb(KeyValueStorage):
         """
         return await self._redis.incr(key, amount)
 
-    async def hash_set_map(self, key, mapping):
-        """
-        Set key to value within hash 'name' for each corresponding
-        key and value from the 'mapping' dict.
-        Before setting, the values are json-serialized
-        """
-        new_mapping = {}
-        for name in mapping:
-            new_mapping[name] = json.dumps(mapping[name])
-        return await self._redis.hmset(key, new_mapping)
-
     async def keys(self, pattern: str = '*'):
         return [key.decode() for key in await self._redis.keys(pattern)]
 
@@ -29,6 +29,7 @@ import logging
 
 from redis import asyncio as aioredis
 import ujson as json
+from plugin_types.general_storage import KeyValueStorage
 from plugins.redis_db import RedisDb
 from util import as_sync
 
@@ -166,6 +167,19 @@ class RejsonDb(RedisDb):
         """
         await self._redis.execute_command('JSON.DEL', key, f'["{field}"]')
 
+    async def hash_get_many(self, key, fields):
+        # RedisDb's HMGET-based implementation does not work with JSON values
+        return await KeyValueStorage.hash_get_many(self, key, fields)
+
+    async def hash_set_map(self, key, mapping):
+        return await KeyValueStorage.hash_set_map(self, key, mapping)
+
+    async def hash_del_many(self, key, fields):
+        return await KeyValueStorage.hash_del_many(self, key, fields)
+
+    async def execute_pipeline(self, ops):
+        return await KeyValueStorage.execute_pipeline(self, ops)
+
     async def hash_get_all(self, key):
         """
         Returns a complete hash object (= Python dict) stored under the passed
@@ -189,6 +203,19 @@ class RejsonDb(RedisDb):
             return default
         return json.loads(data)
 
+    async def get_many(self, keys):
+        """
+        Gets values stored under multiple keys (using a single JSON.MGET command)
+
+        arguments:
+        keys -- data access keys
+        """
+        if len(keys) == 0:
+            return []
+        return [
+            json.loads(v) if v is not None else None
+            for v in await self._redis.execute_command('JSON.MGET', *keys, '.')]
+
     async def set(self, key, data):
         """
         Saves 'data' with 'key'.
@@ -239,14 +266,6 @@ class RejsonDb(RedisDb):
             await self.set(key, 0)
         await self._redis.execute_command('JSON.NUMINCRBY', key, '.', amount)
 
-    async def hash_set_map(self, key, mapping):
-        """
-        Set key to value within hash 'name' for each corresponding
-        key and value from the 'mapping' dict.
-        Before setting, the values are json-serialized
-        """
-        await self.set(key, json.dumps(mapping))
-
 
 def create_instance(conf):
     """
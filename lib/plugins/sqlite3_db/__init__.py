@@ -31,17 +31,37 @@ with high concurrency (hundreds or more simultaneous users).
 
 The sqlite3 plugin stores data in a single table called "data" with the following structure:
 CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)
+
+Configuration (plugins/db):
+db_path -- path to the sqlite3 database file
+pool_size -- (optional) max. number of kept opened connections (default is 4);
+             with 0, a new connection is opened for each operation
+expiry_sweep_interval -- (optional) how often (in seconds) expired records are removed
+                         from the database (default is 300)
+
+In the pooled mode, the database is switched to the WAL journal mode so readers
+do not block writers. Expired records are never returned but they are removed
+from the database only by the periodic sweep.
 """
 
 import logging
 import os
 import time
 from contextlib import asynccontextmanager
+from typing import Any, List
 
 import aiosqlite
 import ujson as json
 from plugin_types.general_storage import KeyValueStorage
 
+DEFAULT_POOL_SIZE = 4
+
+DEFAULT_EXPIRY_SWEEP_INTERVAL = 300
+
+NOT_EXPIRED_SQL = '(expires = -1 OR expires >= ?)'
+
+GET_MANY_CHUNK_SIZE = 500
+
 
 class DefaultDb(KeyValueStorage):
 
@@ -51,36 +71,125 @@ class DefaultDb(KeyValueStorage):
     async def setnx(self, key: str, value):  # TODO
         pass
 
-    def __init__(self, db_path: str):
+    def __init__(
+            self,
+            db_path: str,
+            pool_size: int = DEFAULT_POOL_SIZE,
+            expiry_sweep_interval: int = DEFAULT_EXPIRY_SWEEP_INTERVAL):
         """
         arguments:
-        conf -- a dictionary containing 'settings' module compatible configuration of the plug-in
+        db_path -- path to the sqlite3 database file
+        pool_size -- max. number of kept opened connections (0 = connection per operation)
+        expiry_sweep_interval -- interval (in seconds) of removing expired records
         """
         self._db_path = db_path
+        self._pool_size = pool_size
+        self._expiry_sweep_interval = expiry_sweep_interval
+        self._idle_connections: List[aiosqlite.Connection] = []
+        self._last_sweep = 0.0
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        conn = aiosqlite.connect(self._db_path)
+        # pooled connections must not prevent the process from exiting
+        # (older aiosqlite versions implement Connection as a thread itself)
+        thread: Any = getattr(conn, '_thread', conn)
+        thread.daemon = True
+        await conn
+        await conn.execute('PRAGMA journal_mode=WAL')
+        await conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
 
     @asynccontextmanager
     async def connection(self):
-        async with aiosqlite.connect(self._db_path) as conn:
+        """
+        Provide a database connection. In the pooled mode, an idle connection is reused
+        (and returned back once the context is left). Prepared statements are cached
+        by each connection so repeated queries are not compiled again.
+
+        In case all the pooled connections are in use, a temporary connection is opened.
+        This prevents waiting for a connection which would have to be bound to
+        a specific event loop.
+        """
+        if self._pool_size == 0:
+            async with aiosqlite.connect(self._db_path) as conn:
+                await self._sweep_expired(conn)
+                yield conn
+            return
+        conn = self._idle_connections.pop() if len(self._idle_connections) > 0 else await self._open_connection()
+        try:
+            await self._sweep_expired(conn)
             yield conn
+        except BaseException:
+            await conn.close()
+            raise
+        if conn.in_transaction:
+            await conn.rollback()
+        if len(self._idle_connections) < self._pool_size:
+            self._idle_connections.append(conn)
+        else:
+            await conn.close()
 
-    async def _delete_expired(self, key):
-        async with self.connection() as conn:
-            async with await conn.cursor() as cursor:
-                conn.start_transaction()
-                await cursor.execute('SELECT expires FROM data WHERE key = ?', (key,))
-                ans = await cursor.fetchone()
-                if ans and -1 < ans[0] < time.time():
-                    await cursor.execute('DELETE FROM data WHERE key = ?', (key,))
-                    await conn.commit()
-                return None
+    async def _sweep_expired(self, conn: aiosqlite.Connection):
+        if time.time() - self._last_sweep < self._expiry_sweep_interval:
+            return
+        self._last_sweep = time.time()
+        cursor = await conn.execute('DELETE FROM data WHERE expires > -1 AND expires < ?', (time.time(),))
+        await conn.commit()
+        if cursor.rowcount > 0:
+            logging.getLogger(__name__).debug(f'removed {cursor.rowcount} expired records')
+
+    async def close(self):
+        while len(self._idle_connections) > 0:
+            await self._idle_connections.pop().close()
 
     async def _load_raw_data(self, key):
-        await self._delete_expired(key)
         async with self.connection() as conn:
-            async with await conn.cursor() as cursor:
-                await cursor.execute('SELECT value, expires FROM data WHERE key = ?', (key,))
-                ans = await cursor.fetchone()
-                return ans if ans else None
+            cursor = await conn.execute(
+                f'SELECT value, expires FROM data WHERE key = ? AND {NOT_EXPIRED_SQL}', (key, time.time()))
+            ans = await cursor.fetchone()
+            return ans if ans else None
+
+    @staticmethod
+    async def _load_json(conn, key):
+        cursor = await conn.execute(
+            f'SELECT value FROM data WHERE key = ? AND {NOT_EXPIRED_SQL}', (key, time.time()))
+        ans = await cursor.fetchone()
+        return json.loads(ans[0]) if ans else None
+
+    @staticmethod
+    def _export_value(data):
+        if type(data) is dict:
+            return dict((k, v) for k, v in data.items() if not k.startswith('__') and not k.endswith('__'))
+        return data
+
+    async def _write_many(self, conn, data, reset_ttl=None, expires=None):
+        """
+        Write (or remove in case of None values) multiple items
+        and commit the current transaction. Similarly to Redis, an updated
+        item keeps its expiration time (unless it is already expired) - except
+        for the keys listed in reset_ttl (None = all the keys) which are stored
+        without expiration. Finally, expiration times from the optional
+        expires dict (key => UNIX time) are set to the existing items.
+        """
+        if reset_ttl is None:
+            reset_ttl = data.keys()
+        await conn.executemany(
+            'INSERT OR REPLACE INTO data (key, value, expires) VALUES (?, ?, ?)',
+            [(k, json.dumps(self._export_value(v)), -1)
+             for k, v in data.items() if v is not None and k in reset_ttl])
+        await conn.executemany(
+            'INSERT INTO data (key, value, expires) VALUES (?, ?, -1) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+            'expires = CASE WHEN expires > -1 AND expires < ? THEN -1 ELSE expires END',
+            [(k, json.dumps(self._export_value(v)), time.time())
+             for k, v in data.items() if v is not None and k not in reset_ttl])
+        await conn.executemany(
+            'DELETE FROM data WHERE key = ?', [(k,) for k, v in data.items() if v is None])
+        if expires:
+            await conn.executemany(
+                f'UPDATE data SET expires = ? WHERE key = ? AND {NOT_EXPIRED_SQL}',
+                [(v, k, time.time()) for k, v in expires.items()])
+        await conn.commit()
 
     async def _save_raw_data(self, path, data):
         async with self.connection() as conn:
@@ -89,8 +198,10 @@ class DefaultDb(KeyValueStorage):
             await conn.commit()
 
     async def rename(self, key, new_key):
-        await self._delete_expired(key)
         async with self.connection() as conn:
+            await conn.execute(
+                f'DELETE FROM data WHERE key = ? AND NOT {NOT_EXPIRED_SQL}', (key, time.time()))
+            await conn.execute('DELETE FROM data WHERE key = ? AND key <> ?', (new_key, key))
             await conn.execute('UPDATE data SET key = ? WHERE key = ?', (new_key, key))
             await conn.commit()
 
@@ -159,6 +270,8 @@ class DefaultDb(KeyValueStorage):
 
     async def hash_del(self, key, field):
         sdata = await self._load_raw_data(key)
+        if sdata is None:
+            return
         data = json.loads(sdata[0])
         if field in data:
             del data[field]
@@ -167,6 +280,66 @@ class DefaultDb(KeyValueStorage):
         else:
             await self.remove(key)
 
+    async def hash_get_many(self, key, fields):
+        async with self.connection() as conn:
+            data = await self._load_json(conn, key)
+        if data is None:
+            return [None] * len(fields)
+        elif type(data) is not dict:
+            raise TypeError('Invalid type for hash_get_many: {}'.format(type(data)))
+        return [data.get(field, None) for field in fields]
+
+    async def hash_set_map(self, key, mapping):
+        await self.execute_pipeline([('hash_set_map', (key, mapping))])
+
+    async def hash_del_many(self, key, fields):
+        await self.execute_pipeline([('hash_del_many', (key, fields))])
+
+    async def execute_pipeline(self, ops):
+        """
+        Performs all the operations collected by a pipeline using a single
+        connection and transaction. Each affected key is read and written
+        just once. Keys modified only by hash operations keep their TTL.
+        """
+        async with self.connection() as conn:
+            await conn.execute('BEGIN IMMEDIATE')
+            data = {}
+            replaced = set()
+            expires = {}
+            for op, args in ops:
+                key = args[0]
+                if op == 'set':
+                    data[key] = args[1]
+                    replaced.add(key)
+                    expires.pop(key, None)
+                    continue
+                elif op == 'remove':
+                    data[key] = None
+                    expires.pop(key, None)
+                    continue
+                elif op == 'set_ttl':
+                    expires[key] = time.time() + args[1]
+                    continue
+                if key not in data:
+                    data[key] = await self._load_json(conn, key)
+                if op == 'incr':
+                    data[key] = (data[key] or 0) + args[1]
+                    continue
+                curr = data[key] if type(data[key]) is dict else {}
+                if op == 'hash_set':
+                    curr[args[1]] = args[2]
+                elif op == 'hash_set_map':
+                    curr.update(args[1])
+                elif op == 'hash_del':
+                    curr.pop(args[1], None)
+                elif op == 'hash_del_many':
+                    for field in args[1]:
+                        curr.pop(field, None)
+                else:
+                    raise ValueError(f'Unsupported pipeline operation {op}')
+                data[key] = curr if len(curr) > 0 else None
+            await self._write_many(conn, data, replaced, expires)
+
     async def hash_get_all(self, key):
         """
         Returns a complete hash object (= Python dict) stored under the passed
@@ -198,6 +371,27 @@ class DefaultDb(KeyValueStorage):
             return data
         return default
 
+    async def get_many(self, keys):
+        """
+        Loads data stored under multiple keys using a single connection
+        (and a single query per GET_MANY_CHUNK_SIZE keys)
+        """
+        found = {}
+        async with self.connection() as conn:
+            for i in range(0, len(keys), GET_MANY_CHUNK_SIZE):
+                chunk = keys[i:i + GET_MANY_CHUNK_SIZE]
+                cursor = await conn.execute(
+                    f'SELECT key, value, expires FROM data '
+                    f'WHERE key IN ({", ".join(["?"] * len(chunk))}) AND {NOT_EXPIRED_SQL}',
+                    (*chunk, time.time()))
+                for key, value, expires in await cursor.fetchall():
+                    data = json.loads(value)
+                    if type(data) is dict:
+                        data['__timestamp__'] = expires
+                        data['__key__'] = key
+                    found[key] = data
+        return [found.get(key) for key in keys]
+
     async def set(self, key, data):
         """
         Saves 'data' with 'key'.
@@ -234,9 +428,9 @@ class DefaultDb(KeyValueStorage):
         returns:
         boolean answer
         """
-        await self._delete_expired(key)
         async with self.connection() as conn:
-            cursor = await conn.execute('SELECT COUNT(*) FROM data WHERE key = ?', (key,))
+            cursor = await conn.execute(
+                f'SELECT COUNT(*) FROM data WHERE key = ? AND {NOT_EXPIRED_SQL}', (key, time.time()))
             return (await cursor.fetchone())[0] > 0
 
     async def set_ttl(self, key, ttl):
@@ -248,51 +442,49 @@ class DefaultDb(KeyValueStorage):
         ttl -- number of seconds to wait before the value is removed
         (please note that set/update actions reset the timer to zero)
         """
-        await self._delete_expired(key)
-        if await self.exists(key):
-            async with self.connection() as conn:
-                await conn.execute('UPDATE data SET expires = ? WHERE key = ?', (time.time() + ttl, key))
-                await conn.commit()
+        async with self.connection() as conn:
+            await conn.execute(
+                f'UPDATE data SET expires = ? WHERE key = ? AND {NOT_EXPIRED_SQL}',
+                (time.time() + ttl, key, time.time()))
+            await conn.commit()
         return None
 
     async def get_ttl(self, key):
         async with self.connection() as conn:
-            cursor = await conn.execute('SELECT expires FROM data WHERE key = ?', (key,))
-            return (await cursor.fetchone())[0]
+            cursor = await conn.execute(
+                f'SELECT expires FROM data WHERE key = ? AND {NOT_EXPIRED_SQL}', (key, time.time()))
+            ans = await cursor.fetchone()
+            return ans[0] if ans else -1
 
     async def clear_ttl(self, key):
-        await self._delete_expired(key)
-        if await self.exists(key):
-            async with self.connection() as conn:
-                await conn.execute('UPDATE data SET expires = -1 WHERE key = ?', (key,))
-                await conn.commit()
+        async with self.connection() as conn:
+            await conn.execute(
+                f'UPDATE data SET expires = -1 WHERE key = ? AND {NOT_EXPIRED_SQL}', (key, time.time()))
+            await conn.commit()
         return None
 
     async def incr(self, key, amount=1):
         """
         Increments the value of 'key' by 'amount'.  If no key exists,
-        the value will be initialized as 'amount'
+        the value will be initialized as 'amount'. The value is read and written
+        within a single transaction so concurrent increments are not lost.
+        The TTL of the key is preserved.
         """
-        val = await self.get(key)
-        if val is None:
-            val = 0
-        val += amount
-        await self.set(key, val)
+        async with self.connection() as conn:
+            await conn.execute('BEGIN IMMEDIATE')
+            val = await self._load_json(conn, key)
+            if val is None:
+                val = 0
+            val += amount
+            await self._write_many(conn, {key: val}, ())
         return val
 
-    async def hash_set_map(self, key, mapping):
-        """
-        Set key to value within hash 'name' for each corresponding
-        key and value from the 'mapping' dict.
-        """
-        await self.set(key, mapping)
-        return True
-
     async def keys(self, pattern: str = '*'):
         # just simple pattern transformation from Redis to SQLite
         pattern = pattern.replace('*', '%').replace('?', '_')
         async with self.connection() as conn:
-            cursor = await conn.execute('SELECT key FROM data WHERE key LIKE ?', (pattern,))
+            cursor = await conn.execute(
+                f'SELECT key FROM data WHERE key LIKE ? AND {NOT_EXPIRED_SQL}', (pattern, time.time()))
             return [row[0] for row in await cursor.fetchall()]
 
 
@@ -307,4 +499,7 @@ def create_instance(conf):
         logging.getLogger(__name__).error(
             f'sqlite3_db data file {db_path} not found. '
             'Please create one with CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
-    return DefaultDb(db_path)
+    return DefaultDb(
+        db_path,
+        pool_size=int(db_conf.get('pool_size', DEFAULT_POOL_SIZE)),
+        expiry_sweep_interval=int(db_conf.get('expiry_sweep_interval', DEFAULT_EXPIRY_SWEEP_INTERVAL)))
@@ -0,0 +1,190 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from plugins.sqlite3_db import GET_MANY_CHUNK_SIZE, DefaultDb
+
+
+class PipelineTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = DefaultDb(self.db_path)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    async def test_failed_pipeline_writes_nothing(self):
+        await self.db.hash_set_map('foo', {'a': 1, 'b': 2})
+        with self.assertRaises(RuntimeError):
+            async with self.db.pipeline() as pipe:
+                pipe.hash_del('foo', 'a')
+                pipe.set('bar', 10)
+                raise RuntimeError('interrupted')
+        self.assertEqual({'a': 1, 'b': 2}, await self.db.hash_get_all('foo'))
+        self.assertIsNone(await self.db.get('bar'))
+
+    async def test_concurrent_pipelines_are_not_lost(self):
+        async def add(i):
+            async with self.db.pipeline() as pipe:
+                pipe.hash_set('foo', f'f{i}', i)
+        await asyncio.gather(*[add(i) for i in range(20)])
+        self.assertEqual({f'f{i}': i for i in range(20)}, await self.db.hash_get_all('foo'))
+
+    async def test_hash_operations_keep_ttl(self):
+        await self.db.hash_set_map('foo', {'a': 1, 'b': 2})
+        await self.db.set_ttl('foo', 100)
+        await self.db.set('bar', 1)
+        await self.db.set_ttl('bar', 100)
+        async with self.db.pipeline() as pipe:
+            pipe.hash_set('foo', 'c', 3)
+            pipe.hash_del('foo', 'a')
+            pipe.set('bar', 2)
+        self.assertEqual({'b': 2, 'c': 3}, await self.db.hash_get_all('foo'))
+        self.assertGreater(await self.db.get_ttl('foo'), time.time())
+        self.assertEqual(-1, await self.db.get_ttl('bar'))
+
+    async def test_hash_set_map_keeps_other_fields(self):
+        await self.db.hash_set('foo', 'a', 1)
+        await self.db.hash_set_map('foo', {'b': 2, 'c': 3})
+        await self.db.hash_set_map('foo', {'c': 4})
+        self.assertEqual({'a': 1, 'b': 2, 'c': 4}, await self.db.hash_get_all('foo'))
+
+    async def test_expired_key_is_written_without_ttl(self):
+        await self.db.hash_set_map('foo', {'a': 1})
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('UPDATE data SET expires = ? WHERE key = ?', (time.time() - 10, 'foo'))
+        await self.db.hash_set_map('foo', {'b': 2})
+        self.assertEqual({'b': 2}, await self.db.hash_get_all('foo'))
+        self.assertEqual(-1, await self.db.get_ttl('foo'))
+
+    async def test_incr_and_set_ttl(self):
+        await self.db.set('hits', 2)
+        async with self.db.pipeline() as pipe:
+            pipe.incr('hits')
+            pipe.incr('new_hits', 5)
+            pipe.set_ttl('hits', 100)
+        self.assertEqual(3, await self.db.get('hits'))
+        self.assertEqual(5, await self.db.get('new_hits'))
+        self.assertGreater(await self.db.get_ttl('hits'), time.time())
+        self.assertEqual(-1, await self.db.get_ttl('new_hits'))
+        async with self.db.pipeline() as pipe:
+            pipe.incr('hits')
+        self.assertEqual(4, await self.db.get('hits'))
+        self.assertGreater(await self.db.get_ttl('hits'), time.time())
+
+
+class GetManyTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = DefaultDb(db_path)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    async def test_values_follow_order_of_keys(self):
+        await self.db.set('a', 1)
+        await self.db.set('b', {'x': 2})
+        await self.db.set('c', 3)
+        await self.db.set_ttl('c', -10)
+        ans = await self.db.get_many(['b', 'missing', 'a', 'c', 'a'])
+        self.assertEqual([await self.db.get(k) for k in ['b', 'missing', 'a', 'c', 'a']], ans)
+        self.assertEqual(2, ans[0]['x'])
+        self.assertEqual([None, 1, None, 1], ans[1:])
+
+    async def test_keys_exceeding_single_query(self):
+        keys = [f'k{i}' for i in range(GET_MANY_CHUNK_SIZE * 2 + 10)]
+        async with self.db.pipeline() as pipe:
+            for i, key in enumerate(keys):
+                if i % 3 > 0:
+                    pipe.set(key, i)
+        self.assertEqual(
+            [i if i % 3 > 0 else None for i in range(len(keys))], await self.db.get_many(keys))
+
+
+class ConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.db = DefaultDb(self.db_path, pool_size=2, expiry_sweep_interval=3600)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    async def test_connections_are_reused(self):
+        async with self.db.connection() as conn1:
+            pass
+        async with self.db.connection() as conn2:
+            self.assertIs(conn1, conn2)
+        cursor = await conn2.execute('PRAGMA journal_mode')
+        self.assertEqual('wal', (await cursor.fetchone())[0])
+
+    async def test_pool_size_is_limited(self):
+        async def use_connection():
+            async with self.db.connection():
+                await asyncio.sleep(0.01)
+        await asyncio.gather(*[use_connection() for _ in range(5)])
+        self.assertEqual(2, len(self.db._idle_connections))
+
+    async def test_failed_operation_does_not_return_connection(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            async with self.db.connection() as conn:
+                await conn.execute('SELECT * FROM missing_table')
+        self.assertEqual(0, len(self.db._idle_connections))
+        await self.db.set('foo', 1)
+        self.assertEqual(1, await self.db.get('foo'))
+
+    async def test_expired_records_are_hidden_before_sweep(self):
+        await self.db.set('foo', 1)
+        await self.db.set_ttl('foo', -10)
+        await self.db.set('bar', 2)
+        await self.db.rename('bar', 'foo')
+        self.assertEqual(2, await self.db.get('foo'))
+        await self.db.set('baz', 3)
+        await self.db.set_ttl('baz', -10)
+        self.assertIsNone(await self.db.get('baz'))
+        self.assertFalse(await self.db.exists('baz'))
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(1, conn.execute('SELECT COUNT(*) FROM data WHERE key = ?', ('baz',)).fetchone()[0])
+        self.db._last_sweep = 0
+        await self.db.exists('foo')
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(0, conn.execute('SELECT COUNT(*) FROM data WHERE key = ?', ('baz',)).fetchone()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
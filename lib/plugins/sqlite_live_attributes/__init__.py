@@ -23,7 +23,8 @@ It is recommended to install Unidecode package (pip install Unidecode)
 import logging
 import re
 import sqlite3
-from collections import OrderedDict, defaultdict
+import threading
+from collections import OrderedDict
 from functools import partial
 from typing import Any, Dict, Iterable, List
 import os.path
@@ -48,6 +49,7 @@ from action.plugin.ctx import PluginCtx
 from plugin_types.live_attributes import (
     AttrValue, AttrValuesResponse, BibTitle, CachedLiveAttributes, StructAttrValuePair, cached)
 from plugins import inject
+from util import as_async
 
 from . import query
 
@@ -67,9 +69,17 @@ class LiveAttributes(CachedLiveAttributes):
         self.max_attr_list_size = max_attr_list_size
         self.empty_val_placeholder = empty_val_placeholder
         self.databases = {}
+        self._thread_databases = threading.local()
         self.shorten_value = partial(strings.shorten, nice=True)
         self._max_attr_visible_chars = max_attr_visible_chars
 
+    @staticmethod
+    def _connect(db_path):
+        db = sqlite3.connect(db_path)
+        db.row_factory = sqlite3.Row
+        db.create_function('ktx_lower', 1, lambda x: unidecode(x.lower()))
+        return db
+
     async def db(self, plugin_ctx: PluginCtx, corpname):
         """
         Returns thread-local database connection to a sqlite3 database
@@ -82,14 +92,42 @@ class LiveAttributes(CachedLiveAttributes):
         if corpname not in self.databases:
             db_path = (await self.corparch.get_corpus_info(plugin_ctx, corpname)).metadata.database
             if db_path:
-                self.databases[corpname] = sqlite3.connect(db_path)
-                self.databases[corpname].row_factory = sqlite3.Row
-                self.databases[corpname].create_function(
-                    'ktx_lower', 1, lambda x: unidecode(x.lower()))
+                self.databases[corpname] = self._connect(db_path)
             else:
                 self.databases[corpname] = None
         return self.databases[corpname]
 
+    def _worker_db(self, db_path):
+        """
+        Returns a database connection to be used within a worker thread
+        (sqlite3 connections cannot be shared between threads).
+        """
+        if not hasattr(self._thread_databases, 'connections'):
+            self._thread_databases.connections = {}
+        if db_path not in self._thread_databases.connections:
+            self._thread_databases.connections[db_path] = self._connect(db_path)
+        return self._thread_databases.connections[db_path]
+
+    @as_async
+    def _aggregate_attr_values(self, db_path, query_builder):
+        """
+        Calculate numbers of positions of matching attribute values.
+        The database is queried within a worker thread so the calling
+        event loop is not blocked.
+
+        returns:
+        a 2-tuple (list of (attr, value, value identifier, num. of positions), total num. of positions)
+        """
+        sql, args, attrs = query_builder.create_aggregation_sql()
+        values = []
+        poscount = 0
+        for attr_idx, value, ident, count in self._worker_db(db_path).execute(sql, args):
+            if attrs[attr_idx] == 'poscount':
+                poscount = count if count is not None else 0
+            else:
+                values.append((attrs[attr_idx], value, ident, count))
+        return values, poscount
+
     async def is_enabled_for(self, plugin_ctx, corpora):
         """
         Returns True if live attributes are enabled for selected corpus else returns False
@@ -235,34 +273,15 @@ class LiveAttributes(CachedLiveAttributes):
             aligned_corpora=aligned_corpora,
             autocomplete_attr=self.import_key(autocomplete_attr),
             empty_val_placeholder=self.empty_val_placeholder)
-        data_iterator = query.DataIterator(
-            await self.db(plugin_ctx, corpus.corpname), query_builder)
+        values, poscount = await self._aggregate_attr_values(corpus_info.metadata.database, query_builder)
 
         # initialize result dictionary
         ans = dict((attr, set()) for attr in srch_attrs)
-        ans['poscount'] = 0
-
-        # 1) values collected one by one are collected in tmp_ans and then moved to 'ans' with some exporting tweaks
-        # 2) in case of values exceeding max. allowed list size we just accumulate their size directly to ans[attr]
-        # {attr_id: {attr_val: num_positions,...},...}
-        tmp_ans = defaultdict(lambda: defaultdict(lambda: 0))
+        ans['poscount'] = poscount
         shorten_val = partial(self.shorten_value,
                               length=self.calc_max_attr_val_visible_chars(corpus_info))
-
-        # here we iterate through [(row1, key1), (row1, key2),..., (row1, keyM), (row2, key1), (row2, key2),...]
-        for row, col_key in data_iterator:
-            if type(ans[col_key]) is set:
-                val_ident = row[bib_id] if bib_id and col_key == bib_label else row[col_key]
-                attr_val = (shorten_val(str(row[col_key])),
-                            val_ident, row[col_key], 1)  # 1 = grouping
-                tmp_ans[col_key][attr_val] += row['poscount']
-            elif type(ans[col_key]) is int:
-                # we rely on proper 'ans' initialization here (in terms of types)
-                ans[col_key] += int(row[col_key])
-        # here we append position count information to the respective items
-        for attr, v in tmp_ans.items():
-            for k, c in v.items():
-                ans[attr].add(k + (c,))
+        for attr, value, ident, count in values:
+            ans[attr].add((shorten_val(str(value)), ident, value, 1, count))  # 1 = grouping
         # now each line contains: (shortened_label, identifier, label, num_grouped_items, num_positions)
         # where num_grouped_items is initialized to 1
         if corpus_info.metadata.group_duplicates:
@@ -370,6 +389,9 @@ def create_instance(settings, corparch: AbstractCorporaArchive, db: KeyValueStor
     arguments:
     corparch -- corparch plugin
     """
+    if sqlite3.sqlite_version_info < query.MIN_SQLITE_VERSION:
+        raise Exception('sqlite_live_attributes requires SQLite {} or newer (found {})'.format(
+            '.'.join(str(v) for v in query.MIN_SQLITE_VERSION), sqlite3.sqlite_version))
     la_settings = settings.get('plugins', 'live_attributes')
     return LiveAttributes(
         corparch=corparch,
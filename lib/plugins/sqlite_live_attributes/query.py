@@ -15,6 +15,11 @@
 
 from texttypes.model import StructAttr
 
+MIN_SQLITE_VERSION = (3, 35, 0)
+"""
+the oldest SQLite supporting materialized CTEs (see QueryBuilder.create_aggregation_sql())
+"""
+
 
 def is_range_argument(item):
     return type(item) is dict and 'from' in item and 'to' in item
@@ -168,24 +173,35 @@ class QueryBuilder:
         tmp = QueryComponents(sql_template, selected_attrs, hidden_attrs, where_values)
         return tmp
 
+    def create_aggregation_sql(self):
+        """
+        Create a query which calculates numbers of positions of all the values
+        of all the visible selected attributes within the database. The rows
+        selected by the create_sql() query are aggregated per attribute (via GROUP BY)
+        and the partial results are returned by a single query (via UNION ALL).
+        The selected rows are materialized so the create_sql() query is evaluated
+        just once and not once per attribute (see MIN_SQLITE_VERSION).
+        The total number of positions is returned as an item with attribute 'poscount'.
 
-class DataIterator:
-    """
-    This object represents an iterator which
-    goes through cartesian product of all the selected
-    lines and selected column names:
-
-    [(row1, key1), (row1, key2), ..., (row1, keyM), (row2, key1), (row2, key2), ..., (rowN, keyM)]
-    """
-
-    def __init__(self, db, query_builder):
-        self._db = db
-        self._query_builder = query_builder
-
-    def __iter__(self):
-        qc = self._query_builder.create_sql()
-        cursor = self._db.cursor()
-        for item in cursor.execute(qc.sql_template, qc.where_values).fetchall():
-            for attr in qc.selected_attrs:
-                if item[attr] is not None and attr not in qc.hidden_attrs:
-                    yield item, attr
+        returns:
+        a 3-tuple (SQL, SQL arguments, list of attributes); each returned row contains
+        (attribute index (within the list), value, value identifier, num. of positions)
+        """
+        qc = self.create_sql()
+        bib_id = self.import_key(self._corpus_info.metadata.id_attr)
+        bib_label = self.import_key(self._corpus_info.metadata.label_attr)
+        attrs = [a for a in qc.selected_attrs if a not in qc.hidden_attrs and a != 'poscount']
+        parts = []
+        for i, attr in enumerate(attrs):
+            if bib_id and attr == bib_label:
+                parts.append(
+                    f'SELECT {i}, {attr}, {bib_id}, SUM(poscount) FROM data '
+                    f'WHERE {attr} IS NOT NULL GROUP BY {attr}, {bib_id}')
+            else:
+                parts.append(
+                    f'SELECT {i}, {attr}, {attr}, SUM(poscount) FROM data '
+                    f'WHERE {attr} IS NOT NULL GROUP BY {attr}')
+        parts.append(f'SELECT {len(attrs)}, NULL, NULL, SUM(poscount) FROM data')
+        sql = 'WITH data({}) AS MATERIALIZED ({}) {}'.format(
+            ', '.join(qc.selected_attrs), qc.sql_template, ' UNION ALL '.join(parts))
+        return sql, qc.where_values, attrs + ['poscount']
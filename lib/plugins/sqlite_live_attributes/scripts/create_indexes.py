@@ -0,0 +1,43 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Create an index speeding up joins of aligned corpora performed by the
+sqlite_live_attributes plug-in (see query.QueryBuilder.create_sql()).
+
+Please note that indexes on attribute columns cannot speed up the attribute
+values aggregation as the values are grouped within a materialized
+result of the search query (see query.QueryBuilder.create_aggregation_sql()).
+
+usage: python3 create_indexes.py db_path
+"""
+
+import sys
+import sqlite3
+
+
+def create_indexes(path):
+    with sqlite3.connect(path) as db:
+        db.execute('CREATE INDEX IF NOT EXISTS item_item_id_corpus_id_idx ON item (item_id, corpus_id)')
+        db.execute('ANALYZE')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python3 create_indexes.py db_path')
+        sys.exit(1)
+    create_indexes(sys.argv[1])
@@ -0,0 +1,107 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from collections import defaultdict
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from plugin_types.corparch.corpus import CorpusInfo
+from plugins.sqlite_live_attributes import LiveAttributes
+from plugins.sqlite_live_attributes.query import QueryBuilder
+
+ITEMS = [
+    # item_id, corpus_id, doc_id, doc_title, doc_genre, poscount
+    (1, 'susanne', 'd1', 'Title A', 'fiction', 100),
+    (2, 'susanne', 'd2', 'Title B', 'fiction', 50),
+    (3, 'susanne', 'd3', 'Title A', None, 20),  # same label, different bib. item
+    (4, 'susanne', 'd4', 'Title C', 'news', 5),
+    (4, 'susanne', 'd4', 'Title C', 'news', 5),  # a duplicate row of a multi-value item
+    (5, 'syn2020', 'd5', 'Title D', 'news', 1000),
+]
+
+
+def python_aggregation(db, query_builder, bib_id, bib_label):
+    """
+    The original (row by row) aggregation the SQL one must be equal to
+    """
+    qc = query_builder.create_sql()
+    ans = defaultdict(lambda: defaultdict(lambda: 0))
+    poscount = 0
+    for row in db.execute(qc.sql_template, qc.where_values).fetchall():
+        for attr in qc.selected_attrs:
+            if row[attr] is None or attr in qc.hidden_attrs:
+                continue
+            if attr == 'poscount':
+                poscount += row[attr]
+            else:
+                ident = row[bib_id] if attr == bib_label else row[attr]
+                ans[attr][(row[attr], ident)] += row['poscount']
+    return {attr: dict(v) for attr, v in ans.items()}, poscount
+
+
+class AggregationTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, 'live_attrs.db')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'CREATE TABLE item (item_id INTEGER, corpus_id TEXT, doc_id TEXT, doc_title TEXT, '
+                'doc_genre TEXT, poscount INTEGER)')
+            conn.executemany('INSERT INTO item VALUES (?, ?, ?, ?, ?, ?)', ITEMS)
+        self.corpus_info = CorpusInfo(id='susanne')
+        self.corpus_info.metadata.id_attr = 'doc.id'
+        self.corpus_info.metadata.label_attr = 'doc.title'
+        self.plugin = LiveAttributes(None, None, 100, '===EMPTY===', 30)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def _compare(self, attr_map):
+        query_builder = QueryBuilder(
+            corpus_info=self.corpus_info, attr_map=attr_map, srch_attrs={'doc_title', 'doc_genre', 'poscount'},
+            aligned_corpora=[], autocomplete_attr=None, empty_val_placeholder='===EMPTY===')
+        values, poscount = await self.plugin._aggregate_attr_values(self.db_path, query_builder)
+        ans = defaultdict(dict)
+        for attr, value, ident, count in values:
+            ans[attr][(value, ident)] = count
+        db = self.plugin._connect(self.db_path)
+        try:
+            self.assertEqual(python_aggregation(db, query_builder, 'doc_id', 'doc_title'), (dict(ans), poscount))
+        finally:
+            db.close()
+        return dict(ans), poscount
+
+    async def test_all_values(self):
+        ans, poscount = await self._compare({})
+        self.assertEqual(175, poscount)
+        self.assertEqual(
+            {('Title A', 'd1'): 100, ('Title B', 'd2'): 50, ('Title A', 'd3'): 20, ('Title C', 'd4'): 5},
+            ans['doc_title'])
+        self.assertEqual({('fiction', 'fiction'): 150, ('news', 'news'): 5}, ans['doc_genre'])
+
+    async def test_filtered_values(self):
+        ans, poscount = await self._compare({'doc.genre': ['fiction']})
+        self.assertEqual(150, poscount)
+        self.assertEqual({('fiction', 'fiction'): 150}, ans['doc_genre'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -102,7 +102,32 @@ class StableQueryPersistence(AbstractQueryPersistence):
     async def open(self, data_id):
         ans = await self._load_query(data_id, save_access=True)
         if ans is not None and 'corpora' not in ans:
-            ans['corpora'] = self.find_used_corpora(ans.get('prev_id'))
+            ans['corpora'] = await self.find_used_corpora(ans.get('prev_id'))
+        return ans
+
+    async def open_many(self, data_ids):
+        """
+        Loads multiple records using a single multi-key request to the key-value
+        storage. Records not found there are searched in the archive using a single query.
+        """
+        data_ids = list(dict.fromkeys(data_ids))
+        ans = dict(zip(data_ids, await self.db.get_many([mk_key(data_id) for data_id in data_ids])))
+        missing = [data_id for data_id, data in ans.items() if data is None]
+        if len(missing) > 0 and self._archive_db_path is not None:
+            async with self._archive_lock:
+                async with aiosqlite.connect(self._archive_db_path) as db:
+                    async with db.execute(
+                            f'SELECT id, data FROM archive WHERE id IN ({", ".join(["?"] * len(missing))})',
+                            missing) as cur:
+                        for row in await cur.fetchall():
+                            ans[row[0]] = json.loads(row[1])
+                    await db.executemany(
+                        'UPDATE archive SET last_access = ?, num_access = num_access + 1 WHERE id = ?',
+                        [(int(round(time.time())), data_id) for data_id in missing if ans[data_id] is not None])
+                    await db.commit()
+        for data in ans.values():
+            if data is not None and 'corpora' not in data:
+                data['corpora'] = await self.find_used_corpora(data.get('prev_id'))
         return ans
 
     async def _load_query(self, data_id: str, save_access: bool):
@@ -0,0 +1,77 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+import ujson as json
+from plugins.sqlite3_db import DefaultDb
+from plugins.stable_query_persistence import StableQueryPersistence, mk_key
+
+
+class Settings:
+
+    def __init__(self, archive_db_path):
+        self._conf = {'archive_db_path': archive_db_path}
+
+    def get(self, section, key=None):
+        return self._conf
+
+
+class OpenManyTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmp_dir.name, 'kontext.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        self.archive_path = os.path.join(self._tmp_dir.name, 'archive.db')
+        with sqlite3.connect(self.archive_path) as conn:
+            conn.execute(
+                'CREATE TABLE archive (id text, data text NOT NULL, created integer NOT NULL, num_access integer '
+                'NOT NULL DEFAULT 0, last_access integer, PRIMARY KEY (id))')
+            conn.execute(
+                'INSERT INTO archive (id, data, created) VALUES (?, ?, 0)',
+                ('~archived', json.dumps({'id': '~archived', 'corpname': 'syn2020', 'corpora': ['syn2020']})))
+        self.db = DefaultDb(db_path)
+        await self.db.set(mk_key('~first'), {'id': '~first', 'corpname': 'susanne', 'corpora': ['susanne']})
+        await self.db.set(mk_key('~second'), {'id': '~second', 'prev_id': '~first'})
+        self.persistence = StableQueryPersistence(self.db, None, Settings(self.archive_path))
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._tmp_dir.cleanup()
+
+    def _num_access(self):
+        with sqlite3.connect(self.archive_path) as conn:
+            return conn.execute('SELECT num_access FROM archive WHERE id = ?', ('~archived',)).fetchone()[0]
+
+    async def test_same_as_open(self):
+        ids = ['~second', '~missing', '~archived', '~first', '~second']
+        ans = await self.persistence.open_many(ids)
+        self.assertEqual(1, self._num_access())
+        self.assertEqual({data_id: await self.persistence.open(data_id) for data_id in ids}, ans)
+        self.assertEqual(['susanne'], ans['~second']['corpora'])
+        self.assertIsNone(ans['~missing'])
+        self.assertEqual('syn2020', ans['~archived']['corpname'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -45,10 +45,12 @@ from action.response import KResponse
 from dataclasses_json import dataclass_json
 from plugin_types.auth import AbstractAuth
 from plugin_types.corparch import CorpusInfo, CorpusListItem
+from plugin_types.general_storage import KeyValueStorage
 from plugin_types.integration_db import IntegrationDatabase
 from plugin_types.user_items import AbstractUserItems
 from plugins import inject
 from plugins.mysql_corparch import MySQLCorparch
+from plugins.mysql_corparch.cache import DEFAULT_LOCAL_SIZE, DEFAULT_SHARED_TTL
 from plugins.ucnk_remote_auth6.backend import UCNKBackend
 from plugins.mysql_corparch.corplist import parse_query
 from sanic import Blueprint
@@ -125,11 +127,15 @@ class UcnkCorpArch6(MySQLCorparch):
             access_req_recipients,
             default_label,
             registry_lang,
-            prefer_vlo_metadata):
+            prefer_vlo_metadata,
+            kv_db=None,
+            corpus_info_cache_size=DEFAULT_LOCAL_SIZE,
+            corpus_info_shared_ttl=DEFAULT_SHARED_TTL):
         super().__init__(
             db_backend=db_backend, user_items=user_items, tag_prefix=tag_prefix,
             max_num_hints=max_num_hints, max_page_size=max_page_size, registry_lang=registry_lang,
-            prefer_vlo_metadata=prefer_vlo_metadata)
+            prefer_vlo_metadata=prefer_vlo_metadata, kv_db=kv_db, corpus_info_cache_size=corpus_info_cache_size,
+            corpus_info_shared_ttl=corpus_info_shared_ttl)
         self._auth = auth
         self.access_req_sender = access_req_sender
         self.access_req_smtp_server = access_req_smtp_server
@@ -224,8 +230,8 @@ class UcnkCorpArch6(MySQLCorparch):
         return bp
 
     async def on_soft_reset(self):
-        num_items = len(self._corpus_info_cache)
-        self._corpus_info_cache = {}
+        num_items = self._corpus_info_cache.size
+        await super().on_soft_reset()
         self._keywords = None
         self._colors = {}
         self._descriptions = defaultdict(lambda: {})
@@ -233,8 +239,9 @@ class UcnkCorpArch6(MySQLCorparch):
             'soft reset, cleaning all corpus info caches (pid {}: {} corpora)'.format(os.getpid(), num_items))
 
 
-@inject(plugins.runtime.USER_ITEMS, plugins.runtime.AUTH, plugins.runtime.INTEGRATION_DB)
-def create_instance(conf, user_items: AbstractUserItems, auth: AbstractAuth, cnc_db: IntegrationDatabase):
+@inject(plugins.runtime.USER_ITEMS, plugins.runtime.AUTH, plugins.runtime.INTEGRATION_DB, plugins.runtime.DB)
+def create_instance(
+        conf, user_items: AbstractUserItems, auth: AbstractAuth, cnc_db: IntegrationDatabase, kv_db: KeyValueStorage):
     db_backend = UCNKBackend(
         cnc_db, user_table='user', user_group_acc_attr='corplist', corp_table='corpora', corp_id_attr='id',
         group_acc_table='corplist_corpus', group_acc_group_attr='corplist_id', group_acc_corp_attr='corpus_id',
@@ -255,4 +262,7 @@ def create_instance(conf, user_items: AbstractUserItems, auth: AbstractAuth, cnc
         access_req_recipients=conf.get('plugins', 'corparch')['access_req_recipients'],
         default_label=conf.get('plugins', 'corparch')['default_label'],
         registry_lang=conf.get('corpora', 'manatee_registry_locale', 'en_US'),
-        prefer_vlo_metadata=conf.get('prefer_vlo_metadata', False))
+        prefer_vlo_metadata=conf.get('prefer_vlo_metadata', False),
+        kv_db=kv_db,
+        corpus_info_cache_size=int(conf.get('plugins', 'corparch').get('corpus_info_cache_size', DEFAULT_LOCAL_SIZE)),
+        corpus_info_shared_ttl=int(conf.get('plugins', 'corparch').get('corpus_info_shared_ttl', DEFAULT_SHARED_TTL)))
@@ -19,11 +19,19 @@
 
 import collections
 from functools import partial
+from typing import Callable, Dict
 
+from conclib.executor import run_manatee
 from corplib.corpus import AbstractKCorpus
+from corplib.sattr_sizes import compute_sattr_sizes, load_sattr_sizes
 
 from .cache import TextTypesCache
 
+COMPLETE_ATTRS_KEY = '__complete__'
+"""
+a pseudo-attribute within cached norms listing attributes with all the values computed
+"""
+
 
 class StructNormsCalc(object):
     """
@@ -79,6 +87,40 @@ class StructNormsCalc(object):
             r.next()
         return cnt
 
+    def _create_struct_norm(self) -> Callable[[int], int]:
+        if self._subcnorm == 'freq':
+            return lambda num: 1
+        nas = self._struct.get_attr(self._subcnorm).pos2str
+        return lambda num: self._safe_int(nas(num))
+
+    def _calc_attr_norms(self, attrname: str) -> Dict[str, int]:
+        full_attr_name = f'{self._structname}.{attrname}'
+        attr = self._struct.get_attr(attrname)
+        if self._subcnorm == 'tokens':
+            stored = load_sattr_sizes(self._corp, full_attr_name)
+            if stored is not None:
+                return dict(stored)
+            counts = compute_sattr_sizes(self._corp, full_attr_name)
+        else:
+            counts = compute_sattr_sizes(self._corp, full_attr_name, self._create_struct_norm())
+        ans: Dict[str, int] = {attr.id2str(i): cnt for i, cnt in enumerate(counts)}
+        multisep = self._corp.get_conf(f'{full_attr_name}.MULTISEP')
+        if multisep and self._corp.get_conf(f'{full_attr_name}.MULTIVAL') in ('y', 'yes'):
+            # text types list individual items of multi-value attributes
+            items: Dict[str, int] = collections.defaultdict(lambda: 0)
+            for value, cnt in ans.items():
+                for item in set(value.split(multisep)):
+                    items[item] += cnt
+            ans.update(items)
+        return ans
+
+    async def compute_attr_norms(self, attrname: str) -> Dict[str, int]:
+        """
+        Compute norms of all the values of a structural attribute
+        in a single pass over the structure.
+        """
+        return await run_manatee(self._calc_attr_norms, attrname)
+
 
 class CachedStructNormsCalc(StructNormsCalc):
     """
@@ -106,10 +148,20 @@ class CachedStructNormsCalc(StructNormsCalc):
             self._data = mkdict()
 
     async def compute_norm(self, attrname, value):
+        """
+        Return a norm for an attribute value. In case the value is not cached,
+        norms of all the attribute values are calculated and stored at once.
+        """
         if self._data is None:
             await self._init_data()
-        if attrname not in self._data or value not in self._data[attrname]:
-            self._data[attrname][value] = await super(
-                CachedStructNormsCalc, self).compute_norm(attrname, value)
+        if attrname not in self._data[COMPLETE_ATTRS_KEY]:
+            self._data[attrname] = await self.compute_attr_norms(attrname)
+            self._data[COMPLETE_ATTRS_KEY][attrname] = True
             await self._tt_cache.set_attr_values(self._corp.corpname, self._structname, self._subcnorm, self._data)
-        return self._data[attrname][value]
+        # values are stored as strings (e.g. NUMERIC attribute values come as ints)
+        norms = self._data[attrname]
+        key = str(value)
+        if key not in norms:
+            # a value without any structure (e.g. an inner node of a hierarchical attribute)
+            norms[key] = 0
+        return norms[key]
@@ -1,9 +1,11 @@
 import asyncio
 from functools import partial, wraps
-from typing import AsyncIterator, TypeVar
+from typing import AsyncIterator, Optional, TypeVar
 
 T = TypeVar('T')
 
+_persistent_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 def as_async(func):
     @wraps(func)
@@ -14,13 +16,48 @@ def as_async(func):
     return run
 
 
+def set_persistent_loop(loop: Optional[asyncio.AbstractEventLoop]):
+    """
+    Set an event loop used by all the as_sync-wrapped functions instead
+    of creating a new loop for each call. This allows long-running processes
+    (e.g. a non-forking worker) to keep loop-bound resources between calls.
+    """
+    global _persistent_loop
+    _persistent_loop = loop
+
+
+def runs_on_persistent_loop() -> bool:
+    """
+    Test whether the current coroutine runs on the persistent loop (see set_persistent_loop)
+    """
+    return _persistent_loop is not None and asyncio.get_running_loop() is _persistent_loop
+
+
+def _run_on_persistent_loop(coro):
+    task = _persistent_loop.create_task(coro)
+    try:
+        return _persistent_loop.run_until_complete(task)
+    except BaseException:
+        # e.g. a job timeout signalled while the task is suspended
+        if not task.done():
+            task.cancel()
+            try:
+                _persistent_loop.run_until_complete(task)
+            except BaseException:
+                pass
+        raise
+
+
 def as_sync(func):
     """
-    Runs the wrapped asynchronous function as a blocking one via asyncio.run().
+    Runs the wrapped asynchronous function as a blocking one via asyncio.run()
+    (or via a persistent loop in case it is set - see set_persistent_loop).
     This can be run only when there is no loop running.
     """
     @wraps(func)
     def run(*args, **kwargs):
+        if _persistent_loop is not None:
+            return _run_on_persistent_loop(func(*args, **kwargs))
         return asyncio.run(func(*args, **kwargs))
     return run
 
@@ -50,7 +50,7 @@ from action.model.concordance import ConcActionModel
 from action.model.concordance.linesel import LinesGroups
 from action.model.corpus import CorpusActionModel
 from action.model.user import UserActionModel
-from action.response import KResponse, bytes_stream
+from action.response import KResponse, chunks_stream
 from action.result.concordance import QueryAction
 from bgcalc import calc_backend_client
 from bgcalc.errors import CalcTaskNotFoundError
@@ -60,6 +60,7 @@ from conclib.errors import (
     ConcordanceException, ConcordanceQueryAttrError, ConcordanceQueryParamsError,
     ConcordanceSpecificationError, UnknownConcordanceAction,
     ConcordanceQuerySyntaxError, extract_manatee_error)
+from conclib.executor import run_manatee
 from conclib.freq import one_level_crit
 from conclib.search import get_conc
 from corplib.abstract import SubcorpusIdent
@@ -302,7 +303,7 @@ async def view_conc(
             kwic = Kwic(amodel.corp, conc, await amodel.get_all_corp_merged_posattrs())
 
             out['Sort_idx'] = kwic.get_sort_idx(q=amodel.args.q, pagesize=amodel.args.pagesize)
-            out.update(asdict(kwic.kwicpage(kwic_args)))
+            out.update(asdict(await kwic.kwicpage(kwic_args)))
             out.update(await amodel.get_conc_sizes(conc))
     except UnknownConcordanceAction as ex:
         raise UserReadableException(str(ex))
@@ -479,7 +480,7 @@ async def restore_conc(amodel: ConcActionModel, req: KRequest, resp: KResponse):
                     [amodel.args.corpname] + amodel.args.align)
             kwic = Kwic(amodel.corp, conc, await amodel.get_all_corp_merged_posattrs())
             out['Sort_idx'] = kwic.get_sort_idx(q=amodel.args.q, pagesize=amodel.args.pagesize)
-            out.update(asdict(kwic.kwicpage(kwic_args)))
+            out.update(asdict(await kwic.kwicpage(kwic_args)))
             out.update(await amodel.get_conc_sizes(conc))
             if req.args.get('next') == 'freqs':
                 out['next_action'] = 'freqs'
@@ -1118,7 +1119,8 @@ async def ajax_get_first_line_select_page(amodel: ConcActionModel, req: KRequest
         asnc=False, cutoff=amodel.args.cutoff)
     amodel.apply_linegroups(conc)
     kwic = Kwic(amodel.corp, conc, await amodel.get_all_corp_merged_posattrs())
-    return {'first_page': int((kwic.get_groups_first_line() - 1) / amodel.args.pagesize) + 1}
+    first_line = await run_manatee(kwic.get_groups_first_line)
+    return {'first_page': int((first_line - 1) / amodel.args.pagesize) + 1}
 
 
 @bp.route('/ajax_rename_line_group', ['POST'])
@@ -1293,55 +1295,95 @@ async def saveconc(amodel: ConcActionModel, req: KRequest[SaveConcArgs], resp: K
         with plugins.runtime.EXPORT as export:
             writer = export.load_plugin(req.mapped_args.saveformat, req.locale)
 
-            resp.set_header('Content-Type', writer.content_type())
-            resp.set_header(
-                'Content-Disposition',
-                f'attachment; filename="{mkfilename(req.mapped_args.saveformat)}"')
-
-            long_lines: Set[int] = set()
+        with plugins.runtime.TOKENS_LINKING as tl:
+            internal_attrs = await tl.get_required_attrs(
+                amodel.plugin_ctx,
+                corpus_info.tokens_linking.providers,
+                [amodel.args.corpname] + amodel.args.align)
+        speech_attr = await amodel.get_speech_segment()
+        alignlist = [(await amodel.cf.get_corpus(c)) for c in amodel.args.align if c]
+        maxcontext = int(amodel.corp.get_conf('MAXCONTEXT'))
+        long_lines: Set[int] = set()
+
+        async def kwic_chunks():
             for from_line, to_line in line_range_chunks:
                 if from_line > 0:
                     req.mapped_args.heading = 0
                 req.mapped_args.numbering_offset = from_line
                 kwic_args = KwicPageArgs(asdict(amodel.args), base_attr=amodel.BASE_ATTR)
-                kwic_args.speech_attr = await amodel.get_speech_segment()
+                kwic_args.speech_attr = speech_attr
                 kwic_args.fromp = 1
                 kwic_args.pagesize = to_line - from_line + 1
                 kwic_args.line_offset = from_line
                 kwic_args.labelmap = {}
-                kwic_args.alignlist = [(await amodel.cf.get_corpus(c)) for c in amodel.args.align if c]
+                kwic_args.alignlist = alignlist
                 kwic_args.leftctx = amodel.args.leftctx
                 kwic_args.rightctx = amodel.args.rightctx
                 kwic_args.structs = amodel.get_struct_opts()
-                with plugins.runtime.TOKENS_LINKING as tl:
-                    kwic_args.internal_attrs = await tl.get_required_attrs(
-                        amodel.plugin_ctx,
-                        corpus_info.tokens_linking.providers,
-                        [amodel.args.corpname] + amodel.args.align)
-                data = kwic.kwicpage(kwic_args)
-
-                maxcontext = int(amodel.corp.get_conf('MAXCONTEXT'))
+                kwic_args.internal_attrs = internal_attrs
+                data = await kwic.kwicpage(kwic_args)
+
                 if maxcontext:
                     for i, line in enumerate(data.Lines, from_line+1):
                         if len(line["Kwic"]) > maxcontext:
                             line["Kwic"] = line["Kwic"][:maxcontext] + [{'str': '...'}]
                             long_lines.add(i)
                 if len(data.Lines) > 0:
-                    await writer.write_conc(amodel, data, req.mapped_args)
-
-            output = writer.raw_content()
-
-        notification = None
-        worker = bgcalc.calc_backend_client(settings)
-        if len(long_lines) > 0:
-            msg = req.translate('Some downloaded lines exceeded the maximum length permitted by copyright protection rules and have been truncated')
-            long_lines = sorted(long_lines)
-            if len(long_lines) <= 20:
-                notification = '{}: {}'.format(msg, ", ".join(map(str, long_lines)))
-            else:
-                notification = '{}: {},... ({}: {})'.format(msg,  ", ".join(map(str, long_lines[:20])), req.translate('total'), len(long_lines))
-        await worker.send_task('notification', object.__class__, (notification,), task_id=req.mapped_args.task_id)
-        return bytes_stream(output)
+                    yield data
+
+        async def send_notification():
+            notification = None
+            worker = bgcalc.calc_backend_client(settings)
+            if len(long_lines) > 0:
+                msg = req.translate('Some downloaded lines exceeded the maximum length permitted by copyright protection rules and have been truncated')
+                sorted_lines = sorted(long_lines)
+                if len(sorted_lines) <= 20:
+                    notification = '{}: {}'.format(msg, ", ".join(map(str, sorted_lines)))
+                else:
+                    notification = '{}: {},... ({}: {})'.format(msg,  ", ".join(map(str, sorted_lines[:20])), req.translate('total'), len(sorted_lines))
+            await worker.send_task('notification', object.__class__, (notification,), task_id=req.mapped_args.task_id)
+
+        # The first chunk (both the KWIC data and the writer output) is prepared before
+        # the response starts so most of the possible errors (invalid query, missing attributes,
+        # export failure etc.) are still reported in a standard way instead of a truncated response.
+        # The rest is produced (and sent) chunk by chunk so the memory consumption is bounded
+        # by a single chunk.
+        kwic_iter = kwic_chunks()
+        first_kwic_chunk = await anext(kwic_iter, None)
+
+        async def all_kwic_chunks():
+            if first_kwic_chunk is not None:
+                yield first_kwic_chunk
+                async for data in kwic_iter:
+                    yield data
+
+        async def output_chunks():
+            async for output in writer.stream_conc(amodel, all_kwic_chunks(), req.mapped_args):
+                yield output
+            # the user is notified only once the export is complete
+            await send_notification()
+
+        output_iter = output_chunks()
+        first_output = await anext(output_iter, None)
+
+        async def response_chunks():
+            try:
+                if first_output is not None:
+                    yield first_output
+                    async for output in output_iter:
+                        yield output
+            finally:
+                await output_iter.aclose()
+                # the stream outlives the action so the resources (e.g. plug-ins' database
+                # connections) are released once the stream ends (see the response middleware)
+                await plugins.close_request_resources()
+
+        req.ctx.streamed_response = True
+        return chunks_stream(
+            response_chunks(),
+            mime_type=writer.content_type(),
+            headers={
+                'Content-Disposition': f'attachment; filename="{mkfilename(req.mapped_args.saveformat)}"'})
 
     except Exception as e:
         resp.set_header('Content-Type', 'text/html')
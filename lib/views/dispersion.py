@@ -12,7 +12,6 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
-from dataclasses import dataclass
 from typing import List
 
 from action.argmapping.analytics import (
@@ -23,62 +22,22 @@ from action.krequest import KRequest
 from action.model.concordance import ConcActionModel
 from action.response import KResponse
 from bgcalc.conc import require_existing_conc
+from bgcalc.dispersion import FreqDispersionBin, get_freq_dispersion
 from conclib.errors import ConcNotFoundException
-from conclib.pyconc import PyConc
-from dataclasses_json import dataclass_json
 from main_menu import MainMenu
 from sanic import Blueprint
 
 bp = Blueprint('dispersion', url_prefix='dispersion')
 
 
-@dataclass_json
-@dataclass
-class FreqDispersionBin:
-    start: float
-    position: float
-    end: float
-    freq: int
-
-
-def _get_freq_dispersion(conc: PyConc, resolution: int) -> List[FreqDispersionBin]:
-    conc_begs, values = conc.xdistribution([0] * resolution, 101)
-
-    abs_freq = []
-    last_valid_item = None
-    for beg in reversed(conc_begs):
-        # if beg is 0, it means there are no concordances in the bin
-        if beg > 0:
-            if last_valid_item is None:
-                abs_freq.append(int(conc.size()) - beg)
-            else:
-                # `last_valid_item - beg` is number of concordances
-                # between beginnig of last non empty bin and the beginning of current bin
-                # (for cycle is going backwards)
-                abs_freq.append(last_valid_item - beg)
-            last_valid_item = beg
-        else:
-            abs_freq.append(0)
-
-    freq_dispersion = [
-        FreqDispersionBin(
-            100 * i / len(conc_begs),
-            100 * (i + 0.5) / len(conc_begs),
-            100 * (i + 1) / len(conc_begs),
-            freq,
-        ) for i, freq in enumerate(reversed(abs_freq))
-    ]
-
-    return freq_dispersion
-
-
 @bp.route('/ajax_get_freq_dispersion')
 @http_action(action_model=ConcActionModel, return_type='json')
 async def ajax_get_freq_dispersion(amodel: ConcActionModel, req: KRequest, resp: KResponse) -> List[FreqDispersionBin]:
     conc = await require_existing_conc(amodel.corp, amodel.args.q, amodel.args.cutoff)
     resolution = int(req.args.get('resolution', 100))
     if 0 < resolution <= 1000:
-        return _get_freq_dispersion(conc, resolution)
+        return await get_freq_dispersion(
+            amodel.corp, amodel.subcpath, conc, tuple(amodel.args.q), amodel.args.cutoff, resolution)
     raise UserReadableException('Invalid dispersion resolution. Acceptable values [1, 1000].')
 
 
@@ -108,7 +67,8 @@ async def index(amodel: ConcActionModel, req: KRequest, response: KResponse):
         'ctfreq_form_args': CTFreqFormArgs().update(amodel.args).to_dict(),
         'text_types_data': await amodel.tt.export_with_norms(ret_nums=True),
         'dispersion_resolution': resolution,
-        'initial_data': _get_freq_dispersion(conc, resolution),
+        'initial_data': await get_freq_dispersion(
+            amodel.corp, amodel.subcpath, conc, tuple(amodel.args.q), amodel.args.cutoff, resolution),
     }
     await amodel.export_query_forms(result)
     return result
@@ -13,7 +13,6 @@
 # GNU General Public License for more details.
 
 import asyncio
-import aiohttp
 from typing import Type, TypeVar
 
 import settings
@@ -66,13 +65,12 @@ async def _init_action_model(req: Request, action_model: Type[T], access_level:
     shared_data = ModelsSharedData(application.ctx.tt_cache, dict())
     krequest = KRequest(req, app_url_prefix, None)
     amodel = action_model(krequest, None, aprops, shared_data)
-    async with aiohttp.ClientSession() as client:
-        req.ctx.http_client = client
-        await amodel.init_session()
-        if not _is_authorized_to_execute_action(amodel, aprops):
-            raise PermissionError
-        await amodel.pre_dispatch(None)
-        return amodel
+    req.ctx.http_client = application.ctx.http_client
+    await amodel.init_session()
+    if not _is_authorized_to_execute_action(amodel, aprops):
+        raise PermissionError
+    await amodel.pre_dispatch(None)
+    return amodel
 
 
 @bp.route('/task_status')
@@ -89,19 +87,20 @@ async def check_tasks_status(req: Request):
             "Connection": "keep-alive"
         }
     )
-    task = await _check_task_status(amodel, task_id)
-    await response.send(f"data: {json.dumps(task.to_dict())}\n\n")
-    i = 0
-    while task and not task.is_finished() and i < MAX_STREAMING_ITERATIONS:
-        await asyncio.sleep(TASK_CHECK_INTERVAL)
+    try:
         task = await _check_task_status(amodel, task_id)
         await response.send(f"data: {json.dumps(task.to_dict())}\n\n")
-        i += 1
-    # now we must manually close plug-ins as Sanic's response middleware
-    # does not wait for the stream end.
-    for p in plugins.runtime:
-        if hasattr(p.instance, 'on_response'):
-            await p.instance.on_response()
+        i = 0
+        while task and not task.is_finished() and i < MAX_STREAMING_ITERATIONS:
+            await asyncio.sleep(TASK_CHECK_INTERVAL)
+            task = await _check_task_status(amodel, task_id)
+            await response.send(f"data: {json.dumps(task.to_dict())}\n\n")
+            i += 1
+    finally:
+        # we must manually close plug-ins as Sanic's response middleware
+        # does not wait for the stream end (this must happen also in case
+        # the client disconnects and the handler gets cancelled)
+        await plugins.close_request_resources()
 
 
 @bp.route('/conc_cache_status')
@@ -115,14 +114,12 @@ async def conc_cache_status(req: Request):
         }
     )
 
-    for i in range(MAX_STREAMING_ITERATIONS):
-        status = await _get_conc_cache_status(amodel)
-        await response.send(f"data: {json.dumps(status)}\n\n")
-        if status['finished']:
-            break
-        await asyncio.sleep(CONC_CHECK_INTERVAL)
-    # now we must manually close plug-ins as Sanic's response middleware
-    # does not wait for the stream end.
-    for p in plugins.runtime:
-        if hasattr(p.instance, 'on_response'):
-            await p.instance.on_response()
\ No newline at end of file
+    try:
+        for i in range(MAX_STREAMING_ITERATIONS):
+            status = await _get_conc_cache_status(amodel)
+            await response.send(f"data: {json.dumps(status)}\n\n")
+            if status['finished']:
+                break
+            await asyncio.sleep(CONC_CHECK_INTERVAL)
+    finally:
+        await plugins.close_request_resources()
\ No newline at end of file
@@ -32,6 +32,7 @@ from action.model.corpus import CorpusActionModel
 from action.model.subcorpus import SubcorpusActionModel, SubcorpusError
 from action.model.user import UserActionModel
 from action.response import KResponse
+from bgcalc.freqs import freq_precalc_status, subc_precalc_attrs
 from bgcalc.task import AsyncTaskStatus
 from corplib.abstract import SubcorpusIdent
 from corplib.errors import CorpusInstantiationError
@@ -61,12 +62,19 @@ async def properties(amodel: CorpusActionModel, req: KRequest, resp: KResponse):
         alcorp = await amodel.cf.get_corpus(al)
         availableAligned.append(dict(label=alcorp.get_conf('NAME') or al, n=al))
 
+    # status of freq. indices precalculated for new subcorpora ('ready', 'running', 'queued', 'missing')
+    freq_precalc = {}
+    for attr in subc_precalc_attrs(amodel.corp.corpname):
+        if attr in amodel.corp.get_posattrs():
+            freq_precalc[attr] = await freq_precalc_status(amodel.corp, attr)
+
     return {
         'data': info.to_dict(),
         'textTypes': await amodel.tt.export_with_norms(),
         'structsAndAttrs': {k: [x.to_dict() for x in item] for k, item in struct_and_attrs.items()},
         'liveAttrsEnabled': live_attrs_enabled,
         'availableAligned': availableAligned,
+        'freqPrecalc': freq_precalc,
     }
 
 
@@ -29,7 +29,7 @@ from action.model.wordlist import WordlistActionModel, WordlistError
 from action.response import KResponse, bytes_stream
 from bgcalc import calc_backend_client
 from bgcalc.errors import BgCalcError
-from bgcalc.freqs import build_arf_db, build_arf_db_status
+from bgcalc.freqs import build_arf_db, build_arf_db_status, freq_precalc_status
 from bgcalc.task import AsyncTaskStatus
 from bgcalc.wordlist import make_wl_query, require_existing_wordlist
 from bgcalc.wordlist.errors import WordlistResultNotFound
@@ -287,4 +287,8 @@ async def process(amodel: WordlistActionModel, req: KRequest, _: KResponse):
             tr = worker.AsyncResult(t)
             if tr.status == 'FAILURE':
                 raise BgCalcError(f'Task {t} failed')
-    return {'status': await build_arf_db_status(amodel.corp, req.args.get('attrname', ''))}
+    attrname = req.args.get('attrname', '')
+    ans = {'status': await build_arf_db_status(amodel.corp, attrname)}
+    if attrname in amodel.corp.get_posattrs():
+        ans['precalc_status'] = await freq_precalc_status(amodel.corp, attrname)
+    return ans
@@ -60,10 +60,14 @@ import jwt
 import plugins
 import plugins.export
 import settings
+from action import http_client
 from action.context import ApplicationContext
 from action.plugin.initializer import install_plugin_actions, setup_plugins
 from action.templating import TplEngine
 from babel import support
+from conclib.executor import get_manatee_executor
+from corplib import frq_files
+from corplib.handles import get_handle_cache
 from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError
 from log_formatter import KontextLogFormatter
 from sanic import Request, Sanic
@@ -202,6 +206,11 @@ async def server_init(app: Sanic, loop: asyncio.BaseEventLoop):
         logging.getLogger(__name__).warning(
             f'Internal HTTP client timeout not configured, using default {DFLT_HTTP_CLIENT_TIMEOUT} sec.')
     app.ctx.kontext_conf = {'http_client_timeout_secs': http_client_conf}
+    app.ctx.http_client = http_client.create_client_session(
+        limit=settings.get_int('global', 'http_client_max_connections', http_client.DEFAULT_LIMIT),
+        limit_per_host=settings.get_int('global', 'http_client_max_connections_per_host', 0),
+        keepalive_timeout=settings.get_int(
+            'global', 'http_client_keepalive_secs', http_client.DEFAULT_KEEPALIVE_SECS))
     # load all translations
     load_translations(app)
     # load restart token
@@ -269,6 +278,11 @@ async def stop_receiver(app: Sanic, loop: asyncio.BaseEventLoop):
         app.ctx.receiver.cancel()
 
 
+@application.listener('after_server_stop')
+async def close_http_client(app: Sanic, loop: asyncio.BaseEventLoop):
+    await app.ctx.http_client.close()
+
+
 @application.middleware('request')
 async def extract_jwt(request: Request):
     jwt_cookie = request.cookies.get(JWT_COOKIE_NAME)
@@ -315,10 +329,9 @@ async def store_jwt(request: Request, response: HTTPResponse):
             or request.headers.get('x-forwarded-proto') == 'https'
         )
     )
-    if response.content_type != 'text/event-stream':
-        for p in plugins.runtime:
-            if hasattr(p.instance, 'on_response'):
-                await p.instance.on_response()
+    # streamed responses (SSE, some exports) release the resources by themselves once the stream ends
+    if response.content_type != 'text/event-stream' and not getattr(request.ctx, 'streamed_response', False):
+        await plugins.close_request_resources()
 
 
 @application.signal('kontext.internal.reset')
@@ -328,6 +341,13 @@ async def handle_soft_reset_signal():
         if callable(fn):
             await fn()
     await tt_cache.clear_all()
+    logging.getLogger(__name__).info(f'clearing corpus handle cache, stats: {get_handle_cache().stats()}')
+    get_handle_cache().clear()
+    frq_files.clear_cache()
+    logging.getLogger(__name__).info(f'manatee executor stats: {get_manatee_executor().stats()}')
+    get_manatee_executor().reset_stats()
+    logging.getLogger(__name__).info(f'HTTP client latency stats: {http_client.latency_stats()}')
+    http_client.reset_latency_stats()
     logging.getLogger(__name__).warning('performed internal soft reset (Sanic signal)')
 
 
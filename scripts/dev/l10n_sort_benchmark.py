@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A micro-benchmark of l10n.sort() comparing the sort key based sorting
+with the former comparison based one (a new collator and a collator.compare()
+call per comparison). The data are pseudo-random Czech and English words
+(including words differing only in diacritics and case).
+"""
+
+import os
+import random
+import sys
+import time
+from functools import cmp_to_key
+
+app_path = os.path.realpath('%s/../..' % os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, '%s/lib' % app_path)
+
+import l10n
+
+CS_SYLLABLES = [
+    'ča', 'ře', 'ší', 'ža', 'ťo', 'ďu', 'ně', 'ch', 'ko', 'ru', 'ma', 'le', 'sů', 'vý', 'pá', 'zé', 'bo', 'dě',
+    'Ča', 'Ře', 'St', 'Př', 'Ho']
+EN_SYLLABLES = [
+    'th', 'an', 'er', 'on', 'in', 'ed', 'st', 'ou', 'ea', 'al', 'Re', 'Co', 'pr', 'ly', 'ng', 'ck', 'we', 'Sh']
+
+
+def generate_words(syllables, num_words, seed):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(syllables) for _ in range(rnd.randint(1, 5))) for _ in range(num_words)]
+
+
+def cmp_sort(iterable, loc, key=None):
+    collator = l10n.Collator.createInstance(l10n.Locale(loc))
+    if key is None:
+        kf = cmp_to_key(collator.compare)
+    else:
+        def tmp(v1, v2):
+            return collator.compare(key(v1), key(v2))
+        kf = cmp_to_key(tmp)
+    return sorted(iterable, key=kf)
+
+
+def measure(fn, *args, **kwargs):
+    t0 = time.monotonic()
+    ans = fn(*args, **kwargs)
+    return ans, time.monotonic() - t0
+
+
+if __name__ == '__main__':
+    import argparse
+
+    argparser = argparse.ArgumentParser(description='l10n.sort() micro-benchmark')
+    argparser.add_argument('--size', type=int, default=100000, help='number of sorted strings per locale')
+    argparser.add_argument(
+        '--max-time', type=float, default=None,
+        help='fail (exit code 1) if sorting of any data set takes more than the specified time (in seconds)')
+    args = argparser.parse_args()
+
+    failed = False
+    for loc, syllables in (('cs_CZ', CS_SYLLABLES), ('en_US', EN_SYLLABLES)):
+        words = generate_words(syllables, args.size, seed=loc)
+        rows = [(w, i) for i, w in enumerate(words)]
+        orig_sorted, orig_time = measure(cmp_sort, words, loc)
+        new_sorted, new_time = measure(l10n.sort, words, loc)
+        _, new_key_time = measure(l10n.sort, rows, loc, key=lambda x: x[0])
+        if orig_sorted != new_sorted:
+            print(f'{loc}: sort key based ordering differs from the comparison based one')
+            failed = True
+        print(f'{loc} ({args.size} strings): compare {orig_time:.3f}s, sort key {new_time:.3f}s '
+              f'(with key function {new_key_time:.3f}s), speed-up {orig_time / new_time:.1f}x')
+        if args.max_time is not None and max(new_time, new_key_time) > args.max_time:
+            print(f'{loc}: sorting exceeded the limit of {args.max_time}s')
+            failed = True
+    sys.exit(1 if failed else 0)
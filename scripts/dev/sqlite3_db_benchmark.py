@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+A micro-benchmark comparing the pooled mode of the sqlite3_db plug-in
+with the connection-per-operation mode and with the original implementation
+(a connection per operation and removing expired records on each read).
+Each run uses a fresh temporary database and performs a mix of typical operations
+(get/set, hash_get/hash_set, exists) by a number of concurrent clients. Some of
+the keys expire during the run.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+app_path = os.path.realpath('%s/../..' % os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, '%s/lib' % app_path)
+
+import aiosqlite
+from plugins.sqlite3_db import DefaultDb
+
+
+class OriginalDb(DefaultDb):
+    """
+    The implementation before the connection pool was introduced - each read
+    opens an extra connection to remove the key in case it is expired
+    """
+
+    def __init__(self, db_path):
+        super().__init__(db_path, pool_size=0)
+
+    async def _delete_expired(self, key):
+        async with aiosqlite.connect(self._db_path) as conn:
+            cursor = await conn.execute('SELECT expires FROM data WHERE key = ?', (key,))
+            ans = await cursor.fetchone()
+            if ans and -1 < ans[0] < time.time():
+                await conn.execute('DELETE FROM data WHERE key = ?', (key,))
+                await conn.commit()
+
+    async def _load_raw_data(self, key):
+        await self._delete_expired(key)
+        return await super()._load_raw_data(key)
+
+    async def exists(self, key):
+        await self._delete_expired(key)
+        return await super().exists(key)
+
+
+async def run_client(db, client_id, num_ops):
+    for i in range(num_ops // 5):
+        key = f'bench:{client_id}:{i % 50}'
+        await db.set(key, {'client': client_id, 'i': i})
+        if i % 10 == 0:
+            await db.set_ttl(key, 0)
+        await db.get(key)
+        await db.hash_set(f'bench_hash:{client_id}', str(i % 50), i)
+        await db.hash_get(f'bench_hash:{client_id}', str(i % 50))
+        await db.exists(key)
+
+
+async def measure(create_db, num_clients, num_ops):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('CREATE TABLE data (key text PRIMARY KEY, value text, expires integer)')
+        db = create_db(db_path)
+        t0 = time.monotonic()
+        await asyncio.gather(*[run_client(db, c, num_ops) for c in range(num_clients)])
+        elapsed = time.monotonic() - t0
+        await db.close()
+    return num_clients * (num_ops // 5) * 5 / elapsed
+
+
+if __name__ == '__main__':
+    import argparse
+
+    argparser = argparse.ArgumentParser(description='sqlite3_db plug-in micro-benchmark')
+    argparser.add_argument('--clients', type=int, default=4, help='number of concurrent clients')
+    argparser.add_argument('--ops', type=int, default=2000, help='number of operations per client')
+    argparser.add_argument('--pool-size', type=int, default=4, help='pool size for the pooled mode')
+    args = argparser.parse_args()
+
+    variants = (
+        ('original', OriginalDb),
+        ('connection per operation', lambda path: DefaultDb(path, pool_size=0)),
+        (f'pooled ({args.pool_size})', lambda path: DefaultDb(path, pool_size=args.pool_size)))
+    for label, create_db in variants:
+        ops = asyncio.run(measure(create_db, args.clients, args.ops))
+        print(f'{label}: {ops:.0f} ops/s')
@@ -0,0 +1,90 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from corplib import handles
+from corplib.handles import CorpusHandleCache
+
+
+def mtime_of(value: float):
+    async def fn(handle):
+        return value
+    return fn
+
+
+async def missing_file(handle):
+    raise FileNotFoundError('no such file')
+
+
+class CorpusHandleCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = CorpusHandleCache(2)
+
+    async def test_least_recently_used_handle_is_evicted(self):
+        self.cache.put(('/reg/a', ''), 10, 'a')
+        self.cache.put(('/reg/b', ''), 10, 'b')
+        self.assertEqual('a', await self.cache.get(('/reg/a', ''), mtime_of(10)))
+        self.cache.put(('/reg/c', ''), 10, 'c')
+        self.assertIsNone(await self.cache.get(('/reg/b', ''), mtime_of(10)))
+        self.assertEqual('a', await self.cache.get(('/reg/a', ''), mtime_of(10)))
+        self.assertEqual('c', await self.cache.get(('/reg/c', ''), mtime_of(10)))
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    async def test_modified_files_invalidate_handle(self):
+        self.cache.put(('/reg/a', ''), 10, 'a')
+        self.assertEqual('a', await self.cache.get(('/reg/a', ''), mtime_of(10)))
+        self.assertIsNone(await self.cache.get(('/reg/a', ''), mtime_of(11)))
+        # the outdated handle is removed
+        self.assertIsNone(await self.cache.get(('/reg/a', ''), mtime_of(10)))
+        self.cache.put(('/reg/a', ''), 10, 'a')
+        self.assertIsNone(await self.cache.get(('/reg/a', ''), missing_file))
+        stats = self.cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(3, stats['misses'])
+        self.assertEqual(2, stats['invalidations'])
+
+    async def test_subcorpora_are_keyed_separately(self):
+        cache = CorpusHandleCache(10)
+        cache.put(('/reg/a', ''), 10, 'a')
+        cache.put(('/reg/a', 'sub1'), 10, 'a/sub1')
+        cache.put(('/reg/a', 'sub2'), 10, 'a/sub2')
+        cache.put(('/reg/b', 'sub1'), 10, 'b/sub1')
+        self.assertEqual('a/sub1', await cache.get(('/reg/a', 'sub1'), mtime_of(10)))
+        self.assertEqual('b/sub1', await cache.get(('/reg/b', 'sub1'), mtime_of(10)))
+        # an outdated subcorpus does not affect its corpus or other subcorpora
+        self.assertIsNone(await cache.get(('/reg/a', 'sub1'), mtime_of(11)))
+        self.assertEqual('a/sub2', await cache.get(('/reg/a', 'sub2'), mtime_of(10)))
+        self.assertEqual('a', await cache.get(('/reg/a', ''), mtime_of(10)))
+        # an outdated corpus removes all its subcorpora
+        self.assertIsNone(await cache.get(('/reg/a', ''), mtime_of(11)))
+        self.assertIsNone(await cache.get(('/reg/a', 'sub2'), mtime_of(10)))
+        self.assertEqual('b/sub1', await cache.get(('/reg/b', 'sub1'), mtime_of(10)))
+
+    async def test_stats_are_logged_periodically(self):
+        self.cache.put(('/reg/a', ''), 10, 'a')
+        with self.assertLogs(handles.__name__, level='INFO') as logs:
+            for _ in range(handles.STATS_LOG_INTERVAL):
+                await self.cache.get(('/reg/a', ''), mtime_of(10))
+        self.assertEqual(1, len(logs.records))
+        self.assertEqual(handles.STATS_LOG_INTERVAL, logs.records[0].msg['hits'])
+
+
+if __name__ == '__main__':
+    unittest.main()
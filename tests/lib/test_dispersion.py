@@ -0,0 +1,112 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import tempfile
+import threading
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from bgcalc.dispersion import find_cached_dispersion, get_freq_dispersion, store_dispersion
+from plugin_types.conc_cache import dispersion_cache_path
+
+
+class DispersionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.conc_path = os.path.join(self._tmp_dir.name, 'abcd.conc')
+        self._write_conc(b'conc data', mtime=1000)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write_conc(self, data, mtime):
+        with open(self.conc_path, 'wb') as fw:
+            fw.write(data)
+        os.utime(self.conc_path, (mtime, mtime))
+
+    def test_histograms_of_all_resolutions_are_kept(self):
+        self.assertIsNone(find_cached_dispersion(self.conc_path, 4))
+        store_dispersion(self.conc_path, 4, [1, 2, 3, 4])
+        store_dispersion(self.conc_path, 2, [3, 7])
+        self.assertEqual([1, 2, 3, 4], find_cached_dispersion(self.conc_path, 4))
+        self.assertEqual([3, 7], find_cached_dispersion(self.conc_path, 2))
+        self.assertIsNone(find_cached_dispersion(self.conc_path, 3))
+
+    def test_recalculated_conc_invalidates_cache(self):
+        store_dispersion(self.conc_path, 2, [3, 7])
+        self._write_conc(b'conc data', mtime=2000)
+        self.assertIsNone(find_cached_dispersion(self.conc_path, 2))
+        store_dispersion(self.conc_path, 4, [1, 2, 3, 4])
+        self.assertIsNone(find_cached_dispersion(self.conc_path, 2))  # outdated histograms are not kept
+        self.assertEqual([1, 2, 3, 4], find_cached_dispersion(self.conc_path, 4))
+
+    def test_corrupted_cache_is_ignored(self):
+        store_dispersion(self.conc_path, 4, [1, 2, 3, 4])
+        with open(dispersion_cache_path(self.conc_path), 'r+b') as fw:
+            fw.truncate(os.path.getsize(dispersion_cache_path(self.conc_path)) - 8)
+        self.assertIsNone(find_cached_dispersion(self.conc_path, 4))
+        store_dispersion(self.conc_path, 2, [3, 7])
+        self.assertEqual([3, 7], find_cached_dispersion(self.conc_path, 2))
+
+
+
+class FakeConc:
+    """
+    A small concordance recording threads its distribution is calculated in
+    """
+
+    def __init__(self, conc_path: str):
+        self._conc_path = conc_path
+        self.threads = []
+
+    def get_conc_file(self):
+        return self._conc_path
+
+    def size(self):
+        return 10
+
+    def xdistribution(self, begs, maxval):
+        self.threads.append(threading.current_thread())
+        return [0, 2, 5, 0], [0] * 4
+
+
+class FreqDispersionTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.conc_path = os.path.join(self._tmp_dir.name, 'abcd.conc')
+        with open(self.conc_path, 'wb') as fw:
+            fw.write(b'conc data')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_small_conc_is_calculated_outside_event_loop(self):
+        conc = FakeConc(self.conc_path)
+        bins = await get_freq_dispersion(None, None, conc, ('aword,[]',), 0, 4)
+        self.assertEqual([0, 3, 5, 0], [b.freq for b in bins])
+        self.assertEqual(1, len(conc.threads))
+        self.assertIsNot(threading.current_thread(), conc.threads[0])
+        # the result is cached
+        await get_freq_dispersion(None, None, conc, ('aword,[]',), 0, 4)
+        self.assertEqual(1, len(conc.threads))
+
+
+if __name__ == '__main__':
+    unittest.main()
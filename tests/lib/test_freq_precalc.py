@@ -0,0 +1,131 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+import bgcalc.freqs as freqs
+from corplib.corpus import KCorpus
+
+
+class FakeAttr:
+
+    def __init__(self, path):
+        self._path = path
+
+    def get_stat(self, method):
+        return os.path.exists(self._path + '.' + method)
+
+
+class FakeManateeCorpus:
+
+    def __init__(self, path):
+        self._path = path
+
+    def get_conf(self, item):
+        return dict(PATH=self._path, ATTRLIST='word,lemma').get(item, '')
+
+    def get_attr(self, attr):
+        return FakeAttr(self._path + attr)
+
+    def search_size(self):
+        return 1000
+
+
+class FakeResult:
+    status = 'PENDING'
+    id = 'task-id'
+
+
+class FakeWorker:
+
+    def __init__(self, fail=False):
+        self.tasks = []
+        self._fail = fail
+
+    async def send_task(self, name, ans_type, args=None, time_limit=None, queue=None):
+        if self._fail:
+            raise ConnectionError('Redis is gone')
+        self.tasks.append((name, args, queue))
+        return FakeResult()
+
+
+class FreqPrecalcTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.corp = KCorpus(FakeManateeCorpus(self._tmp_dir.name + '/'), 'susanne')
+        self.worker = FakeWorker()
+        self._patches = [
+            mock.patch.object(freqs, 'subc_precalc_attrs', lambda corpname: ['lemma', 'tag']),
+            mock.patch.object(freqs.bgcalc, 'calc_backend_client', lambda conf: self.worker)]
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self._patches:
+            patch.stop()
+        self._tmp_dir.cleanup()
+
+    async def test_status_transitions(self):
+        self.assertEqual(freqs.PRECALC_STATUS_MISSING, await freqs.freq_precalc_status(self.corp, 'lemma'))
+
+        tasks = await freqs.schedule_freq_precalc(self.corp)
+        self.assertEqual(3, len(tasks))  # 'tag' is not a positional attribute of the corpus
+        self.assertEqual(
+            ['compile_arf', 'compile_frq', 'compile_docf'], [name for name, _, _ in self.worker.tasks])
+        self.assertEqual(freqs.PRECALC_STATUS_QUEUED, await freqs.freq_precalc_status(self.corp, 'lemma'))
+
+        for name, (_, attrname, logfile), _ in self.worker.tasks:
+            await freqs.mark_precalc_started(self.corp, attrname, name.split('_')[1], logfile)
+            self.assertTrue(os.path.isfile(logfile))
+        self.assertEqual(freqs.PRECALC_STATUS_RUNNING, await freqs.freq_precalc_status(self.corp, 'lemma'))
+
+        for freq_path in freqs.corp_freqs_cache_paths(self.corp, 'lemma').values():
+            open(freq_path, 'w').close()
+        self.assertEqual(freqs.PRECALC_STATUS_READY, await freqs.freq_precalc_status(self.corp, 'lemma'))
+
+    async def test_lost_queued_task_is_missing(self):
+        await freqs.schedule_freq_precalc(self.corp)
+        for freq_path in freqs.corp_freqs_cache_paths(self.corp, 'lemma').values():
+            old = os.path.getmtime(freqs.create_queued_marker_path(freq_path)) - freqs.MAX_QUEUED_MARKER_AGE - 1
+            os.utime(freqs.create_queued_marker_path(freq_path), (old, old))
+        self.assertEqual(freqs.PRECALC_STATUS_MISSING, await freqs.freq_precalc_status(self.corp, 'lemma'))
+
+    async def test_on_demand_calculation_is_not_duplicated(self):
+        await freqs.schedule_freq_precalc(self.corp)
+        freq_path = self.corp.freq_precalc_file('lemma', 'frq')
+        logfile = freqs.create_log_path(freq_path)
+        with open(logfile, 'w') as fw:
+            fw.write('1234\n1000\n50 %')  # already being built on demand
+        await freqs.mark_precalc_started(self.corp, 'lemma', 'frq', logfile)
+        self.assertFalse(os.path.exists(freqs.create_queued_marker_path(freq_path)))
+        with open(logfile) as fr:
+            self.assertEqual('50 %', fr.read().split('\n')[-1])
+
+    async def test_failed_queueing_leaves_no_marker(self):
+        self.worker = FakeWorker(fail=True)
+        self.assertEqual([], await freqs.schedule_freq_precalc(self.corp))
+        self.assertEqual(freqs.PRECALC_STATUS_MISSING, await freqs.freq_precalc_status(self.corp, 'lemma'))
+        self.assertEqual([], [f for f in os.listdir(self._tmp_dir.name) if f.endswith('.queued')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from bgcalc.freqs import storage
+from bgcalc.freqs.types import FreqCalcArgs, FreqCalcResult
+from conclib.freq import FreqData, FreqItem
+
+
+def create_items(num):
+    # words in reversed alphabetical order to make the sortings differ
+    return [
+        FreqItem(Word=[{'n': f'w{num - i:05d}'}], freq=num - i, norm=1000, rel=(i % 7) / 10)
+        for i in range(num)]
+
+
+class FreqsStorageTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        self._patch = mock.patch.object(
+            storage, '_cache_dir_path', lambda args: os.path.join(self._tmp_dir, args.corpname))
+        self._patch.start()
+        self.num_calls = 0
+
+    def tearDown(self):
+        self._patch.stop()
+        shutil.rmtree(self._tmp_dir)
+
+    def create_args(self, **kw):
+        args = FreqCalcArgs(
+            user_id=1, corpname='susanne', collator_locale='en_US', flimit=1, fcrit=['word 0'],
+            freq_sort='freq', rel_mode=1, fpage=1, fpagesize=50, q=['aword,[]'])
+        return replace(args, **kw)
+
+    async def store(self, args, items):
+        @storage.stored_to_fs
+        async def calc(args):
+            self.num_calls += 1
+            return FreqCalcResult(conc_size=1000, freqs=[FreqData(
+                Head=[{'n': 'word', 's': 'word 0', 'title': 'word'}], Size=len(items), SkippedEmpty=False,
+                NoRelSorting=False, Items=list(items))])
+        return await calc(args)
+
+    def cache_files(self):
+        return sorted(os.listdir(os.path.join(self._tmp_dir, 'susanne')))
+
+    async def test_indexed_page_matches_full_read(self):
+        items = create_items(1000)
+        ans = await self.store(self.create_args(), items)
+        self.assertTrue(ans.fs_stored_data)
+        for fpage in (1, 2, 7, 20, 21):
+            args = self.create_args(fpage=fpage)
+            indexed, cache_path = storage.find_cached_result(args)
+            self.assertEqual(items[(fpage - 1) * 50:fpage * 50], indexed.freqs[0].Items)
+            self.assertEqual(1000, indexed.freqs[0].Size)
+            index_path = storage._index_file_path(cache_path)
+            os.rename(index_path, index_path + '.bak')
+            full, _ = storage.find_cached_result(args)
+            os.rename(index_path + '.bak', index_path)
+            self.assertEqual(indexed, full)
+
+    async def test_stale_index_is_not_used(self):
+        await self.store(self.create_args(), create_items(1000))
+        _, cache_path = storage.find_cached_result(self.create_args())
+        index_path = storage._index_file_path(cache_path)
+        stale_index = index_path + '.stale'
+        shutil.copy(index_path, stale_index)
+        os.unlink(cache_path)
+        items = create_items(500)
+        await self.store(self.create_args(), items)
+        os.replace(stale_index, index_path)
+        data, _ = storage.find_cached_result(self.create_args(fpage=3))
+        self.assertEqual(items[100:150], data.freqs[0].Items)
+
+    async def test_requested_sort_index_is_created_with_result(self):
+        items = create_items(200)
+        await self.store(self.create_args(freq_sort='0'), items)
+        [cache_file] = [f for f in self.cache_files() if f.endswith('.jsonl')]
+        base = os.path.splitext(cache_file)[0]
+        self.assertEqual([f'{base}.0.en_US.sidx', f'{base}.idx', cache_file], self.cache_files())
+        data, _ = storage.find_cached_result(self.create_args(freq_sort='0', fpage=2))
+        self.assertEqual(sorted(items, key=lambda v: v.Word[0]['n'])[50:100], data.freqs[0].Items)
+
+    async def test_other_sorting_reuses_cached_data(self):
+        items = create_items(200)
+        await self.store(self.create_args(), items)
+        data, _ = await storage.afind_cached_result(self.create_args(freq_sort='rel', user_id=2))
+        self.assertEqual(sorted(items, key=lambda v: v.rel, reverse=True)[:50], data.freqs[0].Items)
+        self.assertEqual(1, self.num_calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import tempfile
+import unittest
+from array import array
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from corplib import frq_files
+from corplib.frq_files import discard_frq_files, get_frq_view
+
+
+class FrqFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp_dir.name, 'word.frq')
+        frq_files.clear_cache()
+
+    def tearDown(self):
+        frq_files.clear_cache()
+        self._tmp_dir.cleanup()
+
+    def _write(self, values):
+        with open(self.path, 'wb') as fw:
+            array('i', values).tofile(fw)
+
+    def test_rebuilt_file_does_not_affect_existing_view(self):
+        self._write([1, 2, 3, 4])
+        view = get_frq_view(self.path, 'i', 4)
+        discard_frq_files([self.path, self.path + '64'])
+        self.assertFalse(os.path.exists(self.path))
+        self._write([5, 6])  # e.g. a recompiled (smaller) subcorpus
+        self.assertEqual([1, 2, 3, 4], list(view))
+        self.assertEqual([5, 6], list(get_frq_view(self.path, 'i', 2)))
+
+    def test_missing_file_is_not_kept_mapped(self):
+        self._write([1, 2])
+        get_frq_view(self.path, 'i', 2)
+        os.unlink(self.path)
+        with self.assertRaises(IOError):
+            get_frq_view(self.path, 'i', 2)
+        self.assertEqual(0, len(frq_files._cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
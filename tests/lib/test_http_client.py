@@ -0,0 +1,100 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.
+
+import unittest
+from unittest import mock
+
+from action import http_client
+from action.http_client import create_client_session
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+class SharedSessionCookiesTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.received = []
+
+        async def login(request):
+            resp = web.Response(text='ok')
+            resp.set_cookie('sid', 'anonymous-sid')
+            return resp
+
+        async def data(request):
+            self.received.append(request.headers.get('Cookie'))
+            return web.Response(text='ok')
+
+        app = web.Application()
+        app.router.add_post('/login', login)
+        app.router.add_get('/data', data)
+        self.server = TestServer(app, host='localhost')
+        await self.server.start_server()
+        self.session = create_client_session()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_response_cookies_are_not_shared(self):
+        async with self.session.post(self.server.make_url('/login')) as resp:
+            self.assertEqual('anonymous-sid', resp.cookies['sid'].value)
+        async with self.session.get(self.server.make_url('/data')):
+            pass
+        self.assertEqual([None], self.received)
+
+    async def test_explicit_cookie_is_not_overridden(self):
+        async with self.session.post(self.server.make_url('/login')):
+            pass
+        async with self.session.get(self.server.make_url('/data'), headers={'Cookie': 'sid=user-sid'}):
+            pass
+        self.assertEqual(['sid=user-sid'], self.received)
+
+
+class LatencyStatsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def data(request):
+            return web.Response(text='ok')
+
+        app = web.Application()
+        app.router.add_get('/data', data)
+        self.server = TestServer(app, host='localhost')
+        await self.server.start_server()
+        self.session = create_client_session()
+        http_client.reset_latency_stats()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+        http_client.reset_latency_stats()
+
+    async def test_stats_are_logged_periodically(self):
+        with mock.patch.object(http_client, 'STATS_LOG_INTERVAL', 3), \
+                self.assertLogs('action.http_client', level='INFO') as logs:
+            for _ in range(7):
+                async with self.session.get(self.server.make_url('/data')):
+                    pass
+        self.assertEqual(2, len(logs.records))
+        backend = str(self.server.make_url('/').origin())
+        self.assertEqual('http_client_latency_stats', logs.records[1].msg['type'])
+        self.assertEqual(6, logs.records[1].msg['backends'][backend]['count'])
+        self.assertEqual(7, http_client.latency_stats()[backend]['count'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.
+
+import unittest
+from functools import cmp_to_key
+
+import l10n
+
+WORDS = ['chata', 'hrad', 'Čáp', 'cesta', 'čas', 'řeka', 'Rada', 'šíp', 'sova', 'žába', 'zebra', 'Ahoj', 'áda',
+         'ťava', 'tráva', 'chata', 'Chata', 'house', 'dům', 'Ďábel']
+
+
+class SortTest(unittest.TestCase):
+
+    def test_collator_is_cached(self):
+        self.assertIs(l10n.get_collator('cs_CZ'), l10n.get_collator('cs_CZ'))
+        self.assertIs(l10n.get_collator(None), l10n.get_collator('en_US'))
+
+    def test_sort_matches_collator_compare(self):
+        for loc in ('cs_CZ', 'en_US'):
+            collator = l10n.get_collator(loc)
+            self.assertEqual(sorted(WORDS, key=cmp_to_key(collator.compare)), l10n.sort(WORDS, loc))
+
+    def test_sort_key_reverse(self):
+        rows = [(w, i) for i, w in enumerate(WORDS)]
+        collator = l10n.get_collator('cs_CZ')
+        expected = sorted(rows, key=cmp_to_key(lambda a, b: collator.compare(a[0], b[0])), reverse=True)
+        self.assertEqual(expected, l10n.sort(rows, 'cs_CZ', key=lambda x: x[0], reverse=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
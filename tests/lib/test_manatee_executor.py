@@ -0,0 +1,58 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import threading
+import unittest
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from conclib import executor
+from conclib.executor import ManateeExecutor, run_manatee
+
+
+class ManateeExecutorTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._orig_executor = executor._executor
+        executor._executor = ManateeExecutor(4)
+
+    def tearDown(self):
+        executor._executor = self._orig_executor
+
+    async def test_calls_on_shared_handle_run_in_parallel(self):
+        # e.g. a slow concordance of a corpus must not block other requests for the corpus
+        barrier = threading.Barrier(2, timeout=5)
+        # the barrier is broken (raising an error) in case the calls are serialized
+        await asyncio.gather(run_manatee(barrier.wait), run_manatee(barrier.wait))
+        self.assertEqual(2, executor.get_manatee_executor().stats()['calls'])
+
+    async def test_waiting_calls_are_counted(self):
+        release = threading.Event()
+        blocked = [run_manatee(release.wait, 5) for _ in range(4)]
+        tasks = [asyncio.create_task(c) for c in blocked]
+        extra = asyncio.create_task(run_manatee(lambda: 'done'))
+        await asyncio.sleep(0.05)
+        stats = executor.get_manatee_executor().stats()
+        self.assertEqual(4, stats['running'])
+        self.assertEqual(1, stats['queued'])
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual('done', await extra)
+        self.assertEqual(0, executor.get_manatee_executor().stats()['queued'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import unittest
+
+from plugins.common.mysql import pool
+from plugins.common.mysql.pool import ConnectionPool, PoolExhausted
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.in_transaction = False
+        self.closed = False
+
+    async def is_connected(self):
+        return not self.closed
+
+    async def rollback(self):
+        self.in_transaction = False
+
+    async def close(self):
+        self.closed = True
+
+
+async def create_connection():
+    return FakeConnection()
+
+
+class ConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._orig_interval = pool.RECLAIM_CHECK_INTERVAL
+        pool.RECLAIM_CHECK_INTERVAL = 0.05
+
+    def tearDown(self):
+        pool.RECLAIM_CHECK_INTERVAL = self._orig_interval
+
+    def create_pool(self, max_size=1, acquire_timeout=0.5):
+        return ConnectionPool(
+            create_connection, max_size=max_size, max_lifetime=3600, health_check_after=60,
+            acquire_timeout=acquire_timeout)
+
+    async def test_release_makes_connection_reusable(self):
+        p = self.create_pool()
+        conn = await p.acquire()
+        await p.release(conn)
+        self.assertIs(await p.acquire(), conn)
+        self.assertEqual(1, p.stats()['created'])
+
+    async def test_exhausted_without_release(self):
+        p = self.create_pool(acquire_timeout=0.1)
+        await p.acquire()
+        with self.assertRaises(PoolExhausted):
+            await p.acquire()
+
+    async def test_cancelled_request_connection_is_reclaimed(self):
+        p = self.create_pool()
+        borrowed = asyncio.Event()
+        conns = []
+
+        async def handler():
+            conns.append(await p.acquire())
+            borrowed.set()
+            await asyncio.sleep(10)  # the connection is returned only after the work is done
+            await p.release(conns[0])
+
+        req = asyncio.create_task(handler())
+        await borrowed.wait()
+        req.cancel()  # e.g. a client disconnect
+        with self.assertRaises(asyncio.CancelledError):
+            await req
+
+        conn = await p.acquire()
+        self.assertIsNot(conn, conns[0])
+        self.assertTrue(conns[0].closed)
+        stats = p.stats()
+        self.assertEqual(1, stats['reclaimed'])
+        self.assertEqual(1, stats['size'])
+        self.assertEqual(1, stats['borrowed'])
+
+    async def test_late_release_of_reclaimed_connection_is_ignored(self):
+        p = self.create_pool()
+        conns = []
+
+        async def handler():
+            conns.append(await p.acquire())
+
+        await asyncio.create_task(handler())
+        conn = await p.acquire()
+        await p.release(conns[0])
+        self.assertEqual(0, p.stats()['idle'])
+        await p.release(conn)
+        self.assertEqual(1, p.stats()['idle'])
+        self.assertEqual(1, p.stats()['size'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from action.argmapping.pquery import (PqueryFormArgs, SubsetComplementsAndRatio, SupersetAndRatio)
+from bgcalc import pquery
+from bgcalc.errors import BgCalcError
+from bgcalc.freqs.types import FreqCalcResult
+from bgcalc.pquery import procpool
+from conclib.freq import FreqData, FreqItem
+
+FREQS = {
+    'c1': [('dog', 10), ('cat', 8), ('cow', 3), ('ant', 1)],
+    'c2': [('dog', 7), ('cat', 1), ('cow', 2), ('bee', 5)],
+    'c3': [('dog', 5), ('cat', 2), ('cow', 2)],
+    'compl1': [('cat', 10), ('cow', 1)],
+    'super': [('dog', 18), ('cat', 9), ('cow', 12)],
+}
+
+
+async def fake_calculate_freqs_bg(args):
+    items = [FreqItem(Word=[{'n': w}], freq=f, norm=100, rel=f / 100) for w, f in FREQS[args.q[0]]]
+    return FreqCalcResult(conc_size=100, freqs=[FreqData(
+        Head=[], Items=items, Size=len(items), SkippedEmpty=False, NoRelSorting=False)])
+
+
+def create_pquery(**kw):
+    return PqueryFormArgs(corpname='susanne', position='0<0', attr='word', conc_ids=['c1', 'c2', 'c3'], **kw)
+
+
+class ProcPoolTest(unittest.IsolatedAsyncioTestCase):
+    """
+    The process pool is replaced by a single thread here (the pool processes
+    would have to initialize the whole application).
+    """
+
+    def setUp(self):
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._patches = [
+            mock.patch.object(pquery, 'calculate_freqs_bg', fake_calculate_freqs_bg),
+            mock.patch.object(procpool, 'calculate_freqs_bg', fake_calculate_freqs_bg),
+            mock.patch.object(procpool, '_get_pool', lambda: self._pool),
+            mock.patch.object(procpool, '_process_loop', asyncio.new_event_loop()),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        procpool._process_loop.close()
+        for p in self._patches:
+            p.stop()
+        self._pool.shutdown()
+
+    async def calc_both(self, pq):
+        raw_queries = {k: [k] for k in FREQS.keys()}
+        expected = await pquery.calc_merged_freqs.__wrapped__(None, pq, raw_queries, None, 1, 'en_US')
+        ans = await procpool.calc_merged_freqs_procpool.__wrapped__(None, pq, raw_queries, None, 1, 'en_US')
+        return expected, ans
+
+    async def test_same_result_as_async_calc(self):
+        expected, ans = await self.calc_both(create_pquery())
+        self.assertEqual([('total', 3, None, None), ('dog', 10, 7, 5), ('cat', 8, 1, 2), ('cow', 3, 2, 2)], ans)
+        self.assertEqual(expected, ans)
+
+    async def test_same_result_as_async_calc_with_conditions(self):
+        expected, ans = await self.calc_both(create_pquery(
+            conc_subset_complements=SubsetComplementsAndRatio(conc_ids=['compl1'], max_non_matching_ratio=30),
+            conc_superset=SupersetAndRatio(conc_id='super', max_non_matching_ratio=30)))
+        self.assertEqual([('total', 1, None, None), ('dog', 10, 7, 5)], ans)
+        self.assertEqual(expected, ans)
+
+    async def test_timeout_terminates_pool(self):
+        def slow_branch(args):
+            time.sleep(0.5)
+            return [], 0.5, 0
+
+        with mock.patch.object(procpool, '_calc_branch', slow_branch), \
+                mock.patch.object(procpool, 'SUBTASK_TIMEOUT_SECS', 0.1), \
+                mock.patch.object(procpool, '_drop_pool') as drop_pool:
+            with self.assertRaises(BgCalcError):
+                await procpool.calc_merged_freqs_procpool.__wrapped__(
+                    None, create_pquery(), {k: [k] for k in FREQS.keys()}, None, 1, 'en_US')
+            drop_pool.assert_called_once_with(terminate=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
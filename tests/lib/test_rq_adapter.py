@@ -0,0 +1,109 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import asyncio
+import unittest
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from bgcalc.adapter import rq as rq_adapter
+from bgcalc.adapter.rq import AioConnections, ResultWrapper
+
+
+class FakeJob:
+    """
+    A job finished after a specified number of status checks
+    """
+
+    def __init__(self, finished_after: int):
+        self.id = 'job1'
+        self.func_name = 'calc'
+        self.status_checks = 0
+        self._finished_after = finished_after
+
+    @property
+    def is_finished(self):
+        self.status_checks += 1
+        return self.status_checks > self._finished_after
+
+    @property
+    def is_failed(self):
+        return False
+
+    def return_value(self):
+        return 'result'
+
+
+class FakeAioClient:
+
+    def __init__(self, response=None, error=None):
+        self._response = response
+        self._error = error
+        self.reads = []
+
+    async def xread(self, streams, block):
+        self.reads.append((streams, block))
+        if self._error:
+            raise self._error
+        return self._response
+
+
+class ResultWrapperTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_result_is_obtained_via_notification(self):
+        job = FakeJob(finished_after=0)
+        client = FakeAioClient(response=[['rq:results:job1', [('1-0', {})]]])
+        with self.assertLogs(rq_adapter.__name__, level='INFO') as logs:
+            self.assertEqual('result', await ResultWrapper(job, lambda: client).get(timeout=10))
+        self.assertEqual(1, len(client.reads))
+        self.assertEqual(10000, client.reads[0][1])
+        self.assertEqual(1, job.status_checks)  # no polling
+        self.assertIn('via notification', logs.output[0])
+
+    async def test_stream_timeout_falls_back_to_polling(self):
+        job = FakeJob(finished_after=2)
+        client = FakeAioClient(response=[])
+        with mock.patch.object(rq_adapter, 'POLLING_INTERVAL', 0.01), \
+                self.assertLogs(rq_adapter.__name__, level='INFO') as logs:
+            self.assertEqual('result', await ResultWrapper(job, lambda: client).get())
+        self.assertEqual(rq_adapter.MAX_BLOCKING_WAIT * 1000, client.reads[0][1])
+        self.assertEqual(3, job.status_checks)
+        self.assertIn('via polling', logs.output[0])
+
+    async def test_failed_read_falls_back_to_polling(self):
+        job = FakeJob(finished_after=1)
+        client = FakeAioClient(error=ConnectionError('Too many connections'))
+        with mock.patch.object(rq_adapter, 'POLLING_INTERVAL', 0.01):
+            self.assertEqual('result', await ResultWrapper(job, lambda: client).get())
+
+
+class AioConnectionsTest(unittest.TestCase):
+
+    def test_client_is_shared_within_event_loop(self):
+        connections = AioConnections('localhost', 6379, 0)
+
+        async def get_clients():
+            return connections(), connections()
+
+        c1, c2 = asyncio.run(get_clients())
+        self.assertIs(c1, c2)
+        c3, _ = asyncio.run(get_clients())
+        self.assertIsNot(c1, c3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from corplib import sattr_sizes
+
+
+class FakeAttr:
+
+    def __init__(self, values):
+        self._values = values
+
+    def id_range(self):
+        return len(set(self._values))
+
+    def pos2id(self, num):
+        return sorted(set(self._values)).index(self._values[num])
+
+    def id2str(self, value_id):
+        return sorted(set(self._values))[value_id]
+
+
+class FakeStruct:
+
+    def __init__(self, sizes, values):
+        self._sizes = sizes
+        self._attr = FakeAttr(values)
+
+    def get_attr(self, name):
+        return self._attr
+
+    def size(self):
+        return len(self._sizes)
+
+    def beg(self, num):
+        return sum(self._sizes[:num])
+
+    def end(self, num):
+        return sum(self._sizes[:num + 1])
+
+
+class FakeCorp:
+
+    subcorpus_id = None
+    corpname = 'corp1'
+    portable_ident = 'corp1'
+
+    def __init__(self):
+        self.struct = FakeStruct([3, 5, 2], ['a', 'b', 'a'])
+
+    def get_struct(self, name):
+        return self.struct
+
+
+class GetSAttrSizesTest(unittest.TestCase):
+
+    def setUp(self):
+        sattr_sizes._unstored.clear()
+        sattr_sizes._queued.clear()
+        self.corp = FakeCorp()
+        self.mtime = 10
+        patches = [
+            mock.patch.object(sattr_sizes, 'load_sattr_sizes', return_value=None),
+            mock.patch.object(sattr_sizes, '_index_path', return_value='/freqs/corp1/doc.txtype.sizes'),
+            mock.patch.object(sattr_sizes, '_source_mtime', side_effect=lambda corp, attr: self.mtime)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_missing_file_is_queued_once(self):
+        with mock.patch.object(sattr_sizes, 'queue_compilation', return_value=True) as queue, \
+                mock.patch.object(sattr_sizes, 'compute_sattr_sizes', wraps=sattr_sizes.compute_sattr_sizes) as compute:
+            self.assertEqual({'a': 5, 'b': 5}, sattr_sizes.get_sattr_sizes(self.corp, 'doc.txtype'))
+            self.assertEqual({'a': 5, 'b': 5}, sattr_sizes.get_sattr_sizes(self.corp, 'doc.txtype'))
+            queue.assert_called_once_with(self.corp, 'doc.txtype')
+            compute.assert_called_once()
+            # changed source data require a new file
+            self.mtime = 11
+            sattr_sizes.get_sattr_sizes(self.corp, 'doc.txtype')
+            self.assertEqual(2, queue.call_count)
+            self.assertEqual(2, compute.call_count)
+
+    def test_failed_queueing_is_retried(self):
+        with mock.patch.object(sattr_sizes, 'queue_compilation', return_value=False) as queue:
+            sattr_sizes.get_sattr_sizes(self.corp, 'doc.txtype')
+            sattr_sizes.get_sattr_sizes(self.corp, 'doc.txtype')
+            self.assertEqual(2, queue.call_count)
+        self.assertEqual(0, len(sattr_sizes._queued))
+
+
+if __name__ == '__main__':
+    unittest.main()
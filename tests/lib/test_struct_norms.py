@@ -0,0 +1,172 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import unittest
+from unittest import mock
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+from texttypes import norms
+from texttypes.norms import COMPLETE_ATTRS_KEY, CachedStructNormsCalc, StructNormsCalc
+
+
+class FakeAttr:
+
+    def __init__(self, values):
+        self._values = values
+        self._lexicon = sorted(set(values))
+
+    def id_range(self):
+        return len(self._lexicon)
+
+    def pos2id(self, num):
+        return self._lexicon.index(self._values[num])
+
+    def pos2str(self, num):
+        return self._values[num]
+
+    def id2str(self, value_id):
+        return self._lexicon[value_id]
+
+
+class FakeStruct:
+    """
+    A structure with an attribute 'txtype' and a numeric attribute 'wordcount'
+    """
+
+    def __init__(self, sizes, txtypes, wordcounts):
+        self._sizes = sizes
+        self._attrs = dict(txtype=FakeAttr(txtypes), wordcount=FakeAttr(wordcounts))
+        self.attr_lookups = []
+
+    def get_attr(self, name):
+        self.attr_lookups.append(name)
+        return self._attrs[name]
+
+    def size(self):
+        return len(self._sizes)
+
+    def beg(self, num):
+        return sum(self._sizes[:num])
+
+    def end(self, num):
+        return sum(self._sizes[:num + 1])
+
+
+class FakeCorp:
+
+    corpname = 'corp1'
+    subcorpus_id = None
+
+    def __init__(self, struct, conf=None):
+        self._struct = struct
+        self._conf = conf if conf else {}
+
+    def get_struct(self, name):
+        return self._struct
+
+    def get_conf(self, key):
+        return self._conf.get(key, '')
+
+
+class FakeTextTypesCache:
+
+    def __init__(self, data=None):
+        self.data = data if data else {}
+        self.num_stored = 0
+
+    async def get_attr_values(self, corpname, structname, subcnorm):
+        return self.data
+
+    async def set_attr_values(self, corpname, structname, subcnorm, data):
+        self.data = data
+        self.num_stored += 1
+
+
+def create_struct():
+    return FakeStruct([3, 5, 2, 4], ['news', 'fiction', 'news', 'fiction|news'], ['3', '5', 'x', '4'])
+
+
+class StructNormsCalcTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_whole_attribute_is_computed(self):
+        struct = create_struct()
+        calc = StructNormsCalc(FakeCorp(struct), 'doc', 'freq')
+        self.assertEqual(
+            {'fiction': 1, 'fiction|news': 1, 'news': 2}, await calc.compute_attr_norms('txtype'))
+
+    async def test_numeric_attr_norms(self):
+        struct = create_struct()
+        calc = StructNormsCalc(FakeCorp(struct), 'doc', 'wordcount')
+        # non-numeric values count as 0
+        self.assertEqual(
+            {'fiction': 5, 'fiction|news': 4, 'news': 3}, await calc.compute_attr_norms('txtype'))
+        # the norm attribute is looked up once, not per structure
+        self.assertEqual(1, struct.attr_lookups.count('wordcount'))
+
+    async def test_multivalue_items_are_summed(self):
+        corp = FakeCorp(create_struct(), {'doc.txtype.MULTISEP': '|', 'doc.txtype.MULTIVAL': 'yes'})
+        calc = StructNormsCalc(corp, 'doc', 'wordcount')
+        self.assertEqual(
+            {'fiction': 9, 'fiction|news': 4, 'news': 7}, await calc.compute_attr_norms('txtype'))
+
+    async def test_tokens_use_precalculated_sizes(self):
+        calc = StructNormsCalc(FakeCorp(create_struct()), 'doc', 'tokens')
+        with mock.patch.object(norms, 'load_sattr_sizes', return_value={'news': 100, 'fiction': 50}), \
+                mock.patch.object(norms, 'compute_sattr_sizes') as compute:
+            self.assertEqual({'news': 100, 'fiction': 50}, await calc.compute_attr_norms('txtype'))
+            compute.assert_not_called()
+        with mock.patch.object(norms, 'load_sattr_sizes', return_value=None):
+            self.assertEqual(
+                {'fiction': 5, 'fiction|news': 4, 'news': 5}, await calc.compute_attr_norms('txtype'))
+
+
+class CachedStructNormsCalcTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_attribute_is_computed_and_stored_once(self):
+        tt_cache = FakeTextTypesCache()
+        calc = CachedStructNormsCalc(FakeCorp(create_struct()), 'doc', 'freq', tt_cache)
+        with mock.patch.object(calc, 'compute_attr_norms', wraps=calc.compute_attr_norms) as compute:
+            self.assertEqual(2, await calc.compute_norm('txtype', 'news'))
+            self.assertEqual(1, await calc.compute_norm('txtype', 'fiction'))
+            compute.assert_called_once_with('txtype')
+        self.assertEqual(1, tt_cache.num_stored)
+        self.assertEqual({'txtype': True}, tt_cache.data[COMPLETE_ATTRS_KEY])
+
+    async def test_complete_cached_attribute_is_not_recomputed(self):
+        tt_cache = FakeTextTypesCache({COMPLETE_ATTRS_KEY: {'txtype': True}, 'txtype': {'news': 7}})
+        calc = CachedStructNormsCalc(FakeCorp(create_struct()), 'doc', 'freq', tt_cache)
+        with mock.patch.object(calc, 'compute_attr_norms') as compute:
+            self.assertEqual(7, await calc.compute_norm('txtype', 'news'))
+            compute.assert_not_called()
+        self.assertEqual(0, tt_cache.num_stored)
+
+    async def test_incomplete_cached_attribute_is_recomputed(self):
+        # e.g. norms stored by a version calculating values one by one
+        tt_cache = FakeTextTypesCache({'txtype': {'news': 7}})
+        calc = CachedStructNormsCalc(FakeCorp(create_struct()), 'doc', 'freq', tt_cache)
+        self.assertEqual(1, await calc.compute_norm('txtype', 'fiction'))
+        self.assertEqual(2, await calc.compute_norm('txtype', 'news'))
+        self.assertEqual({'txtype': True}, tt_cache.data[COMPLETE_ATTRS_KEY])
+
+    async def test_unknown_value_defaults_to_zero(self):
+        calc = CachedStructNormsCalc(FakeCorp(create_struct()), 'doc', 'freq', FakeTextTypesCache())
+        self.assertEqual(0, await calc.compute_norm('txtype', 'poetry'))
+        self.assertEqual(0, await calc.compute_norm('txtype', 2024))
+
+
+if __name__ == '__main__':
+    unittest.main()
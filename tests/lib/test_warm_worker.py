@@ -0,0 +1,87 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.realpath('%s/../../worker' %
+                                    os.path.dirname(os.path.realpath(__file__))))  # worker modules
+
+import plugins  # noqa: F401 (resolves the import order of application modules)
+import warm_worker
+from warm_worker import WarmWorker, get_recycle_reason
+
+
+class RecycleReasonTest(unittest.TestCase):
+
+    def test_healthy_process_is_kept(self):
+        self.assertIsNone(get_recycle_reason(10, 100, 2**20, 2**30, False))
+
+    def test_job_count(self):
+        self.assertIsNotNone(get_recycle_reason(100, 100, 0, 2**30, False))
+        self.assertIsNone(get_recycle_reason(99, 100, 0, 2**30, False))
+
+    def test_rss_growth(self):
+        self.assertIsNotNone(get_recycle_reason(1, 100, 2**30 + 1, 2**30, False))
+        self.assertIsNone(get_recycle_reason(1, 100, 2**30, 2**30, False))
+
+    def test_timeout(self):
+        self.assertIsNotNone(get_recycle_reason(1, 100, 0, 2**30, True))
+
+
+class StuckJobTest(unittest.TestCase):
+
+    def setUp(self):
+        connection = mock.MagicMock()
+        connection.connection_pool.connection_kwargs = {}
+        self.worker = WarmWorker(
+            ['default'], connection=connection, max_jobs=100, max_rss_growth=2**30, argv=['rqworker.py'])
+
+    def test_stuck_job_is_failed_before_recycling(self):
+        calls = []
+        job, queue = mock.MagicMock(id='job1'), mock.MagicMock()
+        with mock.patch.object(
+                self.worker, 'handle_job_failure', lambda *args, **kw: calls.append(('fail', args[0]))), \
+                mock.patch.object(self.worker, 'teardown', lambda: calls.append(('teardown', None))), \
+                mock.patch.object(warm_worker, 'recycle_process', lambda argv: calls.append(('recycle', argv))):
+            self.worker._on_job_stuck(job, queue)
+        self.assertEqual([('fail', job), ('teardown', None), ('recycle', ['rqworker.py'])], calls)
+
+    def test_stuck_job_recycles_even_if_cleanup_fails(self):
+        recycled = []
+
+        def handle_job_failure(*args, **kwargs):
+            raise ConnectionError('Redis is gone')
+
+        with mock.patch.object(self.worker, 'handle_job_failure', handle_job_failure), \
+                mock.patch.object(warm_worker, 'recycle_process', recycled.append):
+            self.worker._on_job_stuck(mock.MagicMock(id='job1'), mock.MagicMock())
+        self.assertEqual([['rqworker.py']], recycled)
+
+    def test_recycling_terminates_procpool(self):
+        with mock.patch.object(warm_worker.procpool, 'shutdown_pool') as shutdown_pool, \
+                mock.patch.object(warm_worker.logging, 'shutdown'), \
+                mock.patch.object(warm_worker.os, 'execv') as execv:
+            warm_worker.recycle_process(['rqworker.py'])
+        shutdown_pool.assert_called_once()
+        execv.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,7 @@ complete and properly configured KonText package.
 """
 
 import importlib.util
+import logging
 import os
 import pickle
 import sys
@@ -69,12 +70,13 @@ from action.argmapping.keywords import KeywordsFormArgs
 from action.argmapping.subcorpus import (
     CreateSubcorpusArgs, CreateSubcorpusRawCQLArgs, CreateSubcorpusWithinArgs)
 from action.argmapping.wordlist import WordlistFormArgs
-from bgcalc import coll_calc, freqs, keywords, pquery, subc_calc, wordlist
+from bgcalc import coll_calc, dispersion, freqs, keywords, pquery, subc_calc, wordlist
 from bgcalc.freqs import FreqCalcArgs
 from bgcalc.errors import WorkerTaskException
-from corplib import CorpusFactory
+from corplib import CorpusFactory, sattr_sizes
 from corplib.abstract import SubcorpusIdent
 from corplib.corpus import KCorpus
+from corplib.frq_files import discard_frq_files
 from corplib.subcorpus import SubcorpusRecord
 
 stderr_redirector = get_stderr_redirector(settings)
@@ -112,6 +114,8 @@ async def _compile_frq(corp: KCorpus, attr, logfile):
         async with aiofiles.open(logfile, 'a') as f:
             await f.write('\n100 %\n')  # to get proper calculation of total progress
         return {'message': 'freq already compiled'}
+    frq_file = corp.freq_precalc_file(attr, 'frq')
+    discard_frq_files([frq_file, frq_file + '64'])  # Manatee rewrites the files in place
     with stderr_redirector(open(logfile, 'a')):
         corp.compile_frq(attr)
         async with aiofiles.open(logfile, 'a') as f:
@@ -185,6 +189,10 @@ async def clean_freqs_cache():
     return freqs.clean_freqs_cache()
 
 
+async def calculate_dispersion(args: dispersion.DispersionCalcArgs):
+    return await dispersion.calculate_dispersion_bg(args)
+
+
 async def calc_merged_freqs(worker, request_json, raw_queries, subcpath, user_id, collator_locale):
     # TODO for performance testing switch between the three implementations
     # worker tasks-based implementation
@@ -193,6 +201,13 @@ async def calc_merged_freqs(worker, request_json, raw_queries, subcpath, user_id
     # thread-based implementation
     # from bgcalc.pquery.extra import calc_merged_freqs_threaded
     # return await calc_merged_freqs_threaded(worker, request_json, raw_queries, subcpath, user_id, collator_locale)
+    if settings.get('calc_backend', 'pquery_calc_mode', 'async') == 'process_pool':
+        from bgcalc.pquery.procpool import calc_merged_freqs_procpool, can_use_procpool
+        if can_use_procpool():
+            return await calc_merged_freqs_procpool(
+                worker, request_json, raw_queries, subcpath, user_id, collator_locale)
+        logging.getLogger(__name__).warning(
+            'pquery process_pool mode requires calc_backend/rq_warm_worker, using the default mode')
     # default implementation:
     return await pquery.calc_merged_freqs(worker, request_json, raw_queries, subcpath, user_id, collator_locale)
 
@@ -205,6 +220,7 @@ async def compile_frq(corpus_ident, attr, logfile):
     (see freqs.build_arf_db)worker.py
     """
     corp = await _load_corp(corpus_ident)
+    await freqs.mark_precalc_started(corp, attr, 'frq', logfile)
     return await _compile_frq(corp, attr, logfile)
 
 
@@ -214,6 +230,7 @@ async def compile_arf(corpus_ident, attr, logfile):
     (see freqs.build_arf_db)
     """
     corp = await _load_corp(corpus_ident)
+    await freqs.mark_precalc_started(corp, attr, 'arf', logfile)
     num_wait = 20
     base_paths = freqs.corp_freqs_cache_paths(corp, attr)
 
@@ -232,6 +249,7 @@ async def compile_arf(corpus_ident, attr, logfile):
             await f.write('\n100 %\n')  # to get proper calculation of total progress
         return {'message': 'arf already compiled'}
     else:
+        discard_frq_files([corp.freq_precalc_file(attr, 'arf')])  # Manatee rewrites the file in place
         with stderr_redirector(open(logfile, 'a')):
             corp.compile_arf(attr)
             async with aiofiles.open(logfile, 'a') as f:
@@ -245,6 +263,7 @@ async def compile_docf(corpus_ident, attr, logfile):
     (see freqs.build_arf_db)
     """
     corp = await _load_corp(corpus_ident)
+    await freqs.mark_precalc_started(corp, attr, 'docf', logfile)
     if freqs.is_compiled(corp, attr, 'docf'):
         async with aiofiles.open(logfile, 'a') as f:
             await f.write('\n100 %\n')  # to get proper calculation of total progress
@@ -252,6 +271,7 @@ async def compile_docf(corpus_ident, attr, logfile):
     doc_struct = corp.get_conf('DOCSTRUCTURE')
     try:
         doc = corp.get_struct(doc_struct)
+        discard_frq_files([corp.freq_precalc_file(attr, 'docf')])  # Manatee rewrites the file in place
         with stderr_redirector(open(logfile, 'a')):
             corp.compile_docf(attr, doc.name)
             async with aiofiles.open(logfile, 'a') as f:
@@ -265,6 +285,24 @@ async def compile_docf(corpus_ident, attr, logfile):
                 doc_struct, attr, corp_id))
 
 
+async def compile_sattr_sizes(corpus_ident, attr):
+    """
+    Precalculate sizes of structural attribute values used as
+    norms in freq. distributions (see corplib.sattr_sizes)
+    """
+    corp = await _load_corp(corpus_ident)
+    if sattr_sizes.is_compiled(corp, attr):
+        return {'message': 'sizes already compiled'}
+    try:
+        sattr_sizes.store_sattr_sizes(corp, attr, sattr_sizes.compute_sattr_sizes(corp, attr))
+        return {'message': 'OK'}
+    except manatee.AttrNotFound:
+        corp_id = corpus_ident.corpname if isinstance(
+            corpus_ident, SubcorpusIdent) else corpus_ident
+        raise WorkerTaskException(
+            'Failed to compile sizes: attribute {} not found in {}'.format(attr, corp_id))
+
+
 # ----------------------------- SUBCORPORA ------------------------------------
 
 
@@ -18,6 +18,7 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
 # 02110-1301, USA.
 
+import asyncio
 import os
 import sys
 from typing import Optional, Union, Callable
@@ -32,7 +33,7 @@ sys.path.insert(0, os.path.join(APP_PATH, 'worker'))
 
 import plugins
 import settings
-from util import as_sync
+from util import as_sync, set_persistent_loop
 
 if settings.get('global', 'manatee_path', None):
     sys.path.insert(0, settings.get('global', 'manatee_path'))
@@ -46,6 +47,8 @@ from bgcalc.adapter.factory import init_backend
 from bgcalc.adapter.rq import handle_custom_exception
 from corplib.abstract import SubcorpusIdent
 from log_formatter import KontextLogFormatter
+from warm_worker import (
+    DEFAULT_MAX_JOBS, DEFAULT_MAX_RSS_GROWTH_MB, WarmWorker, recycle_process)
 
 uvloop.install()
 
@@ -103,6 +106,12 @@ async def calculate_freq2d(args):
     return await general.calculate_freq2d(args)
 
 
+@as_sync
+@handle_custom_exception
+async def calculate_dispersion(args):
+    return await general.calculate_dispersion(args)
+
+
 @as_sync
 @handle_custom_exception
 async def clean_freqs_cache():
@@ -134,6 +143,12 @@ async def compile_arf(corpus_ident, attr, logfile):
 async def compile_docf(corpus_ident, attr, logfile):
     return await general.compile_docf(corpus_ident, attr, logfile)
 
+
+@as_sync
+@handle_custom_exception
+async def compile_sattr_sizes(corpus_ident, attr):
+    return await general.compile_sattr_sizes(corpus_ident, attr)
+
 # ----------------------------- WORD LIST -------------------------------------
 
 
@@ -225,6 +240,25 @@ if __name__ == "__main__":
     )
 
     qs = sys.argv[1:] or ['default']
+    if not sys.argv[1:] and settings.get('calc_backend', 'rq_low_priority_queue', None):
+        # queues are processed in the order they are listed so low-priority tasks
+        # are processed only when there is nothing else to do
+        qs.append(settings.get('calc_backend', 'rq_low_priority_queue'))
     worker.init_scheduler()
-    w = Worker(qs, connection=connection)
-    w.work()
+    if settings.get_bool('calc_backend', 'rq_warm_worker', False):
+        # all the jobs share this process and this loop (see warm_worker module)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        set_persistent_loop(loop)
+        w = WarmWorker(
+            qs, connection=connection,
+            max_jobs=settings.get_int('calc_backend', 'rq_warm_max_jobs', DEFAULT_MAX_JOBS),
+            max_rss_growth=settings.get_int(
+                'calc_backend', 'rq_warm_max_rss_growth_mb', DEFAULT_MAX_RSS_GROWTH_MB) * 2**20,
+            argv=[os.path.abspath(__file__)] + sys.argv[1:])
+        w.work()
+        if w.recycle_reason:
+            recycle_process(w.argv)
+    else:
+        w = Worker(qs, connection=connection)
+        w.work()
@@ -0,0 +1,166 @@
+# Copyright (c) 2026 Charles University, Faculty of Arts,
+#                    Department of Linguistics
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; version 2
+# dated June, 1991.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.
+
+"""
+A non-forking ("warm") RQ worker. Jobs are performed within the worker
+process itself using a single persistent event loop so opened corpora,
+plug-in connections and other process-wide state are reused between jobs.
+
+To keep the process healthy, it is recycled (i.e. replaced by a fresh
+instance of itself via exec) after a configured number of jobs, once
+its memory usage grows too much or after a job timeout.
+
+Job timeouts are handled by RQ (via SIGALRM) which interrupts the job
+once it returns from native code to the interpreter. In case a job is
+stuck (e.g. within a long Manatee call) even after a grace period,
+a watchdog marks the job as failed, unregisters the worker and recycles
+the process.
+"""
+
+import logging
+import os
+import resource
+import sys
+import threading
+from typing import List, Optional
+
+from bgcalc.pquery import procpool
+from rq import SimpleWorker
+from rq.job import Job
+from rq.queue import Queue
+from rq.timeouts import JobTimeoutException
+
+DEFAULT_MAX_JOBS = 1000
+
+DEFAULT_MAX_RSS_GROWTH_MB = 1024
+
+WATCHDOG_GRACE_PERIOD = 30
+"""
+how long (in seconds) we wait for a job after its timeout before the process is recycled
+"""
+
+
+def current_rss() -> int:
+    """
+    Return resident set size of the current process in bytes
+    """
+    try:
+        with open('/proc/self/statm') as fr:
+            return int(fr.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # peak RSS (in KiB on Linux) is the best we can get here
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _is_timeout(exc: Optional[BaseException]) -> bool:
+    while exc is not None:
+        if isinstance(exc, JobTimeoutException):
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def get_recycle_reason(
+        num_jobs: int, max_jobs: int, rss_growth: int, max_rss_growth: int, job_timed_out: bool) -> Optional[str]:
+    """
+    Decide whether a worker process should be recycled after a job.
+
+    returns:
+    a reason of the recycling or None if the process can continue
+    """
+    if job_timed_out:
+        return 'job timed out'
+    if num_jobs >= max_jobs:
+        return f'max. number of jobs ({max_jobs}) reached'
+    if rss_growth > max_rss_growth:
+        return f'RSS grew by {rss_growth / 2**20:.1f} MiB'
+    return None
+
+
+def recycle_process(argv: List[str]):
+    logging.getLogger(__name__).warning(f'recycling worker process {os.getpid()}')
+    # processes of the pquery pool would be orphaned by exec
+    procpool.shutdown_pool()
+    logging.shutdown()
+    os.execv(sys.executable, [sys.executable] + argv)
+
+
+class WarmWorker(SimpleWorker):
+
+    def __init__(self, *args, max_jobs: int, max_rss_growth: int, argv: List[str], **kwargs):
+        """
+        arguments:
+        max_jobs -- number of jobs after which the process is recycled
+        max_rss_growth -- max. growth of the process RSS (in bytes) before it is recycled
+        argv -- arguments used to start a fresh process (without the interpreter)
+        """
+        super().__init__(*args, **kwargs)
+        self._max_jobs = max_jobs
+        self._max_rss_growth = max_rss_growth
+        self.argv = argv
+        self._num_jobs = 0
+        self._initial_rss: Optional[int] = None
+        self._job_timed_out = False
+        self.recycle_reason: Optional[str] = None
+
+    def _on_job_stuck(self, job: Job, queue: Queue):
+        """
+        Called by the watchdog thread while the main thread is still stuck within the job
+        """
+        logging.getLogger(__name__).error(
+            f'job {job.id} did not finish within its timeout and grace period')
+        try:
+            self.handle_job_failure(
+                job, queue, exc_string='Job did not finish within its timeout and grace period')
+            self.teardown()
+        except Exception as ex:
+            # the process must be recycled anyway
+            logging.getLogger(__name__).error(f'failed to clean up stuck job {job.id}: {ex}')
+        recycle_process(self.argv)
+
+    def _start_watchdog(self, job: Job, queue: Queue) -> Optional[threading.Timer]:
+        timeout = job.timeout or self.queue_class.DEFAULT_TIMEOUT
+        if timeout < 0:
+            return None
+        watchdog = threading.Timer(timeout + WATCHDOG_GRACE_PERIOD, self._on_job_stuck, args=(job, queue))
+        watchdog.daemon = True
+        watchdog.start()
+        return watchdog
+
+    def handle_exception(self, job: Job, *exc_info):
+        if _is_timeout(exc_info[1]):
+            self._job_timed_out = True
+        return super().handle_exception(job, *exc_info)
+
+    def execute_job(self, job: Job, queue: Queue):
+        if self._initial_rss is None:
+            self._initial_rss = current_rss()
+        watchdog = self._start_watchdog(job, queue)
+        try:
+            super().execute_job(job, queue)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        self._num_jobs += 1
+        self.recycle_reason = get_recycle_reason(
+            self._num_jobs, self._max_jobs, current_rss() - self._initial_rss, self._max_rss_growth,
+            self._job_timed_out)
+        if self.recycle_reason:
+            logging.getLogger(__name__).info(
+                f'worker {self.name} is going to be recycled: {self.recycle_reason}')
+            self._stop_requested = True